@@ -1,10 +1,17 @@
 from __future__ import annotations
 
 import queue
+import sqlite3
 import tkinter as tk
+from tkinter import messagebox
 
-from services.events import disconnect_session
+from config.constants import LATENCY_REPORT_PATH, WS_REPLAY_PATH
+from services.events import disconnect_session, message_latency, replay_session
+from services.http_client import close_session
+from services.outbox import outbox
+from services.session_watch import unwatch_all
 from state import app_state as state
+from ui.background_tasks import ui_tasks
 from ui.comment_ui import COMMENT_COLUMN_BG, CommentListView, comment_entry_from_message
 from ui.display_layout import DisplayLayoutController
 from ui.overlay import (
@@ -24,6 +31,27 @@ from ui.windows import create_menu_window, set_always_on_top
 COMMENT_POLL_INTERVAL_MS = 100
 
 
+def _start_outbox(root: tk.Tk) -> None:
+    """送信キューを動かす。前回の残りは送る前に運営者へ確かめる。"""
+    try:
+        leftover = outbox.open()
+    except sqlite3.Error:
+        leftover = 0
+    if leftover and not messagebox.askyesno(
+        "送信待ちの操作",
+        f"前回の終了時に送れていない運営操作が {leftover} 件あります。\n"
+        "今から順番に送りますか？\n"
+        "「いいえ」を選ぶと送信失敗として残し、メニューから再送できます。",
+        parent=root,
+    ):
+        outbox.fail_pending("前回の残りのため送信を保留しました")
+    try:
+        outbox.start()
+    except sqlite3.Error:
+        # 送信キューのファイルが開けなくても表示は続ける。操作はキューを通さず直接送る
+        pass
+
+
 def main() -> None:
     state.root = tk.Tk()
     root = state.root
@@ -45,7 +73,7 @@ def main() -> None:
     wrapper = tk.Frame(root, bg=COMMENT_COLUMN_BG)
     wrapper.pack(expand=True, fill="both")
 
-    comment_list = CommentListView(wrapper)
+    comment_list = CommentListView(wrapper, on_drawn=message_latency.mark_drawn)
     comment_list.pack(expand=True, fill="both")
     bind_overlay_canvas(comment_list.overlay_canvas)
     layout_controller.refresh_layout()
@@ -69,6 +97,8 @@ def main() -> None:
                 raw = state.message_queue.get_nowait()
                 entry = annotate_entry(raw)
                 if is_stamp(entry):
+                    if isinstance(entry.get("id"), int):
+                        message_latency.discard(entry["id"])
                     if entry.get("_from_history"):
                         continue
                     enqueue_stamp_balloon(entry)
@@ -76,6 +106,7 @@ def main() -> None:
                 comment_entry = comment_entry_from_message(entry)
                 if comment_entry is None:
                     continue
+                message_latency.mark(comment_entry.id, "dequeued")
                 state.append_message(comment_entry)
                 comment_list.add_comment(comment_entry)
         except queue.Empty:
@@ -101,9 +132,22 @@ def main() -> None:
         set_display_order,
     )
     update_comments()
+    ui_tasks.attach(root)
+    _start_outbox(root)
+    if WS_REPLAY_PATH:
+        replay_session(WS_REPLAY_PATH)
 
     def on_close() -> None:
         disconnect_session(show_status=False)
+        unwatch_all()
+        ui_tasks.shutdown()
+        outbox.stop()
+        close_session()
+        if LATENCY_REPORT_PATH:
+            try:
+                message_latency.dump_json(LATENCY_REPORT_PATH)
+            except OSError:
+                pass
         stop_overlay()
         sync_poll_results_overlay(root, None)
         root.destroy()
@@ -27,11 +27,37 @@ def _resolve_base_dir() -> Path:
     return _candidate_base_dir_paths()[0]
 
 
+def _resolve_data_dir() -> Path:
+    """送信キューのように、起動をまたいで残すファイルの置き場所。"""
+    configured = os.environ.get("BEAVER_DATA_DIR")
+    if configured:
+        return Path(configured)
+    if sys.platform == "win32":
+        app_data = os.environ.get("LOCALAPPDATA") or os.environ.get("APPDATA")
+        if app_data:
+            return Path(app_data) / "Beaver"
+    elif sys.platform == "darwin":
+        return Path.home() / "Library" / "Application Support" / "Beaver"
+    xdg_data_home = os.environ.get("XDG_DATA_HOME")
+    data_home = (
+        Path(xdg_data_home) if xdg_data_home else Path.home() / ".local" / "share"
+    )
+    return data_home / "beaver"
+
+
 _BASE_DIR_PATH = _resolve_base_dir()
 BASE_DIR = str(_BASE_DIR_PATH)
+DATA_DIR = str(_resolve_data_dir())
 DEFAULT_PUBLIC_BACKEND_BASE_URL = "https://api.beaver.works"
 
 
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() not in {"0", "false", "no", "off"}
+
+
 def _trim_trailing_slash(value: str) -> str:
     return value.rstrip("/")
 
@@ -65,7 +91,81 @@ BACKEND_CLIENT_WS_BASE_URL = _trim_trailing_slash(
     or _derive_client_ws_base_url(BACKEND_BASE_URL)
 )
 BACKEND_WS_ORIGIN = os.environ.get("BACKEND_WS_ORIGIN", "https://beaver.works")
+BACKEND_WS_PERMESSAGE_DEFLATE = _env_flag("BACKEND_WS_PERMESSAGE_DEFLATE", True)
 BACKEND_HTTP_TIMEOUT_SEC = 10
+# API のエンドポイントごとのタイムアウト秒。載っていないものは既定値を使う。
+# 操作系はすぐ結果を返したいので短く、履歴の一括取得や名前生成のような重いものだけ長くする。
+BACKEND_ENDPOINT_DEFAULT_TIMEOUT_SEC = float(
+    os.environ.get("BEAVER_BACKEND_TIMEOUT_SEC", "4.0")
+)
+BACKEND_ENDPOINT_TIMEOUTS_SEC: dict[str, float] = {
+    "/api/client/bootstrap": float(BACKEND_HTTP_TIMEOUT_SEC),
+    "/api/client/sakura-names/generate": float(BACKEND_HTTP_TIMEOUT_SEC),
+}
+# エンドポイントが連続でこの回数失敗したら、BACKEND_CIRCUIT_RESET_SEC の間は送らずに失敗させる。
+BACKEND_CIRCUIT_FAILURE_THRESHOLD = 3
+BACKEND_CIRCUIT_RESET_SEC = 5.0
+# 接続時の履歴はこの件数ずつ新しい側から取得し、最初のページを先に表示する。
+BOOTSTRAP_PAGE_SIZE = 200
+# トラッキングログは 1 回にこの件数ずつ、手元の最新より新しい分と最古より古い分を取得する。
+BEHAVIOR_EVENT_PAGE_SIZE = 200
+# 手元に持つトラッキングログの上限。超えたら古い順に捨て、必要なら遡って取り直す。
+BEHAVIOR_EVENT_LOG_MAX_SIZE = 50000
+# ETag / Last-Modified で条件付き取得する読み出し API の結果を何件まで覚えておくか。
+BACKEND_HTTP_RESPONSE_CACHE_SIZE = 64
+# 共有 HTTP セッションの接続プール。ホストごとに HTTP_POOL_MAXSIZE 本まで使い回す。
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = int(os.environ.get("BEAVER_HTTP_POOL_SIZE", "16"))
+# 冪等な GET の再試行回数と間隔の係数。バックエンド API ではエンドポイントの
+# タイムアウトを再試行込みの持ち時間とし、残りがある間だけ送り直す。
+HTTP_RETRY_TOTAL = 2
+HTTP_RETRY_BACKOFF_SEC = 0.3
+# JSON 実装。auto なら orjson → msgspec → 標準 json の順に使えるものを選ぶ。
+JSON_CODEC = os.environ.get("BEAVER_JSON_CODEC", "auto")
+WS_RECONNECT_BASE_DELAY_SEC = 1.0
+WS_RECONNECT_MAX_DELAY_SEC = 30.0
+WS_RECONNECT_JITTER_RATIO = 0.5
+# 再接続後この秒数つながり続けたら安定とみなし、バックオフを初期値へ戻す。
+WS_STABLE_CONNECTION_SEC = 10.0
+WS_HEARTBEAT_INTERVAL_SEC = 15.0
+# 連続してこの回数 pong が返らなければ回線が死んだとみなして張り直す。
+WS_HEARTBEAT_MAX_MISSED_PONGS = 2
+WS_RECEIVE_BUFFER_MIN_BYTES = 16 * 1024
+WS_RECEIVE_BUFFER_MAX_BYTES = 1024 * 1024
+# 設定すると受信フレームをこのディレクトリへ記録する。
+WS_RECORD_DIR = os.environ.get("BEAVER_WS_RECORD_DIR") or None
+# 設定するとサーバーへ接続せず、この記録を再生する。速度 0 は待ちなしで流す。
+WS_REPLAY_PATH = os.environ.get("BEAVER_WS_REPLAY") or None
+WS_REPLAY_SPEED = float(os.environ.get("BEAVER_WS_REPLAY_SPEED", "1.0"))
+# 終了時に受信から描画までの段階別レイテンシを書き出す先。未設定なら書き出さない。
+LATENCY_REPORT_PATH = os.environ.get("BEAVER_LATENCY_REPORT") or None
+
+# リアクション更新をまとめて反映する窓。0 にすると到着ごとに即時反映する。
+REACTION_COALESCE_WINDOW_SEC = 0.25
+# 画面操作から始める通信処理のワーカー数と、結果をメインスレッドへ渡す間隔。
+UI_TASK_MAX_WORKERS = 4
+UI_TASK_DISPATCH_INTERVAL_MS = 30
+# 運営操作の POST を積んでおく送信キュー。回線が落ちている間はここで待ち、
+# OUTBOX_RETRY_INITIAL_SEC から倍々で OUTBOX_RETRY_MAX_SEC まで間隔を空けて送り直す。
+# 前回の終了時に残っていた操作は、起動時に送るかどうかを運営者に確かめる。
+OUTBOX_PATH = os.environ.get("BEAVER_OUTBOX_PATH") or str(
+    Path(DATA_DIR) / "outbox.sqlite3"
+)
+OUTBOX_RETRY_INITIAL_SEC = 0.5
+OUTBOX_RETRY_MAX_SEC = 8.0
+# これより古い未送信の操作は送らずに失敗扱いにする（アンケート開始などは遅れると意味がない）。
+OUTBOX_MAX_AGE_SEC = 300.0
+# 画面側が送信完了を待つ時間。過ぎたら「送信待ち」として画面を返す。
+OUTBOX_FOREGROUND_WAIT_SEC = 3.0
+
+# 受信キューの上限。テキストは履歴の一括投入にも耐える大きさにし、
+# スタンプは連打で溢れたら INGEST_STAMP_OVERFLOW_POLICY（drop_oldest / drop_newest）で捨てる。
+INGEST_TEXT_QUEUE_CAPACITY = 20000
+INGEST_STAMP_QUEUE_CAPACITY = 200
+INGEST_STAMP_OVERFLOW_POLICY = os.environ.get(
+    "BEAVER_STAMP_OVERFLOW_POLICY", "drop_oldest"
+)
+INGEST_MERGE_DUPLICATE_STAMPS = _env_flag("BEAVER_MERGE_DUPLICATE_STAMPS", True)
 
 STAMP_BALLOON_LIFETIME_SEC = 8.0
 STAMP_BALLOON_MIN_SPEED_PX = 90.0
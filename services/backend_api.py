@@ -1,22 +1,260 @@
 from __future__ import annotations
 
-import json
-from collections.abc import Mapping, Sequence
+import dataclasses
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from typing import TypeVar
 from urllib.parse import quote
 
 import requests
 
 from config.constants import (
     BACKEND_BASE_URL,
+    BACKEND_CIRCUIT_FAILURE_THRESHOLD,
+    BACKEND_CIRCUIT_RESET_SEC,
     BACKEND_CLIENT_WS_BASE_URL,
-    BACKEND_HTTP_TIMEOUT_SEC,
+    BACKEND_ENDPOINT_DEFAULT_TIMEOUT_SEC,
+    BACKEND_ENDPOINT_TIMEOUTS_SEC,
+    BACKEND_HTTP_RESPONSE_CACHE_SIZE,
+    BOOTSTRAP_PAGE_SIZE,
+    HTTP_RETRY_BACKOFF_SEC,
+    HTTP_RETRY_TOTAL,
 )
+from services import http_client, json_codec
+from services.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    EndpointPolicy,
+    EndpointStats,
+)
+from services.payload_schema import (
+    KIND_CONVERT,
+    KIND_INT,
+    KIND_INT_LIST,
+    KIND_LIST,
+    KIND_NUMBER,
+    KIND_STR_LIST,
+    Field,
+    compile_schema,
+)
+
+_T = TypeVar("_T")
+_CacheKey = tuple[str, tuple[tuple[str, str], ...]]
 
 
 class BackendApiError(RuntimeError):
     pass
 
 
+class BackendUnavailableError(BackendApiError):
+    """通信断・タイムアウト・5xx など、同じリクエストを送り直せば通りうる失敗。"""
+
+    def __init__(self, message: str, retry_after_sec: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after_sec = retry_after_sec
+
+
+class BackendCircuitOpenError(BackendUnavailableError):
+    """失敗が続いたエンドポイントなので、送らずにすぐ失敗させた。"""
+
+
+# 送り直せば通りうる 4xx。これ以外の 4xx は内容の誤りとして扱う。
+_RETRYABLE_STATUSES = frozenset({408, 425, 429})
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class _CachedResponse:
+    etag: str | None
+    last_modified: str | None
+    value: object
+
+
+class _ResponseCache:
+    """条件付き GET 用に、検証子と正規化済みの結果を URL とクエリごとに覚えておく。"""
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[_CacheKey, _CachedResponse] = OrderedDict()
+
+    def lookup(self, key: _CacheKey) -> _CachedResponse | None:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+            return cached
+
+    def store(
+        self,
+        key: _CacheKey,
+        headers: Mapping[str, str],
+        value: object,
+    ) -> None:
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not isinstance(etag, str):
+            etag = None
+        if not isinstance(last_modified, str):
+            last_modified = None
+        with self._lock:
+            if etag is None and last_modified is None:
+                self._entries.pop(key, None)
+                return
+            self._entries[key] = _CachedResponse(etag, last_modified, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_response_cache = _ResponseCache(BACKEND_HTTP_RESPONSE_CACHE_SIZE)
+
+
+def clear_response_cache() -> None:
+    _response_cache.clear()
+
+
+def _endpoint_policy(timeout_sec: float) -> EndpointPolicy:
+    return EndpointPolicy(
+        timeout_sec=timeout_sec,
+        failure_threshold=BACKEND_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout_sec=BACKEND_CIRCUIT_RESET_SEC,
+    )
+
+
+def _build_breakers() -> CircuitBreakerRegistry:
+    return CircuitBreakerRegistry(
+        _endpoint_policy(BACKEND_ENDPOINT_DEFAULT_TIMEOUT_SEC),
+        {
+            path: _endpoint_policy(timeout_sec)
+            for path, timeout_sec in BACKEND_ENDPOINT_TIMEOUTS_SEC.items()
+        },
+    )
+
+
+_breakers = _build_breakers()
+
+
+def snapshot_endpoint_stats() -> list[EndpointStats]:
+    """呼び出したことのあるエンドポイントごとの状態・件数・所要時間。"""
+    return _breakers.snapshot()
+
+
+def reset_circuit_breakers() -> None:
+    """状態と集計を捨て、タイムアウトの設定を読み直す。"""
+    global _breakers
+    _breakers = _build_breakers()
+
+
+def _send(method: str, path: str, **kwargs: object) -> requests.Response:
+    """path のブレーカーを通して送る。開いていればサーバーへ送らずに失敗させる。
+
+    通信断・タイムアウト・5xx はブレーカーの失敗として数え、POST なら
+    BackendUnavailableError にして送出する。それ以外の応答はそのまま返す。
+    エンドポイントのタイムアウトは再試行も含めた全体の持ち時間で、GET は
+    通信断と 502/503/504 のとき、その残りの中で 1 回ずつブレーカーを通して送り直す。
+    """
+    breaker = _breakers.get(path)
+    url = build_api_url(path)
+    timeout = breaker.policy.timeout_sec
+    deadline = time.monotonic() + timeout
+    retries = HTTP_RETRY_TOTAL if method == "GET" else 0
+    attempt = 0
+    while True:
+        try:
+            breaker.acquire()
+        except CircuitOpenError as exc:
+            raise BackendCircuitOpenError(
+                f"{path} は応答がないため一時的に停止中です"
+                f"（{exc.retry_after_sec:.0f} 秒後に再試行）",
+                retry_after_sec=exc.retry_after_sec,
+            ) from exc
+        response: requests.Response | None = None
+        try:
+            response = _send_once(breaker, method, url, timeout, kwargs)
+        except BackendUnavailableError:
+            if not _can_retry(attempt, retries, deadline):
+                raise
+        else:
+            status = response.status_code
+            if method == "POST" and (status >= 500 or status in _RETRYABLE_STATUSES):
+                raise BackendUnavailableError(f"{status} {response.reason}")
+            if status not in http_client.RETRY_STATUSES or not _can_retry(
+                attempt, retries, deadline
+            ):
+                return response
+        time.sleep(_retry_delay(attempt))
+        attempt += 1
+        timeout = deadline - time.monotonic()
+
+
+def _send_once(
+    breaker: CircuitBreaker,
+    method: str,
+    url: str,
+    timeout: float,
+    kwargs: Mapping[str, object],
+) -> requests.Response:
+    """acquire 済みのブレーカーで 1 回だけ送り、結果を記録する。"""
+    send = http_client.get if method == "GET" else http_client.post
+    started = time.perf_counter()
+    try:
+        response = send(url, timeout=timeout, retry=False, **kwargs)
+    except requests.RequestException as exc:
+        breaker.record_failure(time.perf_counter() - started)
+        raise BackendUnavailableError(f"{method} {url} failed: {exc}") from exc
+    except BaseException:
+        # 想定外の失敗でも、半開の試し送信を握ったままにしない
+        breaker.release()
+        raise
+    elapsed = time.perf_counter() - started
+    if response.status_code >= 500:
+        breaker.record_failure(elapsed)
+    else:
+        breaker.record_success(elapsed)
+    return response
+
+
+def _retry_delay(attempt: int) -> float:
+    return HTTP_RETRY_BACKOFF_SEC * (2**attempt)
+
+
+def _can_retry(attempt: int, retries: int, deadline: float) -> bool:
+    """待ってから送り直しても、持ち時間が残るなら True。"""
+    return attempt < retries and time.monotonic() + _retry_delay(attempt) < deadline
+
+
+def _conditional_get(
+    path: str,
+    params: Mapping[str, str],
+    parse: Callable[[requests.Response], _T],
+) -> _T:
+    """検証子付きで GET し、304 なら前回の正規化結果をそのまま返す。
+
+    キャッシュから返す値は前回の呼び出し元と共有なので、呼び出し側で書き換えないこと。
+    """
+    key = (build_api_url(path), tuple(sorted(params.items())))
+    cached = _response_cache.lookup(key)
+    headers: dict[str, str] = {}
+    if cached is not None:
+        if cached.etag is not None:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified is not None:
+            headers["If-Modified-Since"] = cached.last_modified
+    response = _send("GET", path, params=dict(params), headers=headers)
+    if cached is not None and response.status_code == requests.codes.not_modified:
+        return cached.value  # type: ignore[return-value]
+    value = parse(response)
+    _response_cache.store(key, response.headers, value)
+    return value
+
+
 def build_api_url(path: str) -> str:
     normalized_path = path if path.startswith("/") else f"/{path}"
     return f"{BACKEND_BASE_URL}{normalized_path}"
@@ -32,11 +270,54 @@ def fetch_bootstrap(raw_session: str) -> tuple[str, list[dict[str, object]]]:
     if raw_session.strip():
         params["session"] = raw_session
 
-    response = requests.get(
-        build_api_url("/api/client/bootstrap"),
-        params=params,
-        timeout=BACKEND_HTTP_TIMEOUT_SEC,
-    )
+    payload = _fetch_bootstrap_payload(params)
+    session = _require_string(payload.get("session"), "session")
+    raw_messages = _require_list(payload.get("messages"), "messages")
+    messages = [normalize_comment_item(item) for item in raw_messages]
+    return session, messages
+
+
+def fetch_bootstrap_page(
+    raw_session: str,
+    *,
+    before_id: int | None = None,
+    limit: int = BOOTSTRAP_PAGE_SIZE,
+) -> tuple[str, list[dict[str, object]], bool]:
+    """before_id より古いコメントを新しい側から最大 limit 件、古い順で取得する。
+
+    before_id を省くと最新のページを返す。戻り値の 3 番目はさらに古いコメントが
+    残っているかどうか。ページ指定に対応していないサーバーは全件を返すので、
+    その場合は残りなしとして扱える。
+    """
+    params: dict[str, str] = {"limit": str(limit)}
+    if raw_session.strip():
+        params["session"] = raw_session
+    if before_id is not None:
+        params["beforeId"] = str(before_id)
+
+    payload = _fetch_bootstrap_payload(params)
+    session = _require_string(payload.get("session"), "session")
+    raw_messages = _require_list(payload.get("messages"), "messages")
+    messages = [normalize_comment_item(item) for item in raw_messages]
+    has_more = payload.get("hasMore") is True and len(messages) > 0
+    return session, messages, has_more
+
+
+def iter_older_bootstrap_pages(
+    session: str, before_id: int
+) -> Iterator[list[dict[str, object]]]:
+    """before_id より古い履歴を、新しい側のページから順に取得して返す。"""
+    while True:
+        _session, page, has_more = fetch_bootstrap_page(session, before_id=before_id)
+        yield page
+        page_ids = [m["id"] for m in page if isinstance(m.get("id"), int)]
+        if not has_more or not page_ids or min(page_ids) >= before_id:
+            return
+        before_id = min(page_ids)
+
+
+def _fetch_bootstrap_payload(params: Mapping[str, str]) -> Mapping[str, object]:
+    response = _send("GET", "/api/client/bootstrap", params=dict(params))
     payload = _require_mapping(
         _parse_json_payload(response),
         "bootstrap response",
@@ -46,23 +327,77 @@ def fetch_bootstrap(raw_session: str) -> tuple[str, list[dict[str, object]]]:
         if isinstance(error_message, str) and error_message:
             raise BackendApiError(error_message)
         raise BackendApiError(f"{response.status_code} {response.reason}")
+    return payload
 
-    session = _require_string(payload.get("session"), "session")
-    raw_messages = _require_list(payload.get("messages"), "messages")
-    messages = [normalize_comment_item(item) for item in raw_messages]
-    return session, messages
 
+def fetch_comments_since(
+    session: str, after_id: int
+) -> tuple[list[dict[str, object]], list[dict[str, object]], bool]:
+    """after_id より新しいコメントとリアクション差分を取得する。
 
-def parse_comment_event(raw_message: str) -> dict[str, object] | None:
+    戻り値の 3 番目はサーバーが差分を全件返せたかどうか。False なら
+    呼び出し側はブートストラップをやり直す。
+    """
+    payload = _fetch_bootstrap_payload({"session": session, "afterId": str(after_id)})
+    if _require_string(payload.get("session"), "session") != session:
+        return [], [], False
+    raw_messages = _require_list(payload.get("messages"), "messages")
+    messages = [normalize_comment_item(item) for item in raw_messages]
+    raw_updates = payload.get("reactionUpdates")
+    reaction_updates: list[dict[str, object]] = []
+    if raw_updates is not None:
+        for item in _require_list(raw_updates, "reactionUpdates"):
+            update = _reaction_update_from_payload({"payload": item})
+            if update is not None:
+                reaction_updates.append(update)
+    complete = payload.get("hasMore") is not True
+    return messages, reaction_updates, complete
+
+
+def decode_ws_message(raw_message: str | bytes) -> Mapping[str, object] | None:
     try:
-        payload = json.loads(raw_message)
-    except json.JSONDecodeError:
+        payload = json_codec.loads(raw_message)
+    except ValueError:
         return None
 
     if not isinstance(payload, Mapping):
         return None
-    if payload.get("type") != "comment.created":
+    return payload
+
+
+def parse_ws_event(raw_message: str) -> tuple[str, dict[str, object]] | None:
+    """WS フレームを 1 回だけデコードし、type に対応する正規化結果を返す。"""
+    payload = decode_ws_message(raw_message)
+    if payload is None:
+        return None
+    return normalize_ws_event(payload)
+
+
+def normalize_ws_event(
+    payload: Mapping[str, object],
+) -> tuple[str, dict[str, object]] | None:
+    event_type = payload.get("type")
+    if not isinstance(event_type, str):
+        return None
+    normalizer = _WS_EVENT_NORMALIZERS.get(event_type)
+    if normalizer is None:
+        return None
+    event = normalizer(payload)
+    if event is None:
         return None
+    return event_type, event
+
+
+def parse_comment_event(raw_message: str) -> dict[str, object] | None:
+    payload = decode_ws_message(raw_message)
+    if payload is None or payload.get("type") != "comment.created":
+        return None
+    return _comment_event_from_payload(payload)
+
+
+def _comment_event_from_payload(
+    payload: Mapping[str, object],
+) -> dict[str, object] | None:
     try:
         return normalize_comment_item(payload.get("payload"))
     except BackendApiError:
@@ -86,15 +421,15 @@ def _reaction_total_from_reactions(value: object) -> int:
 
 def parse_reaction_update_event(raw_message: str) -> dict[str, object] | None:
     """comment.reactions.updated を解釈し、注目度のライブ更新に使う。"""
-    try:
-        payload = json.loads(raw_message)
-    except json.JSONDecodeError:
+    payload = decode_ws_message(raw_message)
+    if payload is None or payload.get("type") != "comment.reactions.updated":
         return None
+    return _reaction_update_from_payload(payload)
 
-    if not isinstance(payload, Mapping):
-        return None
-    if payload.get("type") != "comment.reactions.updated":
-        return None
+
+def _reaction_update_from_payload(
+    payload: Mapping[str, object],
+) -> dict[str, object] | None:
     body = payload.get("payload")
     if not isinstance(body, Mapping):
         return None
@@ -112,15 +447,15 @@ def parse_reaction_update_event(raw_message: str) -> dict[str, object] | None:
 
 
 def parse_reaction_mode_event(raw_message: str) -> dict[str, object] | None:
-    try:
-        payload = json.loads(raw_message)
-    except json.JSONDecodeError:
+    payload = decode_ws_message(raw_message)
+    if payload is None or payload.get("type") != "reaction.mode.updated":
         return None
+    return _reaction_mode_from_payload(payload)
 
-    if not isinstance(payload, Mapping):
-        return None
-    if payload.get("type") != "reaction.mode.updated":
-        return None
+
+def _reaction_mode_from_payload(
+    payload: Mapping[str, object],
+) -> dict[str, object] | None:
     body = payload.get("payload")
     if not isinstance(body, Mapping):
         return None
@@ -131,15 +466,15 @@ def parse_reaction_mode_event(raw_message: str) -> dict[str, object] | None:
 
 
 def parse_behavior_event(raw_message: str) -> dict[str, object] | None:
-    try:
-        payload = json.loads(raw_message)
-    except json.JSONDecodeError:
+    payload = decode_ws_message(raw_message)
+    if payload is None or payload.get("type") != "behavior.event.created":
         return None
+    return _behavior_event_from_payload(payload)
 
-    if not isinstance(payload, Mapping):
-        return None
-    if payload.get("type") != "behavior.event.created":
-        return None
+
+def _behavior_event_from_payload(
+    payload: Mapping[str, object],
+) -> dict[str, object] | None:
     body = payload.get("payload")
     if not isinstance(body, Mapping):
         return None
@@ -155,13 +490,15 @@ def parse_behavior_event(raw_message: str) -> dict[str, object] | None:
 
 
 def parse_poll_results_event(raw_message: str) -> dict[str, object] | None:
-    try:
-        payload = json.loads(raw_message)
-    except json.JSONDecodeError:
+    payload = decode_ws_message(raw_message)
+    if payload is None:
         return None
+    return _poll_results_from_payload(payload)
 
-    if not isinstance(payload, Mapping):
-        return None
+
+def _poll_results_from_payload(
+    payload: Mapping[str, object],
+) -> dict[str, object] | None:
     event_type = payload.get("type")
     body = payload.get("payload")
     if not isinstance(event_type, str) or not isinstance(body, Mapping):
@@ -186,38 +523,51 @@ def parse_poll_results_event(raw_message: str) -> dict[str, object] | None:
     return None
 
 
-def normalize_comment_item(value: object) -> dict[str, object]:
-    payload = _require_mapping(value, "comment")
-    stamp = _require_nullable_string(payload.get("stamp"), "stamp")
-    stamp_path = _require_nullable_string(payload.get("stampPath"), "stampPath")
-    created_at = _require_string(payload.get("createdAt"), "createdAt")
-    source = _require_nullable_string(payload.get("source"), "source")
-
-    return {
-        "id": _require_int(payload.get("id"), "id"),
-        "session": _require_string(payload.get("session"), "session"),
-        "name": _require_string(payload.get("name"), "name"),
-        "real_name": _require_string(payload.get("realName"), "realName"),
-        "text": _require_string(payload.get("text"), "text"),
-        "time": _require_string(payload.get("time"), "time"),
-        "stamp": stamp,
-        "stamp_url": stamp_path,
-        "source": source,
-        "created_at": created_at,
-        "server_time_iso": created_at,
-        "bookmark_count": _reaction_total_from_reactions(payload.get("reactions")),
-    }
+_WS_EVENT_NORMALIZERS: dict[
+    str, Callable[[Mapping[str, object]], dict[str, object] | None]
+] = {
+    "comment.created": _comment_event_from_payload,
+    "comment.reactions.updated": _reaction_update_from_payload,
+    "reaction.mode.updated": _reaction_mode_from_payload,
+    "poll.results.displayed": _poll_results_from_payload,
+    "poll.results.hidden": _poll_results_from_payload,
+    "behavior.event.created": _behavior_event_from_payload,
+}
+
+
+normalize_comment_item = compile_schema(
+    "comment",
+    (
+        Field("id", "id", KIND_INT),
+        Field("session", "session"),
+        Field("name", "name"),
+        Field("real_name", "realName"),
+        Field("text", "text"),
+        Field("time", "time"),
+        Field("stamp", "stamp", nullable=True),
+        Field("stamp_url", "stampPath", nullable=True),
+        Field("source", "source", nullable=True),
+        Field("created_at", "createdAt"),
+        Field("server_time_iso", "createdAt"),
+        Field(
+            "bookmark_count",
+            "reactions",
+            KIND_CONVERT,
+            convert=_reaction_total_from_reactions,
+        ),
+    ),
+    error=BackendApiError,
+)
 
 
 def fetch_reaction_mode(session: str) -> dict[str, object]:
     params: dict[str, str] = {}
     if session.strip():
         params["session"] = session
-    response = requests.get(
-        build_api_url("/api/reaction-mode"),
-        params=params,
-        timeout=BACKEND_HTTP_TIMEOUT_SEC,
-    )
+    return _conditional_get("/api/reaction-mode", params, _parse_reaction_mode)
+
+
+def _parse_reaction_mode(response: requests.Response) -> dict[str, object]:
     payload = _require_mapping(_parse_json_payload(response), "reaction mode")
     if response.status_code != requests.codes.ok:
         error_message = payload.get("error")
@@ -227,20 +577,14 @@ def fetch_reaction_mode(session: str) -> dict[str, object]:
     return normalize_reaction_mode(payload)
 
 
-def set_reaction_mode(session: str, mode: str, operator_name: str) -> dict[str, object]:
-    url = build_api_url("/api/client/reaction-mode")
-    try:
-        response = requests.post(
-            url,
-            json={
-                "session": session,
-                "mode": mode,
-                "operatorName": operator_name,
-            },
-            timeout=BACKEND_HTTP_TIMEOUT_SEC,
-        )
-    except requests.RequestException as exc:
-        raise BackendApiError(f"POST {url} failed: {exc}") from exc
+def set_reaction_mode(
+    session: str, mode: str, operator_name: str, *, request_id: str | None = None
+) -> dict[str, object]:
+    response = _post(
+        "/api/client/reaction-mode",
+        {"session": session, "mode": mode, "operatorName": operator_name},
+        request_id=request_id,
+    )
     payload = _require_mapping(_parse_json_payload(response), "reaction mode")
     if response.status_code != requests.codes.ok:
         error_message = payload.get("error")
@@ -253,15 +597,10 @@ def set_reaction_mode(session: str, mode: str, operator_name: str) -> dict[str,
 def generate_sakura_names(
     session: str, participant_names: Sequence[str]
 ) -> list[str]:
-    url = build_api_url("/api/client/sakura-names/generate")
-    try:
-        response = requests.post(
-            url,
-            json={"session": session, "participantNames": list(participant_names)},
-            timeout=BACKEND_HTTP_TIMEOUT_SEC,
-        )
-    except requests.RequestException as exc:
-        raise BackendApiError(f"POST {url} failed: {exc}") from exc
+    response = _post(
+        "/api/client/sakura-names/generate",
+        {"session": session, "participantNames": list(participant_names)},
+    )
     payload = _require_mapping(_parse_json_payload(response), "sakura names")
     if response.status_code != requests.codes.ok:
         error_message = payload.get("error")
@@ -272,22 +611,23 @@ def generate_sakura_names(
 
 
 def post_sakura_comment(
-    session: str, display_name: str, text: str, operator_name: str
+    session: str,
+    display_name: str,
+    text: str,
+    operator_name: str,
+    *,
+    request_id: str | None = None,
 ) -> dict[str, object]:
-    url = build_api_url("/api/client/sakura-comments")
-    try:
-        response = requests.post(
-            url,
-            json={
-                "session": session,
-                "displayName": display_name,
-                "text": text,
-                "operatorName": operator_name,
-            },
-            timeout=BACKEND_HTTP_TIMEOUT_SEC,
-        )
-    except requests.RequestException as exc:
-        raise BackendApiError(f"POST {url} failed: {exc}") from exc
+    response = _post(
+        "/api/client/sakura-comments",
+        {
+            "session": session,
+            "displayName": display_name,
+            "text": text,
+            "operatorName": operator_name,
+        },
+        request_id=request_id,
+    )
     payload = _parse_json_payload(response)
     if response.status_code != requests.codes.created:
         if isinstance(payload, Mapping):
@@ -304,17 +644,29 @@ def fetch_behavior_events(
     limit: int = 100,
     event_type: str = "",
     actor_real_name: str = "",
+    after_id: int | None = None,
+    before_id: int | None = None,
 ) -> list[dict[str, object]]:
+    """行動ログを新しい順で最大 limit 件取得する。
+
+    after_id を渡すとそれより新しいもののうち古い側から、before_id を渡すと
+    それより古いもののうち新しい側から limit 件を返す。
+    """
     params: dict[str, str] = {"session": session, "limit": str(limit)}
+    if after_id is not None:
+        params["afterId"] = str(after_id)
+    if before_id is not None:
+        params["beforeId"] = str(before_id)
     if event_type.strip():
         params["eventType"] = event_type.strip()
     if actor_real_name.strip():
         params["actorRealName"] = actor_real_name.strip()
-    response = requests.get(
-        build_api_url("/api/client/behavior-events"),
-        params=params,
-        timeout=BACKEND_HTTP_TIMEOUT_SEC,
+    return _conditional_get(
+        "/api/client/behavior-events", params, _parse_behavior_events
     )
+
+
+def _parse_behavior_events(response: requests.Response) -> list[dict[str, object]]:
     payload = _parse_json_payload(response)
     if response.status_code != requests.codes.ok:
         if isinstance(payload, Mapping):
@@ -326,47 +678,50 @@ def fetch_behavior_events(
     return [normalize_behavior_event(item) for item in raw_events]
 
 
-def normalize_reaction_mode(value: object) -> dict[str, object]:
-    payload = _require_mapping(value, "reaction mode")
-    raw_types = _require_list(payload.get("reactionTypes"), "reactionTypes")
-    return {
-        "session": _require_string(payload.get("session"), "session"),
-        "mode": _require_string(payload.get("mode"), "mode"),
-        "reaction_types": [normalize_reaction_type(item) for item in raw_types],
-    }
-
+normalize_reaction_type = compile_schema(
+    "reaction type",
+    (
+        Field("key", "key"),
+        Field("label", "label"),
+        Field("emoji", "emoji"),
+    ),
+    error=BackendApiError,
+)
 
-def normalize_reaction_type(value: object) -> dict[str, str]:
-    payload = _require_mapping(value, "reaction type")
-    return {
-        "key": _require_string(payload.get("key"), "key"),
-        "label": _require_string(payload.get("label"), "label"),
-        "emoji": _require_string(payload.get("emoji"), "emoji"),
-    }
+normalize_reaction_mode = compile_schema(
+    "reaction mode",
+    (
+        Field("session", "session"),
+        Field("mode", "mode"),
+        Field(
+            "reaction_types", "reactionTypes", KIND_LIST, item=normalize_reaction_type
+        ),
+    ),
+    error=BackendApiError,
+)
 
 
-def normalize_behavior_event(value: object) -> dict[str, object]:
-    payload = _require_mapping(value, "behavior event")
-    payload_json = payload.get("payload")
-    if not isinstance(payload_json, Mapping):
-        payload_json = {}
-    return {
-        "id": _require_int(payload.get("id"), "id"),
-        "session": _require_string(payload.get("session"), "session"),
-        "actor_type": _require_string(payload.get("actorType"), "actorType"),
-        "actor_name": _require_string(payload.get("actorName"), "actorName"),
-        "actor_real_name": _require_string(
-            payload.get("actorRealName"), "actorRealName"
-        ),
-        "event_type": _require_string(payload.get("eventType"), "eventType"),
-        "target_type": _require_nullable_string(
-            payload.get("targetType"), "targetType"
-        ),
-        "target_id": _require_nullable_int(payload.get("targetId"), "targetId"),
-        "occurred_at": _require_string(payload.get("occurredAt"), "occurredAt"),
-        "received_at": _require_string(payload.get("receivedAt"), "receivedAt"),
-        "payload": dict(payload_json),
-    }
+def _payload_dict(value: object) -> dict[str, object]:
+    return dict(value) if isinstance(value, Mapping) else {}
+
+
+normalize_behavior_event = compile_schema(
+    "behavior event",
+    (
+        Field("id", "id", KIND_INT),
+        Field("session", "session"),
+        Field("actor_type", "actorType"),
+        Field("actor_name", "actorName"),
+        Field("actor_real_name", "actorRealName"),
+        Field("event_type", "eventType"),
+        Field("target_type", "targetType", nullable=True),
+        Field("target_id", "targetId", KIND_INT, nullable=True),
+        Field("occurred_at", "occurredAt"),
+        Field("received_at", "receivedAt"),
+        Field("payload", "payload", KIND_CONVERT, convert=_payload_dict),
+    ),
+    error=BackendApiError,
+)
 
 
 # === アンケート（poll）===
@@ -377,11 +732,10 @@ def fetch_polls(session: str) -> list[dict[str, object]]:
     params: dict[str, str] = {}
     if session.strip():
         params["session"] = session
-    response = requests.get(
-        build_api_url("/api/client/polls"),
-        params=params,
-        timeout=BACKEND_HTTP_TIMEOUT_SEC,
-    )
+    return _conditional_get("/api/client/polls", params, _parse_polls)
+
+
+def _parse_polls(response: requests.Response) -> list[dict[str, object]]:
     payload = _parse_json_payload(response)
     if response.status_code != requests.codes.ok:
         if isinstance(payload, Mapping):
@@ -394,22 +748,23 @@ def fetch_polls(session: str) -> list[dict[str, object]]:
 
 
 def create_poll(
-    session: str, question: str, options: Sequence[str], duration_sec: int
+    session: str,
+    question: str,
+    options: Sequence[str],
+    duration_sec: int,
+    *,
+    request_id: str | None = None,
 ) -> dict[str, object]:
-    url = build_api_url("/api/client/polls")
-    try:
-        response = requests.post(
-            url,
-            json={
-                "session": session,
-                "question": question,
-                "options": list(options),
-                "durationSec": duration_sec,
-            },
-            timeout=BACKEND_HTTP_TIMEOUT_SEC,
-        )
-    except requests.RequestException as exc:
-        raise BackendApiError(f"POST {url} failed: {exc}") from exc
+    response = _post(
+        "/api/client/polls",
+        {
+            "session": session,
+            "question": question,
+            "options": list(options),
+            "durationSec": duration_sec,
+        },
+        request_id=request_id,
+    )
     payload = _require_mapping(_parse_json_payload(response), "poll response")
     if response.status_code != requests.codes.created:
         error_message = payload.get("error")
@@ -419,16 +774,14 @@ def create_poll(
     return normalize_poll_item(payload)
 
 
-def start_poll(session: str, poll_id: int) -> dict[str, object]:
-    url = build_api_url("/api/client/polls/start")
-    try:
-        response = requests.post(
-            url,
-            json={"session": session, "pollId": poll_id},
-            timeout=BACKEND_HTTP_TIMEOUT_SEC,
-        )
-    except requests.RequestException as exc:
-        raise BackendApiError(f"POST {url} failed: {exc}") from exc
+def start_poll(
+    session: str, poll_id: int, *, request_id: str | None = None
+) -> dict[str, object]:
+    response = _post(
+        "/api/client/polls/start",
+        {"session": session, "pollId": poll_id},
+        request_id=request_id,
+    )
     payload = _require_mapping(_parse_json_payload(response), "poll start response")
     if response.status_code != requests.codes.ok:
         error_message = payload.get("error")
@@ -446,11 +799,12 @@ def fetch_poll_results(
         params["runId"] = str(run_id)
     if session and session.strip():
         params["session"] = session
-    response = requests.get(
-        build_api_url("/api/client/poll-results"),
-        params=params,
-        timeout=BACKEND_HTTP_TIMEOUT_SEC,
+    return _conditional_get(
+        "/api/client/poll-results", params, _parse_poll_results
     )
+
+
+def _parse_poll_results(response: requests.Response) -> dict[str, object]:
     payload = _require_mapping(_parse_json_payload(response), "poll results")
     if response.status_code != requests.codes.ok:
         error_message = payload.get("error")
@@ -461,9 +815,13 @@ def fetch_poll_results(
 
 
 def set_poll_results_display(
-    session: str, poll_id: int, target: str, run_id: int | None = None
+    session: str,
+    poll_id: int,
+    target: str,
+    run_id: int | None = None,
+    *,
+    request_id: str | None = None,
 ) -> dict[str, object]:
-    url = build_api_url("/api/client/poll-results/display")
     payload: dict[str, object] = {
         "session": session,
         "pollId": poll_id,
@@ -471,14 +829,9 @@ def set_poll_results_display(
     }
     if run_id is not None:
         payload["runId"] = run_id
-    try:
-        response = requests.post(
-            url,
-            json=payload,
-            timeout=BACKEND_HTTP_TIMEOUT_SEC,
-        )
-    except requests.RequestException as exc:
-        raise BackendApiError(f"POST {url} failed: {exc}") from exc
+    response = _post(
+        "/api/client/poll-results/display", payload, request_id=request_id
+    )
     result = _require_mapping(_parse_json_payload(response), "poll display response")
     if response.status_code != requests.codes.ok:
         error_message = result.get("error")
@@ -488,74 +841,83 @@ def set_poll_results_display(
     return dict(result)
 
 
-def normalize_poll_item(value: object) -> dict[str, object]:
-    payload = _require_mapping(value, "poll")
-    return {
-        "id": _require_int(payload.get("id"), "id"),
-        "session": _require_string(payload.get("session"), "session"),
-        "question": _require_string(payload.get("question"), "question"),
-        "options": _require_string_list(payload.get("options"), "options"),
-        "duration_sec": _require_int(payload.get("durationSec"), "durationSec"),
-        "created_at": _require_string(payload.get("createdAt"), "createdAt"),
-    }
-
+normalize_poll_item = compile_schema(
+    "poll",
+    (
+        Field("id", "id", KIND_INT),
+        Field("session", "session"),
+        Field("question", "question"),
+        Field("options", "options", KIND_STR_LIST),
+        Field("duration_sec", "durationSec", KIND_INT),
+        Field("created_at", "createdAt"),
+    ),
+    error=BackendApiError,
+)
 
-def normalize_poll_started(value: object) -> dict[str, object]:
-    payload = _require_mapping(value, "poll started")
-    return {
-        "poll_id": _require_int(payload.get("pollId"), "pollId"),
-        "run_id": _require_int(payload.get("runId"), "runId"),
-        "session": _require_string(payload.get("session"), "session"),
-        "question": _require_string(payload.get("question"), "question"),
-        "options": _require_string_list(payload.get("options"), "options"),
-        "duration_sec": _require_int(payload.get("durationSec"), "durationSec"),
-        "started_at": _require_string(payload.get("startedAt"), "startedAt"),
-    }
+normalize_poll_started = compile_schema(
+    "poll started",
+    (
+        Field("poll_id", "pollId", KIND_INT),
+        Field("run_id", "runId", KIND_INT),
+        Field("session", "session"),
+        Field("question", "question"),
+        Field("options", "options", KIND_STR_LIST),
+        Field("duration_sec", "durationSec", KIND_INT),
+        Field("started_at", "startedAt"),
+    ),
+    error=BackendApiError,
+)
 
+normalize_poll_answer = compile_schema(
+    "poll answer",
+    (
+        Field("name", "name"),
+        Field("real_name", "realName"),
+        Field("option_index", "optionIndex", KIND_INT),
+        Field("response_ms", "responseMs", KIND_INT),
+        Field("client_elapsed_ms", "clientElapsedMs", KIND_INT, nullable=True),
+        Field("created_at", "createdAt"),
+    ),
+    error=BackendApiError,
+)
 
-def normalize_poll_answer(value: object) -> dict[str, object]:
-    payload = _require_mapping(value, "poll answer")
-    return {
-        "name": _require_string(payload.get("name"), "name"),
-        "real_name": _require_string(payload.get("realName"), "realName"),
-        "option_index": _require_int(payload.get("optionIndex"), "optionIndex"),
-        "response_ms": _require_int(payload.get("responseMs"), "responseMs"),
-        "client_elapsed_ms": _require_nullable_int(
-            payload.get("clientElapsedMs"), "clientElapsedMs"
+normalize_poll_results = compile_schema(
+    "poll results",
+    (
+        Field("poll_id", "pollId", KIND_INT),
+        Field("run_id", "runId", KIND_INT),
+        Field("question", "question"),
+        Field("options", "options", KIND_STR_LIST),
+        Field("duration_sec", "durationSec", KIND_INT),
+        Field("started_at", "startedAt"),
+        Field("delivered_count", "deliveredCount", KIND_INT),
+        Field("answer_count", "answerCount", KIND_INT),
+        Field("answer_rate", "answerRate", KIND_NUMBER),
+        Field("average_response_ms", "averageResponseMs", KIND_NUMBER, nullable=True),
+        Field(
+            "option_counts", "optionCounts", KIND_INT_LIST, item_label="optionCount"
         ),
-        "created_at": _require_string(payload.get("createdAt"), "createdAt"),
-    }
+        Field("answers", "answers", KIND_LIST, item=normalize_poll_answer),
+    ),
+    error=BackendApiError,
+)
 
 
-def normalize_poll_results(value: object) -> dict[str, object]:
-    payload = _require_mapping(value, "poll results")
-    raw_counts = _require_list(payload.get("optionCounts"), "optionCounts")
-    option_counts = [_require_int(item, "optionCount") for item in raw_counts]
-    raw_answers = _require_list(payload.get("answers"), "answers")
-    answers = [normalize_poll_answer(item) for item in raw_answers]
-    return {
-        "poll_id": _require_int(payload.get("pollId"), "pollId"),
-        "run_id": _require_int(payload.get("runId"), "runId"),
-        "question": _require_string(payload.get("question"), "question"),
-        "options": _require_string_list(payload.get("options"), "options"),
-        "duration_sec": _require_int(payload.get("durationSec"), "durationSec"),
-        "started_at": _require_string(payload.get("startedAt"), "startedAt"),
-        "delivered_count": _require_int(
-            payload.get("deliveredCount"), "deliveredCount"
-        ),
-        "answer_count": _require_int(payload.get("answerCount"), "answerCount"),
-        "answer_rate": _require_number(payload.get("answerRate"), "answerRate"),
-        "average_response_ms": _require_nullable_number(
-            payload.get("averageResponseMs"), "averageResponseMs"
-        ),
-        "option_counts": option_counts,
-        "answers": answers,
-    }
+def _post(
+    path: str, body: Mapping[str, object], *, request_id: str | None = None
+) -> requests.Response:
+    """POST を送る。request_id を渡すと本文と Idempotency-Key に載せ、
+    サーバーが同じ操作を二重に適用しないようにする。"""
+    headers: dict[str, str] = {}
+    if request_id is not None:
+        body = {**body, "requestId": request_id}
+        headers["Idempotency-Key"] = request_id
+    return _send("POST", path, json=body, headers=headers)
 
 
 def _parse_json_payload(response: requests.Response) -> object:
     try:
-        payload = response.json()
+        payload = json_codec.loads(response.content)
     except ValueError as exc:
         raise BackendApiError(f"{response.status_code} {response.reason}") from exc
 
@@ -580,36 +942,6 @@ def _require_string(value: object, field_name: str) -> str:
     return value
 
 
-def _require_nullable_string(value: object, field_name: str) -> str | None:
-    if value is None:
-        return None
-    return _require_string(value, field_name)
-
-
-def _require_int(value: object, field_name: str) -> int:
-    if isinstance(value, bool) or not isinstance(value, int):
-        raise BackendApiError(f"{field_name} is invalid")
-    return value
-
-
-def _require_nullable_int(value: object, field_name: str) -> int | None:
-    if value is None:
-        return None
-    return _require_int(value, field_name)
-
-
-def _require_number(value: object, field_name: str) -> float:
-    if isinstance(value, bool) or not isinstance(value, (int, float)):
-        raise BackendApiError(f"{field_name} is invalid")
-    return float(value)
-
-
-def _require_nullable_number(value: object, field_name: str) -> float | None:
-    if value is None:
-        return None
-    return _require_number(value, field_name)
-
-
 def _require_string_list(value: object, field_name: str) -> list[str]:
     items = _require_list(value, field_name)
     result: list[str] = []
@@ -0,0 +1,62 @@
+"""トラッキングログを手元のログとの差分だけ取得する。
+
+最新側は取得 API で途切れなく取り込めた最大 id より新しい分をページ単位で追いかけ、
+古い側は最古 id より古い分を 1 ページずつ遡る。WebSocket で先に届いたイベントは
+起点に使わず（その手前が抜けているかもしれないため）、id で重複を除くだけにする。
+どちらも画面のワーカーから呼ぶ前提で、通信はブロッキングで行う。
+"""
+
+from __future__ import annotations
+
+from config.constants import BEHAVIOR_EVENT_PAGE_SIZE
+from services.backend_api import fetch_behavior_events
+from state import app_state as state
+
+
+def _max_id(events: list[dict[str, object]]) -> int:
+    return max(int(event["id"]) for event in events)  # type: ignore[call-overload]
+
+
+def sync_latest(session: str, *, page_size: int = BEHAVIOR_EVENT_PAGE_SIZE) -> int:
+    """取得済みの範囲より新しいログを取り込み、増えた件数を返す。
+
+    まだ取得していなければ最新の 1 ページから始める。手元が 1 ページに満たなければ
+    1 ページ分だけ遡り、開いた直後から最近のログが見えるようにする。
+    """
+    bounds = state.behavior_event_bounds(session)
+    if bounds.synced_id is None:
+        page = fetch_behavior_events(session, limit=page_size)
+        return state.merge_behavior_events(
+            session,
+            page,
+            has_older=len(page) >= page_size,
+            # 空ならサーバーにまだログがない。次からは先頭から追いかける
+            synced_through=_max_id(page) if page else 0,
+        )
+    added = 0
+    synced_id = bounds.synced_id
+    while True:
+        page = fetch_behavior_events(session, limit=page_size, after_id=synced_id)
+        if page and _max_id(page) <= synced_id:
+            # afterId を無視するサーバーなどで先へ進まない。同じページを取り続けないよう打ち切る
+            added += state.merge_behavior_events(session, page)
+            break
+        if page:
+            synced_id = _max_id(page)
+        added += state.merge_behavior_events(session, page, synced_through=synced_id)
+        if len(page) < page_size:
+            break
+    if bounds.count < page_size and bounds.has_older:
+        added += load_older(session, page_size=page_size)
+    return added
+
+
+def load_older(session: str, *, page_size: int = BEHAVIOR_EVENT_PAGE_SIZE) -> int:
+    """手元の最古より古いログを 1 ページ取り込み、増えた件数を返す。"""
+    bounds = state.behavior_event_bounds(session)
+    if bounds.oldest_id is None:
+        return sync_latest(session, page_size=page_size)
+    if not bounds.has_older:
+        return 0
+    page = fetch_behavior_events(session, limit=page_size, before_id=bounds.oldest_id)
+    return state.merge_behavior_events(session, page, has_older=len(page) >= page_size)
@@ -0,0 +1,180 @@
+"""エンドポイントごとのサーキットブレーカーと、呼び出しの所要時間・失敗の集計。
+
+失敗（通信断・タイムアウト・5xx）が続いたエンドポイントは一定時間「開」にし、
+その間の呼び出しはサーバーへ送らずにすぐ失敗させる。時間が過ぎたら「半開」にして
+1 件だけ試しに通し、成功すれば閉じ、失敗すればまた開く。
+弱ったサーバーにクリックのたびタイムアウトまで待たされ続けないようにする。
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import threading
+import time
+from collections.abc import Callable, Mapping
+
+from services.metrics import LatencyHistogram, LatencySnapshot
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """ブレーカーが開いているので呼び出さなかった。"""
+
+    def __init__(self, name: str, retry_after_sec: float) -> None:
+        super().__init__(f"{name} is unavailable")
+        self.name = name
+        self.retry_after_sec = retry_after_sec
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class EndpointPolicy:
+    timeout_sec: float
+    # 連続でこの回数失敗したら開く
+    failure_threshold: int
+    # 開いてから試しに 1 件通すまでの秒数
+    reset_timeout_sec: float
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class EndpointStats:
+    name: str
+    state: str
+    calls: int
+    failures: int
+    rejected: int
+    consecutive_failures: int
+    retry_after_sec: float | None
+    latency: LatencySnapshot
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        policy: EndpointPolicy,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.policy = policy
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._consecutive_failures = 0
+        self._calls = 0
+        self._failures = 0
+        self._rejected = 0
+        self._latency = LatencyHistogram()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def acquire(self) -> None:
+        """呼び出してよければ戻り、開いていれば CircuitOpenError を送出する。
+
+        戻ったら、結果に応じて record_success か record_failure、結果が出せなければ
+        release を必ず呼ぶ。
+        """
+        with self._lock:
+            if self._state == STATE_CLOSED:
+                return
+            if self._state == STATE_OPEN:
+                remaining = (
+                    self._opened_at + self.policy.reset_timeout_sec - self._clock()
+                )
+                if remaining > 0:
+                    self._rejected += 1
+                    raise CircuitOpenError(self.name, remaining)
+                self._state = STATE_HALF_OPEN
+                self._probe_in_flight = False
+            # 半開では試しの 1 件だけ通し、結果が出るまで他は断る
+            if self._probe_in_flight:
+                self._rejected += 1
+                raise CircuitOpenError(self.name, self.policy.reset_timeout_sec)
+            self._probe_in_flight = True
+
+    def record_success(self, elapsed_sec: float) -> None:
+        self._latency.record(elapsed_sec)
+        with self._lock:
+            self._calls += 1
+            self._consecutive_failures = 0
+            self._state = STATE_CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self, elapsed_sec: float) -> None:
+        self._latency.record(elapsed_sec)
+        with self._lock:
+            self._calls += 1
+            self._failures += 1
+            self._consecutive_failures += 1
+            self._probe_in_flight = False
+            if (
+                self._state == STATE_HALF_OPEN
+                or self._consecutive_failures >= self.policy.failure_threshold
+            ):
+                self._state = STATE_OPEN
+                self._opened_at = self._clock()
+
+    def release(self) -> None:
+        """結果を記録せずに呼び出しを終える。半開なら次の試しの 1 件を通せるようにする。"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def snapshot(self) -> EndpointStats:
+        with self._lock:
+            retry_after: float | None = None
+            if self._state == STATE_OPEN:
+                retry_after = max(
+                    0.0,
+                    self._opened_at + self.policy.reset_timeout_sec - self._clock(),
+                )
+            return EndpointStats(
+                name=self.name,
+                state=self._state,
+                calls=self._calls,
+                failures=self._failures,
+                rejected=self._rejected,
+                consecutive_failures=self._consecutive_failures,
+                retry_after_sec=retry_after,
+                latency=self._latency.snapshot(),
+            )
+
+
+class CircuitBreakerRegistry:
+    """名前ごとのブレーカーを必要になった時点で作って持つ。"""
+
+    def __init__(
+        self,
+        default_policy: EndpointPolicy,
+        policies: Mapping[str, EndpointPolicy] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._default_policy = default_policy
+        self._policies = dict(policies or {})
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                policy = self._policies.get(name, self._default_policy)
+                breaker = CircuitBreaker(name, policy, self._clock)
+                self._breakers[name] = breaker
+            return breaker
+
+    def snapshot(self) -> list[EndpointStats]:
+        with self._lock:
+            breakers = sorted(self._breakers.values(), key=lambda b: b.name)
+        return [breaker.snapshot() for breaker in breakers]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._breakers.clear()
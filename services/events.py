@@ -1,73 +1,126 @@
 from __future__ import annotations
 
-import queue
-import socket
-import ssl
+import concurrent.futures
 import threading
-from urllib.parse import urlsplit
+import time
+from collections.abc import Callable
 from tkinter import messagebox
 
-from wsproto import WSConnection
-from wsproto.connection import ConnectionType
-from wsproto.events import (
-    AcceptConnection,
-    CloseConnection,
-    Ping,
-    RejectConnection,
-    RejectData,
-    Request,
-    TextMessage,
+from config.constants import (
+    BACKEND_WS_ORIGIN,
+    WS_RECORD_DIR,
+    WS_REPLAY_SPEED,
 )
-
-from config.constants import BACKEND_HTTP_TIMEOUT_SEC, BACKEND_WS_ORIGIN
 from state import app_state as state
-from ui.overlay import should_drop_on_arrival
+from ui.comment_ui import comment_entry_from_message
+from ui.overlay import annotate_entry, is_stamp, should_drop_on_arrival
+from services import session_pipeline
 from services.backend_api import (
     BackendApiError,
     build_ws_url,
-    fetch_bootstrap,
     fetch_reaction_mode,
-    parse_comment_event,
-    parse_behavior_event,
-    parse_poll_results_event,
-    parse_reaction_mode_event,
-    parse_reaction_update_event,
+    parse_ws_event,
+)
+from services.live_buffer import LiveFrameBuffer
+from services.metrics import LatencyHistogram, MessageLatencyTracker
+from services.reaction_coalescer import ReactionCoalescer
+from services.ws_recorder import (
+    FrameRecorder,
+    read_recording,
+    recording_path,
+    replay_frames,
+)
+from services.ws_transport import (
+    CONNECTION_BACKING_OFF,
+    CONNECTION_CONNECTING,
+    CONNECTION_DEGRADED,
+    CONNECTION_OPEN,
+    ConnectionHealth,
+    ConnectionStats,
+    MessageDispatcher,
+    WebSocketRejected,
+    get_engine,
+    run_reconnecting_connection,
 )
 
 _connection_lock = threading.Lock()
 _connection_serial = 0
-_active_socket: socket.socket | None = None
-_active_stop_event: threading.Event | None = None
+# 履歴を置き換えるたびに進め、古い履歴の遡り取得を打ち切る目印にする。
+_history_epoch = 0
+_active_connection: concurrent.futures.Future[None] | None = None
+_active_connection_session: str | None = None
+# 履歴の取得が終わるまで、ライブのフレームはここに溜めておく。
+_live_buffer = LiveFrameBuffer()
+# 受信フレームの記録。connect_session 1 回につき 1 ファイルで、セッション名が確定してから開く。
+_recorder: FrameRecorder | None = None
+_connection_health = ConnectionHealth()
+rtt_histogram = LatencyHistogram()
+message_latency = MessageLatencyTracker()
+_reaction_coalescer = ReactionCoalescer(state.apply_reaction_updates)
 
 
 def _on_history(data):
+    global _history_epoch
+    with _connection_lock:
+        _history_epoch += 1
     if isinstance(data, list):
         filtered: list[dict] = []
         queued_entries: list[dict] = []
+        state.reset_comment_cursor()
         for message in data:
+            state.advance_comment_cursor(message.get("id"))
             if should_drop_on_arrival(message):
                 continue
             filtered.append(message)
             entry = dict(message)
             entry["_from_history"] = True
             queued_entries.append(entry)
-        state.message_log.clear()
-        state.message_log.extend(filtered)
-        while True:
-            try:
-                state.message_queue.get_nowait()
-            except queue.Empty:
-                break
+        state.replace_message_log(filtered)
+        state.message_queue.clear()
         for entry in queued_entries:
             state.message_queue.put(entry)
 
 
-def _on_new_comment(entry):
-    if isinstance(entry, dict):
-        if should_drop_on_arrival(entry):
-            return
-        state.message_log.append(entry)
-        state.message_queue.put(entry)
+def _on_history_backfill(data: list[dict]) -> None:
+    """遡って取得した古い履歴を、表示中の一覧の先頭へまとめて足す。"""
+    added = state.prepend_message_log(
+        [message for message in data if not should_drop_on_arrival(message)]
+    )
+    entries = []
+    for message in added:
+        entry = annotate_entry(message)
+        if is_stamp(entry):
+            continue
+        comment_entry = comment_entry_from_message(entry)
+        if comment_entry is not None:
+            entries.append(comment_entry)
+    state.prepend_messages(entries)
+
+
+def _on_new_comment(entry) -> bool:
+    """表示待ちに積んだら True。受信済みや到着時に落とすコメントなら False。"""
+    if not isinstance(entry, dict):
+        return False
+    comment_id = entry.get("id")
+    state.advance_comment_cursor(comment_id)
+    if should_drop_on_arrival(entry) or not state.append_message_log(entry):
+        if isinstance(comment_id, int):
+            message_latency.discard(comment_id)
+        return False
+    if isinstance(comment_id, int):
+        message_latency.mark(comment_id, "enqueued")
+    # 溢れて捨てられた分は _forget_dropped_entry が計測から外す
+    state.message_queue.put(entry)
+    return True
+
+
+def _forget_dropped_entry(entry: dict[str, object]) -> None:
+    comment_id = entry.get("id")
+    if isinstance(comment_id, int):
+        message_latency.discard(comment_id)
+
+
+state.message_queue.set_drop_listener(_forget_dropped_entry)
 
 
 def _on_reaction_update(update: dict) -> None:
@@ -75,7 +128,7 @@ def _on_reaction_update(update: dict) -> None:
     bookmark_count = update.get("bookmark_count")
     if not isinstance(comment_id, int) or not isinstance(bookmark_count, int):
         return
-    state.apply_reaction_update(comment_id, bookmark_count)
+    _reaction_coalescer.submit(comment_id, bookmark_count)
 
 
 def _on_reaction_mode_update(update: dict) -> None:
@@ -111,6 +164,34 @@ def _on_poll_results_event(event: dict) -> None:
     state.set_visible_poll_results(None)
 
 
+_WS_EVENT_HANDLERS: dict[str, Callable[[dict], object]] = {
+    "comment.created": _on_new_comment,
+    "comment.reactions.updated": _on_reaction_update,
+    "reaction.mode.updated": _on_reaction_mode_update,
+    "poll.results.displayed": _on_poll_results_event,
+    "poll.results.hidden": _on_poll_results_event,
+    "behavior.event.created": _on_behavior_event,
+}
+
+
+def _dispatch_ws_message(
+    message: str, session: str, received_at: float | None = None
+) -> None:
+    parsed = parse_ws_event(message)
+    if parsed is None:
+        return
+    event_type, event = parsed
+    if event.get("session") != session:
+        return
+    if received_at is not None and event_type == "comment.created":
+        comment_id = event.get("id")
+        if isinstance(comment_id, int):
+            message_latency.begin(comment_id, received_at, time.perf_counter())
+    handler = _WS_EVENT_HANDLERS.get(event_type)
+    if handler is not None:
+        handler(event)
+
+
 def _next_connection_serial() -> int:
     global _connection_serial
     with _connection_lock:
@@ -124,255 +205,266 @@ def _is_current_serial(serial: int) -> bool:
 
 
 def _clear_message_queue() -> None:
-    while True:
-        try:
-            state.message_queue.get_nowait()
-        except queue.Empty:
-            return
+    state.message_queue.clear()
 
 
-def _set_active_socket(
-    serial: int, stop_event: threading.Event, sock: socket.socket
-) -> None:
-    global _active_socket, _active_stop_event
+def _clear_active_connection(serial: int, session: str) -> None:
+    global _active_connection, _active_connection_session
     with _connection_lock:
-        if serial != _connection_serial:
-            return
-        _active_socket = sock
-        _active_stop_event = stop_event
+        if serial == _connection_serial and _active_connection_session == session:
+            _active_connection = None
+            _active_connection_session = None
 
 
-def _clear_active_socket(serial: int, sock: socket.socket) -> None:
-    global _active_socket, _active_stop_event
+def _start_websocket(
+    target: _PrimarySession, session: str, opened: threading.Event | None = None
+) -> bool:
+    """このセッションの WebSocket を開く。同じ接続番号の古い接続があれば置き換える。"""
+    global _active_connection, _active_connection_session
     with _connection_lock:
-        if serial != _connection_serial:
-            return
-        if _active_socket is sock:
-            _active_socket = None
-            _active_stop_event = None
+        if target.serial != _connection_serial:
+            return False
+        previous = _active_connection
+        _active_connection = get_engine().submit(
+            _run_websocket(target, session, opened)
+        )
+        _active_connection_session = session
+    if previous is not None:
+        previous.cancel()
+    return True
+
+
+def _open_recorder(session: str, serial: int) -> None:
+    """WS_RECORD_DIR があれば、確定したセッション名で記録を始める。"""
+    global _recorder
+    if not WS_RECORD_DIR:
+        return
+    try:
+        recorder = FrameRecorder(
+            recording_path(WS_RECORD_DIR, session),
+            session=session,
+            clock=time.perf_counter,
+        )
+    except OSError:
+        return
+    with _connection_lock:
+        if serial == _connection_serial:
+            recorder, _recorder = _recorder, recorder
+    if recorder is not None:
+        recorder.close()
+
+
+def _record_frame(message: str, received_at: float) -> None:
+    with _connection_lock:
+        recorder = _recorder
+    if recorder is not None:
+        recorder.record(message, received_at=received_at)
+
+
+class _PrimarySession:
+    """主セッションの 1 回の接続。connect_session のたびに接続番号ごとに作る。"""
+
+    def __init__(self, serial: int, session: str) -> None:
+        self.serial = serial
+        self.session = session
+        self.live_buffer = _live_buffer
+
+    def is_current(self) -> bool:
+        return _is_current_serial(self.serial)
+
+    def is_subscribing(self, session: str) -> bool:
+        with _connection_lock:
+            return (
+                self.serial == _connection_serial
+                and _active_connection_session == session
+            )
+
+    def start_socket(self, session: str, opened: threading.Event) -> bool:
+        return _start_websocket(self, session, opened)
+
+    def set_session(self, session: str) -> None:
+        self.session = session
+        _open_recorder(session, self.serial)
+        state.CURRENT_SESSION = session
+        state.session_ready = True
+        state.safe_set(state.menu_current_session_var, f"現在のセッション: {session}")
+        state.safe_set(state.menu_status_var, "接続済み")
+
+    def comment_cursor(self) -> int | None:
+        return state.comment_cursor()
+
+    def replace_history(self, messages: list[dict[str, object]]) -> None:
+        state.clear_messages()
+        _on_history(messages)
+
+    def history_epoch(self) -> int:
+        with _connection_lock:
+            return _history_epoch
+
+    def prepend_history(self, messages: list[dict[str, object]]) -> None:
+        _on_history_backfill(messages)
+
+    def add_comment(self, message: dict[str, object]) -> bool:
+        return _on_new_comment(message)
+
+    def apply_reaction_updates(self, bookmark_counts: dict[int, int]) -> None:
+        state.apply_reaction_updates(bookmark_counts)
+
+    def dispatch(self, message: str, session: str, received_at: float) -> None:
+        _record_frame(message, received_at)
+        _dispatch_ws_message(message, session, received_at)
 
 
 def disconnect_session(show_status: bool = True) -> None:
-    global _active_socket, _active_stop_event
-    stop_event: threading.Event | None
-    sock: socket.socket | None
+    global _active_connection, _active_connection_session, _recorder
     with _connection_lock:
-        stop_event = _active_stop_event
-        sock = _active_socket
-        _active_stop_event = None
-        _active_socket = None
-
-    if stop_event is not None:
-        stop_event.set()
-    if sock is not None:
-        try:
-            sock.close()
-        except Exception:
-            pass
+        connection = _active_connection
+        _active_connection = None
+        _active_connection_session = None
+        _live_buffer.stop()
+        recorder = _recorder
+        _recorder = None
+
+    if connection is not None:
+        connection.cancel()
+    if recorder is not None:
+        recorder.close()
+    _reaction_coalescer.discard()
 
     state.session_ready = False
     if show_status:
         state.safe_set(state.menu_status_var, "未接続")
 
 
-class _WebSocketRejected(RuntimeError):
-    pass
+def _show_connection_error(message: str) -> None:
+    root = state.root
+    if root is None:
+        return
 
+    def show() -> None:
+        try:
+            messagebox.showerror("接続エラー", message)
+        except Exception:
+            pass
 
-def _open_socket(url: str) -> tuple[socket.socket, str, str]:
-    parsed = urlsplit(url)
-    hostname = parsed.hostname
-    if hostname is None:
-        raise _WebSocketRejected("websocket host is invalid")
+    try:
+        root.after(0, show)
+    except Exception:
+        pass
 
-    port = parsed.port
-    if port is None:
-        port = 443 if parsed.scheme == "wss" else 80
 
-    raw_socket = socket.create_connection(
-        (hostname, port), timeout=BACKEND_HTTP_TIMEOUT_SEC
-    )
-    raw_socket.settimeout(1.0)
+_CONNECTION_STATUS_TEXT = {
+    CONNECTION_CONNECTING: "接続中…",
+    CONNECTION_OPEN: "接続済み",
+    CONNECTION_DEGRADED: "接続不安定",
+    CONNECTION_BACKING_OFF: "再接続待ち…",
+}
 
-    if parsed.scheme == "wss":
-        context = ssl.create_default_context()
-        wrapped_socket = context.wrap_socket(raw_socket, server_hostname=hostname)
-        wrapped_socket.settimeout(1.0)
-        sock = wrapped_socket
-    else:
-        sock = raw_socket
 
-    target = parsed.path or "/"
-    if parsed.query:
-        target = f"{target}?{parsed.query}"
-    return sock, parsed.netloc, target
+def snapshot_connection_stats() -> ConnectionStats:
+    with _connection_lock:
+        health = _connection_health
+    return health.snapshot()
 
 
-def _run_websocket(session: str, serial: int, stop_event: threading.Event) -> None:
-    while not stop_event.is_set() and _is_current_serial(serial):
-        sock: socket.socket | None = None
-        try:
-            url = build_ws_url(session)
-            sock, host, target = _open_socket(url)
-            connection = WSConnection(ConnectionType.CLIENT)
-            handshake = connection.send(
-                Request(
-                    host=host,
-                    target=target,
-                    extra_headers=[(b"origin", BACKEND_WS_ORIGIN.encode("utf-8"))],
-                )
-            )
-            sock.sendall(handshake)
-            _set_active_socket(serial, stop_event, sock)
-
-            message_parts: list[str] = []
-            connected = False
-
-            while not stop_event.is_set() and _is_current_serial(serial):
-                try:
-                    received = sock.recv(4096)
-                except socket.timeout:
-                    continue
-                except OSError:
-                    break
-
-                if not received:
-                    connection.receive_data(None)
-                else:
-                    connection.receive_data(received)
-
-                should_break = False
-                for event in connection.events():
-                    if isinstance(event, AcceptConnection):
-                        connected = True
-                        state.safe_set(state.menu_status_var, "接続済み")
-                        state.safe_set(
-                            state.menu_current_session_var,
-                            f"現在のセッション: {state.CURRENT_SESSION}",
-                        )
-                    elif isinstance(event, RejectConnection):
-                        raise _WebSocketRejected(
-                            f"websocket rejected with status {event.status_code}"
-                        )
-                    elif isinstance(event, RejectData):
-                        continue
-                    elif isinstance(event, TextMessage):
-                        message_parts.append(event.data)
-                        if event.message_finished:
-                            message = "".join(message_parts)
-                            message_parts.clear()
-                            entry = parse_comment_event(message)
-                            if entry is not None:
-                                if entry.get("session") != session:
-                                    continue
-                                _on_new_comment(entry)
-                                continue
-                            reaction = parse_reaction_update_event(message)
-                            if reaction is not None:
-                                if reaction.get("session") != session:
-                                    continue
-                                _on_reaction_update(reaction)
-                                continue
-                            reaction_mode = parse_reaction_mode_event(message)
-                            if reaction_mode is not None:
-                                if reaction_mode.get("session") != session:
-                                    continue
-                                _on_reaction_mode_update(reaction_mode)
-                                continue
-                            poll_results = parse_poll_results_event(message)
-                            if poll_results is not None:
-                                if poll_results.get("session") != session:
-                                    continue
-                                _on_poll_results_event(poll_results)
-                                continue
-                            behavior_event = parse_behavior_event(message)
-                            if behavior_event is not None:
-                                if behavior_event.get("session") != session:
-                                    continue
-                                _on_behavior_event(behavior_event)
-                    elif isinstance(event, Ping):
-                        try:
-                            sock.sendall(connection.send(event.response()))
-                        except OSError:
-                            should_break = True
-                    elif isinstance(event, CloseConnection):
-                        try:
-                            sock.sendall(connection.send(event.response()))
-                        except OSError:
-                            pass
-                        should_break = True
-
-                if should_break or not received:
-                    break
-
-            if connected and not stop_event.is_set() and _is_current_serial(serial):
-                state.safe_set(state.menu_status_var, "再接続中…")
-        except _WebSocketRejected as exc:
-            if stop_event.is_set() or not _is_current_serial(serial):
-                break
-            state.safe_set(state.menu_status_var, "接続失敗")
-            try:
-                messagebox.showerror("接続エラー", str(exc))
-            except Exception:
-                pass
-            break
-        except Exception:
-            if stop_event.is_set() or not _is_current_serial(serial):
-                break
-            state.safe_set(state.menu_status_var, "再接続中…")
-        finally:
-            if sock is not None:
-                _clear_active_socket(serial, sock)
-                try:
-                    sock.close()
-                except Exception:
-                    pass
+def _connection_status_text(new_state: str, stats: ConnectionStats) -> str | None:
+    if new_state == CONNECTION_CONNECTING and stats.reconnect_attempts > 0:
+        return "再接続中…"
+    return _CONNECTION_STATUS_TEXT.get(new_state)
+
 
-        if stop_event.wait(2.0):
-            break
+async def _run_websocket(
+    target: _PrimarySession, session: str, opened: threading.Event | None = None
+) -> None:
+    global _connection_health
+    serial = target.serial
+
+    def on_health_change(new_state: str, stats: ConnectionStats) -> None:
+        if not _is_current_serial(serial):
+            return
+        text = _connection_status_text(new_state, stats)
+        if text is not None:
+            state.safe_set(state.menu_status_var, text)
+
+    health = ConnectionHealth(on_health_change)
+    with _connection_lock:
+        if serial == _connection_serial:
+            _connection_health = health
+
+    def on_open(reconnected: bool) -> None:
+        # 履歴より先に開いたときは、まだ前のセッション名が残っているので表示しない
+        if state.session_ready:
+            state.safe_set(
+                state.menu_current_session_var,
+                f"現在のセッション: {state.CURRENT_SESSION}",
+            )
+        if opened is not None:
+            opened.set()
+        if reconnected:
+            session_pipeline.resume_in_background(target)
+
+    def handle_message(message: str, received_at: float) -> None:
+        # 溜めたフレームは、流すときに記録する
+        session_pipeline.handle_live_frame(target, session, message, received_at)
+
+    # 記録の書き込みやハンドラは共有ループの外で動かす
+    dispatcher = MessageDispatcher(handle_message)
+    try:
+        await run_reconnecting_connection(
+            build_ws_url(session),
+            origin=BACKEND_WS_ORIGIN,
+            health=health,
+            should_continue=lambda: _is_current_serial(serial),
+            on_open=on_open,
+            on_message=dispatcher.submit,
+            on_rtt=rtt_histogram.record,
+        )
+    except WebSocketRejected as exc:
+        state.safe_set(state.menu_status_var, "接続失敗")
+        _show_connection_error(str(exc))
+    finally:
+        dispatcher.close()
+        _clear_active_connection(serial, session)
+
+
+def _load_reaction_mode(session: str, serial: int) -> None:
+    try:
+        reaction_mode = fetch_reaction_mode(session)
+    except Exception:
+        return
+    if _is_current_serial(serial):
+        _on_reaction_mode_update(reaction_mode)
 
 
 def connect_session(session_name: str):
+    """履歴・リアクション設定の取得と WebSocket の接続を並行して進める。
+
+    履歴が届くまでのライブのフレームはバッファに溜め、履歴を反映したあとに
+    重複を除いて流す。ライブ表示までの時間は各処理の合計ではなく最大になる。
+    """
     serial = _next_connection_serial()
 
     def _do_connect():
         state.safe_set(state.menu_status_var, "接続中…")
+        requested_session = session_name or "default"
         try:
             state.clear_messages()
             disconnect_session(show_status=False)
             _clear_message_queue()
 
-            normalized_session, messages = fetch_bootstrap(session_name or "default")
             if not _is_current_serial(serial):
                 return
-
-            state.CURRENT_SESSION = normalized_session
-            state.session_ready = True
-            try:
-                reaction_mode = fetch_reaction_mode(normalized_session)
-                _on_reaction_mode_update(reaction_mode)
-            except Exception:
-                pass
-            _on_history(messages)
-            state.safe_set(
-                state.menu_current_session_var,
-                f"現在のセッション: {normalized_session}",
-            )
-            state.safe_set(state.menu_status_var, "接続済み")
-
-            stop_event = threading.Event()
-            with _connection_lock:
-                if serial != _connection_serial:
-                    stop_event.set()
-                    return
-                global _active_stop_event
-                _active_stop_event = stop_event
             threading.Thread(
-                target=_run_websocket,
-                args=(normalized_session, serial, stop_event),
+                target=_load_reaction_mode,
+                args=(requested_session, serial),
                 daemon=True,
             ).start()
+            session_pipeline.connect(
+                _PrimarySession(serial, requested_session), requested_session
+            )
         except BackendApiError as exc:
+            if _is_current_serial(serial):
+                disconnect_session(show_status=False)
             state.session_ready = False
             state.safe_set(state.menu_status_var, "接続失敗")
             try:
@@ -380,6 +472,8 @@ def connect_session(session_name: str):
             except Exception:
                 pass
         except Exception as exc:
+            if _is_current_serial(serial):
+                disconnect_session(show_status=False)
             state.session_ready = False
             state.safe_set(state.menu_status_var, "接続失敗")
             try:
@@ -388,3 +482,35 @@ def connect_session(session_name: str):
                 pass
 
     threading.Thread(target=_do_connect, daemon=True).start()
+
+
+def replay_session(path: str, speed: float = WS_REPLAY_SPEED) -> None:
+    """記録したフレームをサーバーなしで受信経路へ流す。"""
+    serial = _next_connection_serial()
+
+    def _do_replay() -> None:
+        try:
+            header, frames = read_recording(path)
+        except (OSError, ValueError) as exc:
+            state.safe_set(state.menu_status_var, "再生失敗")
+            _show_connection_error(str(exc))
+            return
+        session = str(header.get("session") or "default")
+        state.clear_messages()
+        disconnect_session(show_status=False)
+        _clear_message_queue()
+        state.CURRENT_SESSION = session
+        state.session_ready = True
+        state.safe_set(state.menu_current_session_var, f"再生中のセッション: {session}")
+        state.safe_set(state.menu_status_var, "再生中")
+        replayed = replay_frames(
+            frames,
+            lambda message: _dispatch_ws_message(message, session, time.perf_counter()),
+            speed=speed,
+            should_continue=lambda: _is_current_serial(serial),
+        )
+        _reaction_coalescer.flush()
+        if _is_current_serial(serial):
+            state.safe_set(state.menu_status_var, f"再生完了（{replayed} 件）")
+
+    threading.Thread(target=_do_replay, daemon=True).start()
@@ -0,0 +1,80 @@
+"""バックエンドとスタンプ画像の取得で共有する HTTP セッション。
+
+接続はプールして keep-alive で使い回し、TLS ハンドシェイクを毎回やり直さない。
+冪等な GET/HEAD だけは接続エラーや 502/503/504 で自動的に再試行する。
+バックエンド API は呼び出し側でタイムアウトの持ち時間の中で再試行するので、
+retry=False で自動再試行しないセッションを使う。
+requests.Session はこの用途（共有のアダプターで送るだけ）ならスレッド間で共有してよい。
+"""
+
+from __future__ import annotations
+
+import threading
+
+import requests
+
+from config.constants import (
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_RETRY_BACKOFF_SEC,
+    HTTP_RETRY_TOTAL,
+)
+
+# GET を再試行する応答コード
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+_session_lock = threading.Lock()
+# 自動再試行するかどうかごとのセッション
+_sessions: dict[bool, requests.Session] = {}
+
+
+def _build_session(retry: bool) -> requests.Session:
+    # アダプター周りは requests 本体の import より重いので、初回利用時に読み込む。
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    max_retries = (
+        Retry(
+            total=HTTP_RETRY_TOTAL,
+            backoff_factor=HTTP_RETRY_BACKOFF_SEC,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False,
+        )
+        if retry
+        else Retry(total=0, read=False, redirect=False)
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=max_retries,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session(retry: bool = True) -> requests.Session:
+    with _session_lock:
+        session = _sessions.get(retry)
+        if session is None:
+            session = _build_session(retry)
+            _sessions[retry] = session
+        return session
+
+
+def close_session() -> None:
+    with _session_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+def get(url: str, *, retry: bool = True, **kwargs: object) -> requests.Response:
+    return get_session(retry).get(url, **kwargs)  # type: ignore[arg-type]
+
+
+def post(url: str, *, retry: bool = True, **kwargs: object) -> requests.Response:
+    return get_session(retry).post(url, **kwargs)  # type: ignore[arg-type]
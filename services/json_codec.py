@@ -0,0 +1,96 @@
+"""JSON のデコード・エンコード。
+
+orjson → msgspec → 標準 json の順に、インストール済みで最初に見つかったものを使う。
+BEAVER_JSON_CODEC で名前を指定すれば固定できる。どの実装でも、不正な入力には
+ValueError を送出し、dumps は非 ASCII をエスケープしない str を返す。
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+from collections.abc import Callable
+
+from config.constants import JSON_CODEC
+
+CODEC_NAMES: tuple[str, ...] = ("orjson", "msgspec", "stdlib")
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class JsonCodec:
+    name: str
+    loads: Callable[[str | bytes], object]
+    dumps: Callable[[object], str]
+
+
+def _stdlib_codec() -> JsonCodec:
+    def dumps(value: object) -> str:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+    return JsonCodec("stdlib", json.loads, dumps)
+
+
+def _orjson_codec() -> JsonCodec | None:
+    try:
+        import orjson
+    except ImportError:
+        return None
+
+    def dumps(value: object) -> str:
+        return orjson.dumps(value).decode("utf-8")
+
+    # orjson.JSONDecodeError は ValueError の派生なのでそのまま使える。
+    return JsonCodec("orjson", orjson.loads, dumps)
+
+
+def _msgspec_codec() -> JsonCodec | None:
+    try:
+        import msgspec
+    except ImportError:
+        return None
+
+    decoder = msgspec.json.Decoder()
+    encoder = msgspec.json.Encoder()
+
+    def loads(data: str | bytes) -> object:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as exc:
+            raise ValueError(str(exc)) from exc
+
+    def dumps(value: object) -> str:
+        return encoder.encode(value).decode("utf-8")
+
+    return JsonCodec("msgspec", loads, dumps)
+
+
+_FACTORIES: dict[str, Callable[[], JsonCodec | None]] = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "stdlib": _stdlib_codec,
+}
+
+
+def available_codecs() -> list[JsonCodec]:
+    codecs: list[JsonCodec] = []
+    for name in CODEC_NAMES:
+        codec = _FACTORIES[name]()
+        if codec is not None:
+            codecs.append(codec)
+    return codecs
+
+
+def select_codec(preferred: str = "auto") -> JsonCodec:
+    """preferred の実装を返す。未インストールや auto なら使える中で最速のものにする。"""
+    factory = _FACTORIES.get(preferred.strip().lower())
+    if factory is not None:
+        codec = factory()
+        if codec is not None:
+            return codec
+    return available_codecs()[0]
+
+
+codec = select_codec(JSON_CODEC)
+CODEC_NAME = codec.name
+loads = codec.loads
+dumps = codec.dumps
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+
+from services.backend_api import parse_ws_event
+
+
+class LiveFrameBuffer:
+    """履歴の取得が終わるまで、ライブのフレームを届いた順に溜めておく。
+
+    溜めていない間は offer が False を返すので、呼び出し側がその場で処理する。
+    フレームは購読したセッション名と一緒に持ち、流すときに名前が違えば捨てる。
+    start と flush は対になっていて、すべての start に flush が呼ばれるまで溜め続ける。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._frames: list[tuple[str, str, float]] | None = None
+        self._holders = 0
+
+    def start(self) -> None:
+        """溜め始める。すでに溜めていれば、溜めた分はそのまま残す。"""
+        with self._lock:
+            self._holders += 1
+            if self._frames is None:
+                self._frames = []
+
+    def stop(self) -> None:
+        """溜めた分を捨て、残っている start もすべて取り消す。"""
+        with self._lock:
+            self._frames = None
+            self._holders = 0
+
+    def offer(self, message: str, session: str, received_at: float) -> bool:
+        with self._lock:
+            if self._frames is None:
+                return False
+            self._frames.append((message, session, received_at))
+            return True
+
+    def first_comment_id(self, session: str, cursor: int) -> int | None:
+        """溜めてあるこのセッションのコメントのうち、cursor より新しい最初の ID。"""
+        with self._lock:
+            pending = list(self._frames or ())
+        for message, buffered_session, _received_at in pending:
+            if buffered_session != session:
+                continue
+            parsed = parse_ws_event(message)
+            if parsed is None:
+                continue
+            event_type, event = parsed
+            comment_id = event.get("id")
+            if (
+                event_type == "comment.created"
+                and event.get("session") == session
+                and isinstance(comment_id, int)
+                and comment_id > cursor
+            ):
+                return comment_id
+        return None
+
+    def follows(self, session: str, cursor: int) -> bool:
+        """溜めてあるコメントが cursor の直後から途切れずに始まっていれば True。"""
+        return self.first_comment_id(session, cursor) == cursor + 1
+
+    def flush(self, session: str, handle: Callable[[str, float], None]) -> None:
+        """溜めていたフレームを届いた順に handle へ渡し、以後は溜めないよう戻す。
+
+        ほかにまだ flush していない start があれば、何もせず溜め続ける。
+        処理中に届いたフレームも同じバッファへ積まれるので、空になるまで繰り返す。
+        """
+        with self._lock:
+            if self._holders > 1:
+                self._holders -= 1
+                return
+            self._holders = 0
+        while True:
+            with self._lock:
+                if self._holders:
+                    # 流している間に別の start が来たら、残りはその flush に任せる
+                    return
+                if not self._frames:
+                    self._frames = None
+                    return
+                pending = list(self._frames)
+                self._frames.clear()
+            for message, buffered_session, received_at in pending:
+                if buffered_session == session:
+                    handle(message, received_at)
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import bisect
+import dataclasses
+import json
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+# ミリ秒単位のバケット上限。最後のバケットはそれ以上すべてを数える。
+DEFAULT_BUCKET_BOUNDS_MS: tuple[float, ...] = (
+    1.0,
+    2.0,
+    5.0,
+    10.0,
+    20.0,
+    50.0,
+    100.0,
+    200.0,
+    500.0,
+    1000.0,
+    2000.0,
+    5000.0,
+    10000.0,
+)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class LatencySnapshot:
+    count: int
+    min_ms: float | None
+    max_ms: float | None
+    mean_ms: float | None
+    p50_ms: float | None
+    p95_ms: float | None
+    p99_ms: float | None
+    buckets: tuple[tuple[float | None, int], ...]
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "count": self.count,
+            "min_ms": self.min_ms,
+            "max_ms": self.max_ms,
+            "mean_ms": self.mean_ms,
+            "p50_ms": self.p50_ms,
+            "p95_ms": self.p95_ms,
+            "p99_ms": self.p99_ms,
+            "buckets": [
+                {"le_ms": bound, "count": count} for bound, count in self.buckets
+            ],
+        }
+
+
+class LatencyHistogram:
+    """スレッドセーフなレイテンシ集計。
+
+    全期間の件数はバケットで数え、パーセンタイルは直近 sample_size 件から求める。
+    """
+
+    def __init__(
+        self,
+        bucket_bounds_ms: tuple[float, ...] = DEFAULT_BUCKET_BOUNDS_MS,
+        sample_size: int = 2048,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._bounds = tuple(sorted(bucket_bounds_ms))
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._samples: deque[float] = deque(maxlen=max(1, sample_size))
+        self._count = 0
+        self._total_ms = 0.0
+        self._min_ms: float | None = None
+        self._max_ms: float | None = None
+
+    def record(self, seconds: float) -> None:
+        value_ms = max(0.0, seconds * 1000.0)
+        with self._lock:
+            self._counts[bisect.bisect_left(self._bounds, value_ms)] += 1
+            self._samples.append(value_ms)
+            self._count += 1
+            self._total_ms += value_ms
+            if self._min_ms is None or value_ms < self._min_ms:
+                self._min_ms = value_ms
+            if self._max_ms is None or value_ms > self._max_ms:
+                self._max_ms = value_ms
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * (len(self._bounds) + 1)
+            self._samples.clear()
+            self._count = 0
+            self._total_ms = 0.0
+            self._min_ms = None
+            self._max_ms = None
+
+    def snapshot(self) -> LatencySnapshot:
+        with self._lock:
+            samples = sorted(self._samples)
+            counts = list(self._counts)
+            count = self._count
+            total_ms = self._total_ms
+            min_ms = self._min_ms
+            max_ms = self._max_ms
+        bounds: list[float | None] = [*self._bounds, None]
+        return LatencySnapshot(
+            count=count,
+            min_ms=min_ms,
+            max_ms=max_ms,
+            mean_ms=(total_ms / count) if count else None,
+            p50_ms=_percentile(samples, 0.50),
+            p95_ms=_percentile(samples, 0.95),
+            p99_ms=_percentile(samples, 0.99),
+            buckets=tuple(zip(bounds, counts)),
+        )
+
+
+def _percentile(sorted_samples: list[float], fraction: float) -> float | None:
+    if not sorted_samples:
+        return None
+    # nearest-rank 法
+    index = max(0, math.ceil(fraction * len(sorted_samples)) - 1)
+    return sorted_samples[index]
+
+
+# コメント 1 件が通る段階。隣り合う段階の差を段階別に集計する。
+MESSAGE_STAGES: tuple[str, ...] = (
+    "received",
+    "decoded",
+    "enqueued",
+    "dequeued",
+    "drawn",
+)
+LATENCY_SEGMENTS: tuple[tuple[str, str, str], ...] = (
+    ("decode", "received", "decoded"),
+    ("handle", "decoded", "enqueued"),
+    ("queue", "enqueued", "dequeued"),
+    ("draw", "dequeued", "drawn"),
+    ("total", "received", "drawn"),
+)
+
+
+class MessageLatencyTracker:
+    """受信から描画までの各段階の時刻をコメント id ごとに記録し、段階別に集計する。
+
+    begin で受信時刻を登録したコメントだけを追う。描画まで届かないもの
+    （スタンプや重複）は discard するか、max_pending を超えた時点で古い順に捨てる。
+    """
+
+    def __init__(
+        self,
+        max_pending: int = 4096,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._max_pending = max(1, max_pending)
+        self._pending: OrderedDict[int, dict[str, float]] = OrderedDict()
+        self._histograms = {name: LatencyHistogram() for name, _, _ in LATENCY_SEGMENTS}
+
+    def begin(
+        self, message_id: int, received_at: float, decoded_at: float | None = None
+    ) -> None:
+        stamps = {"received": received_at}
+        if decoded_at is not None:
+            stamps["decoded"] = decoded_at
+        with self._lock:
+            self._pending[message_id] = stamps
+            self._pending.move_to_end(message_id)
+            while len(self._pending) > self._max_pending:
+                self._pending.popitem(last=False)
+
+    def mark(self, message_id: int, stage: str, at: float | None = None) -> None:
+        if stage not in MESSAGE_STAGES:
+            raise ValueError(f"unknown stage: {stage}")
+        now = self._clock() if at is None else at
+        with self._lock:
+            stamps = self._pending.get(message_id)
+            if stamps is not None:
+                stamps.setdefault(stage, now)
+
+    def mark_drawn(self, message_ids: Iterable[int], at: float | None = None) -> None:
+        now = self._clock() if at is None else at
+        finished: list[dict[str, float]] = []
+        with self._lock:
+            for message_id in message_ids:
+                stamps = self._pending.pop(message_id, None)
+                if stamps is not None:
+                    stamps.setdefault("drawn", now)
+                    finished.append(stamps)
+        for stamps in finished:
+            for name, start, end in LATENCY_SEGMENTS:
+                if start in stamps and end in stamps:
+                    self._histograms[name].record(stamps[end] - stamps[start])
+
+    def discard(self, message_id: int) -> None:
+        with self._lock:
+            self._pending.pop(message_id, None)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pending.clear()
+        for histogram in self._histograms.values():
+            histogram.reset()
+
+    def snapshot(self) -> dict[str, LatencySnapshot]:
+        return {
+            name: histogram.snapshot() for name, histogram in self._histograms.items()
+        }
+
+    def to_dict(self) -> dict[str, object]:
+        return _segments_to_dict(self.snapshot())
+
+    def dump_json(self, path: str | Path) -> bool:
+        """集計を JSON で書き出す。1 件も計測していなければ何もしない。"""
+        snapshots = self.snapshot()
+        if not any(snapshot.count for snapshot in snapshots.values()):
+            return False
+        Path(path).write_text(
+            json.dumps(_segments_to_dict(snapshots), ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+        return True
+
+
+def _segments_to_dict(snapshots: dict[str, LatencySnapshot]) -> dict[str, object]:
+    return {
+        "segments": {name: snapshot.to_dict() for name, snapshot in snapshots.items()}
+    }
@@ -0,0 +1,464 @@
+"""運営操作の POST を SQLite に積み、順番に送り直す送信キュー。
+
+会場の回線が数秒落ちても、サクラコメントやアンケート開始を打ち直さずに済むよう、
+操作はいったんファイルへ書いてから 1 本のワーカーが古い順に送る。
+通信断や 5xx は間隔を倍々に空けて同じリクエスト ID で送り直し、サーバー側で
+二重に適用されないようにする。内容の誤り（4xx）は送り直さず失敗として残す。
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Callable, Mapping
+from pathlib import Path
+
+from config.constants import (
+    OUTBOX_FOREGROUND_WAIT_SEC,
+    OUTBOX_MAX_AGE_SEC,
+    OUTBOX_PATH,
+    OUTBOX_RETRY_INITIAL_SEC,
+    OUTBOX_RETRY_MAX_SEC,
+)
+from services import backend_api, json_codec
+from services.backend_api import BackendApiError, BackendUnavailableError
+
+KIND_REACTION_MODE = "reaction_mode"
+KIND_SAKURA_COMMENT = "sakura_comment"
+KIND_CREATE_POLL = "create_poll"
+KIND_START_POLL = "start_poll"
+KIND_POLL_RESULTS_DISPLAY = "poll_results_display"
+
+STATUS_PENDING = "pending"
+STATUS_FAILED = "failed"
+STATUS_DONE = "done"
+
+# 送信済みの行は、同じリクエスト ID の再投入を弾くためにしばらく残す
+_DONE_RETENTION_SEC = 24 * 60 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    request_id TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    result TEXT
+)
+"""
+
+Sender = Callable[..., object]
+
+_logger = logging.getLogger(__name__)
+
+
+def default_senders() -> dict[str, Sender]:
+    return {
+        KIND_REACTION_MODE: backend_api.set_reaction_mode,
+        KIND_SAKURA_COMMENT: backend_api.post_sakura_comment,
+        KIND_CREATE_POLL: backend_api.create_poll,
+        KIND_START_POLL: backend_api.start_poll,
+        KIND_POLL_RESULTS_DISPLAY: backend_api.set_poll_results_display,
+    }
+
+
+class OutboxPending(Exception):
+    """待ち時間内に送れず、送信待ちとしてキューに残っている。"""
+
+    def __init__(self, request_id: str, last_error: str | None) -> None:
+        super().__init__(last_error or "送信待ちです")
+        self.request_id = request_id
+        self.last_error = last_error
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class OutboxCounts:
+    pending: int = 0
+    failed: int = 0
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class _Entry:
+    request_id: str
+    kind: str
+    params: dict[str, object]
+    attempts: int
+    created_at: float
+    next_attempt_at: float
+
+
+class Outbox:
+    def __init__(
+        self,
+        path: str,
+        senders: Mapping[str, Sender] | None = None,
+        *,
+        retry_initial_sec: float = OUTBOX_RETRY_INITIAL_SEC,
+        retry_max_sec: float = OUTBOX_RETRY_MAX_SEC,
+        max_age_sec: float = OUTBOX_MAX_AGE_SEC,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._path = path
+        self._senders = dict(senders) if senders is not None else default_senders()
+        self._retry_initial_sec = retry_initial_sec
+        self._retry_max_sec = retry_max_sec
+        self._max_age_sec = max_age_sec
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._conn: sqlite3.Connection | None = None
+        self._worker: threading.Thread | None = None
+        # start が呼ばれたか。ファイルが後から開けたときにワーカーを起こす目印
+        self._started = False
+        self._stopping = False
+        self._counts = OutboxCounts()
+
+    def open(self) -> int:
+        """ファイルを開き、前回から残っていてまだ送る対象になる操作の件数を返す。
+
+        start の前に呼べば、前回の残りを送り直すかどうかを運営者に確かめられる。
+        """
+        with self._cond:
+            conn = self._ensure_open_locked()
+            (count,) = conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = ? AND created_at >= ?",
+                (STATUS_PENDING, self._clock() - self._max_age_sec),
+            ).fetchone()
+            return count
+
+    def fail_pending(self, message: str) -> int:
+        """送信待ちの操作を送らずに失敗へ回す。あとから retry_failed で送り直せる。"""
+        with self._cond:
+            cursor = self._ensure_open_locked().execute(
+                "UPDATE outbox SET status = ?, last_error = ? WHERE status = ?",
+                (STATUS_FAILED, message, STATUS_PENDING),
+            )
+            self._refresh_counts_locked()
+            self._cond.notify_all()
+            return cursor.rowcount
+
+    def start(self) -> None:
+        """前回の残りも含め、未送信の操作をワーカーで送り始める。
+
+        ファイルが開けなければ sqlite3.Error を送出するが、後の enqueue で開けた
+        時点でワーカーを起こす。
+        """
+        with self._cond:
+            self._started = True
+            self._stopping = False
+            self._ensure_open_locked()
+            self._start_worker_locked()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        with self._cond:
+            self._started = False
+            self._stopping = True
+            worker = self._worker
+            self._worker = None
+            self._cond.notify_all()
+        if worker is not None:
+            worker.join(timeout)
+            if worker.is_alive():
+                # 送信中のまま抜けられなかった。結果を書けるよう接続は残す
+                return
+        with self._cond:
+            self._close_locked()
+
+    def enqueue(
+        self,
+        kind: str,
+        params: Mapping[str, object],
+        *,
+        request_id: str | None = None,
+    ) -> str:
+        """操作を末尾に積んでリクエスト ID を返す。同じ ID が既にあれば積まない。"""
+        if kind not in self._senders:
+            raise ValueError(f"unknown outbox kind: {kind}")
+        request_id = request_id or uuid.uuid4().hex
+        now = self._clock()
+        with self._cond:
+            conn = self._ensure_open_locked()
+            conn.execute(
+                "INSERT OR IGNORE INTO outbox"
+                " (request_id, kind, params, status, created_at, next_attempt_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    request_id,
+                    kind,
+                    json_codec.dumps(dict(params)),
+                    STATUS_PENDING,
+                    now,
+                    now,
+                ),
+            )
+            self._refresh_counts_locked()
+            if self._started:
+                self._start_worker_locked()
+            self._cond.notify_all()
+        return request_id
+
+    def submit(
+        self,
+        kind: str,
+        params: Mapping[str, object],
+        *,
+        request_id: str | None = None,
+        wait: float = OUTBOX_FOREGROUND_WAIT_SEC,
+    ) -> object:
+        """積んだ操作の送信を最大 wait 秒待って結果を返す。
+
+        内容の誤りで失敗したら BackendApiError、まだ送れていなければ OutboxPending を送出する。
+        ファイルが使えず積めないときは、キューを通さずその場で 1 回だけ送る。
+        """
+        request_id = request_id or uuid.uuid4().hex
+        try:
+            self.enqueue(kind, params, request_id=request_id)
+        except sqlite3.Error:
+            _logger.warning("outbox is unavailable; sending %s directly", kind)
+            return self._senders[kind](**params, request_id=request_id)
+        deadline = time.monotonic() + wait
+        with self._cond:
+            while True:
+                try:
+                    row = (
+                        self._ensure_open_locked()
+                        .execute(
+                            "SELECT status, last_error, result FROM outbox"
+                            " WHERE request_id = ?",
+                            (request_id,),
+                        )
+                        .fetchone()
+                    )
+                except sqlite3.Error as exc:
+                    # 積めてはいるので、送信はワーカーに任せる
+                    raise OutboxPending(request_id, str(exc)) from exc
+                if row is None:
+                    raise OutboxPending(request_id, None)
+                status, last_error, result = row
+                if status == STATUS_DONE:
+                    return json_codec.loads(result) if result is not None else None
+                if status == STATUS_FAILED:
+                    raise BackendApiError(last_error or "送信に失敗しました")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise OutboxPending(request_id, last_error)
+                self._cond.wait(remaining)
+
+    def is_pending(self, request_id: str) -> bool:
+        """request_id の操作がまだ送信待ちで残っていれば True。"""
+        with self._cond:
+            try:
+                row = (
+                    self._ensure_open_locked()
+                    .execute(
+                        "SELECT status FROM outbox WHERE request_id = ?", (request_id,)
+                    )
+                    .fetchone()
+                )
+            except sqlite3.Error:
+                return False
+        return row is not None and row[0] == STATUS_PENDING
+
+    def counts(self) -> OutboxCounts:
+        with self._cond:
+            return self._counts
+
+    def retry_failed(self) -> int:
+        """失敗した操作を送信待ちへ戻す。古い順はそのまま保つ。"""
+        now = self._clock()
+        with self._cond:
+            cursor = self._ensure_open_locked().execute(
+                "UPDATE outbox SET status = ?, attempts = 0, created_at = ?,"
+                " next_attempt_at = ?, last_error = NULL WHERE status = ?",
+                (STATUS_PENDING, now, now, STATUS_FAILED),
+            )
+            self._refresh_counts_locked()
+            self._cond.notify_all()
+            return cursor.rowcount
+
+    def discard_failed(self) -> int:
+        with self._cond:
+            cursor = self._ensure_open_locked().execute(
+                "DELETE FROM outbox WHERE status = ?", (STATUS_FAILED,)
+            )
+            self._refresh_counts_locked()
+            return cursor.rowcount
+
+    def _ensure_open_locked(self) -> sqlite3.Connection:
+        if self._conn is None:
+            try:
+                Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+            except OSError as exc:
+                # 呼び出し側からは、ファイルが開けないときと同じに見えるようにする
+                raise sqlite3.OperationalError(
+                    f"unable to create the outbox directory: {exc}"
+                ) from exc
+            conn = sqlite3.connect(
+                self._path, check_same_thread=False, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            conn.execute(
+                "DELETE FROM outbox WHERE status = ? AND created_at < ?",
+                (STATUS_DONE, self._clock() - _DONE_RETENTION_SEC),
+            )
+            self._conn = conn
+            self._refresh_counts_locked()
+        return self._conn
+
+    def _start_worker_locked(self) -> None:
+        if self._worker is not None:
+            return
+        self._worker = threading.Thread(
+            target=self._run, name="beaver-outbox", daemon=True
+        )
+        self._worker.start()
+
+    def _close_locked(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            self._conn.close()
+        except sqlite3.Error:
+            pass
+        self._conn = None
+
+    def _refresh_counts_locked(self) -> None:
+        assert self._conn is not None
+        counts = dict(
+            self._conn.execute(
+                "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+            ).fetchall()
+        )
+        self._counts = OutboxCounts(
+            pending=counts.get(STATUS_PENDING, 0),
+            failed=counts.get(STATUS_FAILED, 0),
+        )
+
+    def _head_locked(self) -> _Entry | None:
+        row = (
+            self._ensure_open_locked()
+            .execute(
+                "SELECT request_id, kind, params, attempts, created_at, next_attempt_at"
+                " FROM outbox WHERE status = ? ORDER BY seq LIMIT 1",
+                (STATUS_PENDING,),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        request_id, kind, params, attempts, created_at, next_attempt_at = row
+        return _Entry(
+            request_id,
+            kind,
+            dict(json_codec.loads(params)),  # type: ignore[call-overload]
+            attempts,
+            created_at,
+            next_attempt_at,
+        )
+
+    def _run(self) -> None:
+        while True:
+            try:
+                if not self._step():
+                    return
+            except sqlite3.Error:
+                # ファイルの読み書きに失敗しても止まらず、開き直して続ける。
+                # 送れた記録が残せなかった操作は同じリクエスト ID で送り直すので、
+                # サーバー側で二重には適用されない。
+                _logger.exception("outbox store failed; retrying")
+                with self._cond:
+                    self._close_locked()
+                    if self._stopping:
+                        return
+                    self._cond.wait(self._retry_max_sec)
+            except Exception:
+                # 送った結果が記録できないなど。ワーカーが止まるとキューが詰まるので続ける
+                _logger.exception("outbox worker failed; retrying")
+                with self._cond:
+                    if self._stopping:
+                        return
+                    self._cond.wait(self._retry_max_sec)
+
+    def _step(self) -> bool:
+        """先頭の操作を 1 回進める。止めるときは False を返す。"""
+        with self._cond:
+            if self._stopping:
+                return False
+            entry = self._head_locked()
+            if entry is None:
+                self._cond.wait()
+                return True
+            now = self._clock()
+            if now - entry.created_at > self._max_age_sec:
+                self._fail_locked(entry, "時間切れのため送信しませんでした")
+                return True
+            if entry.next_attempt_at > now:
+                self._cond.wait(entry.next_attempt_at - now)
+                return True
+        # 先頭が送れるまで後ろは待たせ、操作の順番を入れ替えない
+        self._attempt(entry)
+        return True
+
+    def _attempt(self, entry: _Entry) -> None:
+        sender = self._senders.get(entry.kind)
+        try:
+            if sender is None:
+                raise BackendApiError(f"unknown outbox kind: {entry.kind}")
+            result = sender(**entry.params, request_id=entry.request_id)
+        except BackendUnavailableError as exc:
+            delay = min(
+                self._retry_max_sec, self._retry_initial_sec * (2**entry.attempts)
+            )
+            # ブレーカーが開いている間は送っても断られるだけなので、閉じる頃まで待つ
+            if exc.retry_after_sec is not None:
+                delay = max(delay, exc.retry_after_sec)
+            with self._cond:
+                self._ensure_open_locked().execute(
+                    "UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ?,"
+                    " last_error = ? WHERE request_id = ?",
+                    (self._clock() + delay, str(exc), entry.request_id),
+                )
+                self._cond.notify_all()
+            return
+        except (BackendApiError, TypeError, ValueError) as exc:
+            # 4xx や引数の誤りは送り直しても通らない
+            with self._cond:
+                self._fail_locked(entry, str(exc))
+            return
+        except Exception as exc:
+            # 想定外の失敗でもワーカーは止めない。その操作は失敗として残し、
+            # 原因を確かめてからメニューで送り直してもらう
+            _logger.exception("outbox sender for %s failed", entry.kind)
+            with self._cond:
+                self._fail_locked(
+                    entry, f"送信中に予期しないエラーが発生しました: {exc}"
+                )
+            return
+        with self._cond:
+            self._ensure_open_locked().execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1,"
+                " last_error = NULL, result = ? WHERE request_id = ?",
+                (STATUS_DONE, json_codec.dumps(result), entry.request_id),
+            )
+            self._refresh_counts_locked()
+            self._cond.notify_all()
+
+    def _fail_locked(self, entry: _Entry, message: str) -> None:
+        self._ensure_open_locked().execute(
+            "UPDATE outbox SET status = ?, last_error = ? WHERE request_id = ?",
+            (STATUS_FAILED, message, entry.request_id),
+        )
+        self._refresh_counts_locked()
+        self._cond.notify_all()
+
+
+outbox = Outbox(OUTBOX_PATH)
@@ -0,0 +1,215 @@
+"""API ペイロードの宣言的なスキーマと、それを 1 回だけ関数に変換するコンパイラ。
+
+フィールドごとに出力名・camelCase の入力名・型・null 可否を並べると、
+compile_schema がフィールドごとの検証関数を前もって組み立て、入力名や期待する型と
+一緒にタプルへ並べる。正規化はそのタプルを 1 回なめて出力の dict を直接作り、
+型が完全に一致する値は関数を呼ばずに通すので、ブートストラップの全件やライブの
+全フレームで走る処理が軽い。
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from collections.abc import Callable, Mapping, Sequence
+
+KIND_STR = "str"
+KIND_INT = "int"
+KIND_NUMBER = "number"
+KIND_STR_LIST = "str_list"
+KIND_INT_LIST = "int_list"
+# item で渡した正規化関数を各要素に適用する
+KIND_LIST = "list"
+# 検証せず、convert で渡した関数の戻り値をそのまま使う
+KIND_CONVERT = "convert"
+
+_KINDS = frozenset(
+    {
+        KIND_STR,
+        KIND_INT,
+        KIND_NUMBER,
+        KIND_STR_LIST,
+        KIND_INT_LIST,
+        KIND_LIST,
+        KIND_CONVERT,
+    }
+)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Field:
+    name: str
+    source: str
+    kind: str = KIND_STR
+    nullable: bool = False
+    item: Callable[[object], object] | None = None
+    convert: Callable[[object], object] | None = None
+    # リストの要素が不正なときのエラーメッセージに使う名前。省くと source
+    item_label: str | None = None
+
+
+def _coerce_list(value: object) -> list[object] | None:
+    """list 以外のシーケンスも受け付ける。文字列やバイト列は不正として None を返す。"""
+    if isinstance(value, Sequence) and not isinstance(value, (str, bytes, bytearray)):
+        return list(value)
+    return None
+
+
+# 値の型がこれと完全に一致すれば検証を省く。一致しなければフィールドの検証関数に任せる
+_EXACT_TYPES: dict[str, type] = {KIND_STR: str, KIND_INT: int, KIND_NUMBER: float}
+
+
+def compile_schema(
+    label: str,
+    fields: Sequence[Field],
+    *,
+    error: Callable[[str], Exception] = ValueError,
+) -> Callable[[object], dict[str, object]]:
+    """fields を検証・変換する関数を作る。不正な値には error(メッセージ) を送出する。"""
+    steps = tuple(
+        (
+            field.name,
+            field.source,
+            _EXACT_TYPES.get(field.kind),
+            field.nullable and field.kind != KIND_CONVERT,
+            _field_check(field, error),
+        )
+        for field in fields
+    )
+    invalid = f"{label} is invalid"
+
+    def normalize_mapping(value: Mapping[str, object]) -> dict[str, object]:
+        get = value.get
+        result: dict[str, object] = {}
+        for name, source, exact_type, nullable, check in steps:
+            item = get(source)
+            if type(item) is not exact_type and (item is not None or not nullable):
+                item = check(item)
+            result[name] = item
+        return result
+
+    def normalize(value: object) -> dict[str, object]:
+        # dict で全キーがそろっている通常の入力は添字アクセスで読み、欠けたキーが
+        # あれば get で読み直す（欠けた値は None として検証される）。
+        if type(value) is dict:
+            try:
+                result: dict[str, object] = {}
+                for name, source, exact_type, nullable, check in steps:
+                    item = value[source]
+                    if type(item) is not exact_type and (
+                        item is not None or not nullable
+                    ):
+                        item = check(item)
+                    result[name] = item
+                return result
+            except KeyError:
+                return normalize_mapping(value)
+        if not isinstance(value, Mapping):
+            raise error(invalid)
+        return normalize_mapping(value)
+
+    normalize.__doc__ = f"{label} を検証し、snake_case の dict に変換する。"
+    return normalize
+
+
+def _field_check(
+    field: Field, error: Callable[[str], Exception]
+) -> Callable[[object], object]:
+    """1 フィールド分の検証・変換関数。None の扱いは呼び出し側で済ませる。"""
+    kind = field.kind
+    if kind not in _KINDS:
+        raise ValueError(f"unknown field kind: {kind}")
+    if kind == KIND_CONVERT:
+        if field.convert is None:
+            raise ValueError(f"{field.name}: convert is required")
+        return field.convert
+    message = f"{field.source} is invalid"
+    if kind == KIND_STR:
+        return _str_check(message, error)
+    if kind == KIND_INT:
+        return _int_check(message, error)
+    if kind == KIND_NUMBER:
+        return _number_check(message, error)
+    return _list_check(field, message, error)
+
+
+def _str_check(
+    message: str, error: Callable[[str], Exception]
+) -> Callable[[object], object]:
+    def check(value: object) -> object:
+        if type(value) is not str and not isinstance(value, str):
+            raise error(message)
+        return value
+
+    return check
+
+
+def _int_check(
+    message: str, error: Callable[[str], Exception]
+) -> Callable[[object], object]:
+    def check(value: object) -> object:
+        # bool は int の派生なので、型の一致で判定して弾く
+        if type(value) is not int and (
+            isinstance(value, bool) or not isinstance(value, int)
+        ):
+            raise error(message)
+        return value
+
+    return check
+
+
+def _number_check(
+    message: str, error: Callable[[str], Exception]
+) -> Callable[[object], object]:
+    def check(value: object) -> object:
+        if type(value) is float:
+            return value
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise error(message)
+        return float(value)
+
+    return check
+
+
+def _list_check(
+    field: Field, message: str, error: Callable[[str], Exception]
+) -> Callable[[object], object]:
+    item_message = f"{field.item_label or field.source} is invalid"
+    kind = field.kind
+
+    def items_of(value: object) -> list[object]:
+        items = list(value) if type(value) is list else _coerce_list(value)
+        if items is None:
+            raise error(message)
+        return items
+
+    if kind == KIND_STR_LIST:
+
+        def check_str_list(value: object) -> object:
+            items = items_of(value)
+            for item in items:
+                if not isinstance(item, str):
+                    raise error(item_message)
+            return items
+
+        return check_str_list
+    if kind == KIND_INT_LIST:
+
+        def check_int_list(value: object) -> object:
+            items = items_of(value)
+            for item in items:
+                if type(item) is not int and (
+                    isinstance(item, bool) or not isinstance(item, int)
+                ):
+                    raise error(item_message)
+            return items
+
+        return check_int_list
+
+    normalize_item = field.item
+    if normalize_item is None:
+        raise ValueError(f"{field.name}: item is required")
+
+    def check_list(value: object) -> object:
+        return [normalize_item(item) for item in items_of(value)]
+
+    return check_list
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+
+from config.constants import REACTION_COALESCE_WINDOW_SEC
+from services.ws_transport import get_engine
+
+# (遅延秒, コールバック) を受け取り、遅延後に呼ぶよう予約する関数
+Scheduler = Callable[[float, Callable[[], object]], None]
+
+
+class ReactionCoalescer:
+    """リアクション更新を comment_id ごとに最新値だけ溜め、一定間隔でまとめて適用する。
+
+    人気コメントに 1 秒で 50 件のいいねが付いても、再描画は窓ごとに 1 回で済む。
+    窓の終わりは WebSocket の共有エンジン上で予約し、窓ごとにスレッドを作らない。
+    """
+
+    def __init__(
+        self,
+        apply_batch: Callable[[dict[int, int]], None],
+        window_sec: float = REACTION_COALESCE_WINDOW_SEC,
+        *,
+        schedule: Scheduler | None = None,
+    ) -> None:
+        self._apply_batch = apply_batch
+        self._window_sec = max(0.0, window_sec)
+        self._schedule = schedule
+        self._lock = threading.Lock()
+        self._pending: dict[int, int] = {}
+        # 予約中の窓の番号。flush や discard で進め、古い予約が届いても何もしない
+        self._window: int | None = None
+        self._window_serial = 0
+
+    def submit(self, comment_id: int, bookmark_count: int) -> None:
+        if self._window_sec <= 0.0:
+            self._apply_batch({comment_id: bookmark_count})
+            return
+        with self._lock:
+            self._pending[comment_id] = bookmark_count
+            if self._window is not None:
+                return
+            self._window_serial += 1
+            window = self._window_serial
+            self._window = window
+        schedule = self._schedule or get_engine().call_later
+        schedule(self._window_sec, lambda: self._flush_window(window))
+
+    def flush(self) -> None:
+        with self._lock:
+            batch = self._pending
+            self._pending = {}
+            self._window = None
+        if batch:
+            self._apply_batch(batch)
+
+    def discard(self) -> None:
+        with self._lock:
+            self._pending = {}
+            self._window = None
+
+    def _flush_window(self, window: int) -> None:
+        with self._lock:
+            if self._window != window:
+                return
+        self.flush()
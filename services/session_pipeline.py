@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import threading
+from typing import Protocol
+
+from services.backend_api import (
+    BackendApiError,
+    fetch_bootstrap_page,
+    fetch_comments_since,
+    iter_older_bootstrap_pages,
+)
+from services.live_buffer import LiveFrameBuffer
+
+
+class SessionTarget(Protocol):
+    """接続・再開・遡り取得の取り込み先。主セッションと監視セッションが実装する。
+
+    session はサーバーが正規化したあとの名前。is_current が偽になったら、
+    取得済みの結果も捨てる。
+    """
+
+    session: str
+    live_buffer: LiveFrameBuffer
+
+    def is_current(self) -> bool: ...
+
+    def is_subscribing(self, session: str) -> bool:
+        """このセッションのソケットがまだ開こうとしていれば True。"""
+        ...
+
+    def start_socket(self, session: str, opened: threading.Event) -> bool: ...
+
+    def set_session(self, session: str) -> None: ...
+
+    def comment_cursor(self) -> int | None: ...
+
+    def replace_history(self, messages: list[dict[str, object]]) -> None: ...
+
+    def history_epoch(self) -> int:
+        """履歴を置き換えるたびに進む番号。古い遡り取得を打ち切る目印にする。"""
+        ...
+
+    def prepend_history(self, messages: list[dict[str, object]]) -> None: ...
+
+    def add_comment(self, message: dict[str, object]) -> bool:
+        """取り込んだら True、受信済みなどで足さなかったら False。"""
+        ...
+
+    def apply_reaction_updates(self, bookmark_counts: dict[int, int]) -> None: ...
+
+    def dispatch(self, message: str, session: str, received_at: float) -> None: ...
+
+
+def connect(target: SessionTarget, requested_session: str) -> str | None:
+    """購読と最新ページの取得を並行して進め、正規化されたセッション名を返す。
+
+    その間のライブのフレームは溜めておき、履歴との間に欠けがありそうなときは
+    差分を取り込んでから流す。コメントは ID の順に取り込み先へ届く。
+    途中で接続が古くなれば None を返す。履歴の取得に失敗したときは
+    BackendApiError をそのまま送出する。
+    """
+    opened = threading.Event()
+    target.live_buffer.start()
+    if not target.start_socket(requested_session, opened):
+        return None
+    # 履歴の取得前に購読できていれば、以後のコメントはすべてバッファに届く
+    subscribed_before_history = opened.is_set()
+    normalized_session, messages, has_more = fetch_bootstrap_page(requested_session)
+    if not target.is_current():
+        return None
+    if normalized_session != requested_session:
+        # サーバーが名前を正規化した場合は、その名前で購読し直す
+        opened = threading.Event()
+        subscribed_before_history = False
+        if not target.start_socket(normalized_session, opened):
+            return None
+    target.set_session(normalized_session)
+
+    replace_history(target, messages, has_more)
+    # 履歴が空なら先頭から取り込む
+    history_cursor = target.comment_cursor() or 0
+    contiguous = subscribed_before_history or target.live_buffer.follows(
+        normalized_session, history_cursor
+    )
+    if not contiguous:
+        # 溜めたライブのコメントより古いので、流す前に取り込む
+        _catch_up_after_history(target, opened, history_cursor)
+    if not target.is_current():
+        return None
+    flush_live_frames(target)
+    return normalized_session
+
+
+def _catch_up_after_history(
+    target: SessionTarget, opened: threading.Event, cursor: int
+) -> None:
+    """ソケットが開いたら、履歴の取得時点から購読開始までの間に出たコメントを取り込む。"""
+    session = target.session
+    while not opened.wait(0.5):
+        # 接続を拒否されたり切断されたりしたら待つのをやめる
+        if not target.is_current() or not target.is_subscribing(session):
+            return
+    if target.is_current():
+        # 一時的な失敗で全履歴を取り直すと、表示済みのコメントが流れ直してしまう
+        resume(target, cursor, reload_on_error=False)
+
+
+def handle_live_frame(
+    target: SessionTarget, session: str, message: str, received_at: float
+) -> None:
+    """ソケットから届いたフレーム。溜めている間はバッファへ、そうでなければその場で処理する。"""
+    if not target.live_buffer.offer(message, session, received_at):
+        target.dispatch(message, session, received_at)
+
+
+def flush_live_frames(target: SessionTarget) -> None:
+    """溜めていたフレームを届いた順に処理し、以後はその場で処理するよう戻す。
+
+    履歴と重なるコメントは取り込み先の ID 判定で落ちる。
+    名前の正規化前のソケットから溜まったフレームは捨てる。
+    """
+    session = target.session
+    target.live_buffer.flush(
+        session,
+        lambda message, received_at: target.dispatch(message, session, received_at),
+    )
+
+
+def resume(
+    target: SessionTarget,
+    cursor: int | None = None,
+    *,
+    reload_on_error: bool = True,
+) -> None:
+    """再接続後、切断中に取りこぼしたコメントとリアクションだけを取り込む。
+
+    cursor を省くと受信済みの最新 ID から取り込む。欠けがあれば履歴を取り直す。
+    reload_on_error が偽なら、取得に失敗しても履歴を取り直さない。
+    """
+    session = target.session
+    if cursor is None:
+        cursor = target.comment_cursor()
+    complete = False
+    messages: list[dict[str, object]] = []
+    reaction_updates: list[dict[str, object]] = []
+    if cursor is not None:
+        try:
+            messages, reaction_updates, complete = fetch_comments_since(session, cursor)
+        except BackendApiError:
+            if not reload_on_error:
+                return
+            complete = False
+    if not target.is_current():
+        return
+    if not complete:
+        reload_history(target)
+        return
+
+    bookmark_counts: dict[int, int] = {}
+    for message in sorted(messages, key=lambda item: item["id"]):
+        comment_id = message["id"]
+        # 受信済みのコメントは、リアクション数だけ取り込む
+        already_received = cursor is not None and comment_id <= cursor
+        if already_received or not target.add_comment(message):
+            bookmark_counts[comment_id] = message["bookmark_count"]
+    for update in reaction_updates:
+        bookmark_counts[update["comment_id"]] = update["bookmark_count"]
+    target.apply_reaction_updates(bookmark_counts)
+
+
+def resume_in_background(target: SessionTarget) -> None:
+    """再接続したときに呼ぶ。取りこぼしの取り込みは裏のスレッドで行う。
+
+    取り込みが終わるまでライブのフレームは溜めておき、取りこぼした分より
+    新しいコメントが先に表示されないようにする。
+    """
+    target.live_buffer.start()
+
+    def _do_resume() -> None:
+        try:
+            resume(target)
+        finally:
+            # 接続が古くなっていれば、バッファは次の接続のものなので触らない
+            if target.is_current():
+                flush_live_frames(target)
+
+    threading.Thread(target=_do_resume, daemon=True).start()
+
+
+def reload_history(target: SessionTarget) -> None:
+    session = target.session
+    try:
+        normalized_session, messages, has_more = fetch_bootstrap_page(session)
+    except BackendApiError:
+        return
+    if not target.is_current() or normalized_session != session:
+        return
+    replace_history(target, messages, has_more)
+
+
+def replace_history(
+    target: SessionTarget, messages: list[dict[str, object]], has_more: bool
+) -> None:
+    target.replace_history(messages)
+    if has_more:
+        start_history_backfill(target, messages)
+
+
+def start_history_backfill(
+    target: SessionTarget, newest_page: list[dict[str, object]]
+) -> None:
+    """最新ページを表示したあと、それより古い履歴を裏でページごとに取り込む。"""
+    ids = [m["id"] for m in newest_page if isinstance(m.get("id"), int)]
+    if not ids:
+        return
+    session = target.session
+    epoch = target.history_epoch()
+
+    def _do_backfill() -> None:
+        try:
+            for page in iter_older_bootstrap_pages(session, min(ids)):
+                if not target.is_current() or target.history_epoch() != epoch:
+                    return
+                target.prepend_history(page)
+        except BackendApiError:
+            return
+
+    threading.Thread(target=_do_backfill, daemon=True).start()
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+
+from config.constants import BACKEND_WS_ORIGIN
+from services import session_pipeline
+from services.backend_api import BackendApiError, build_ws_url, parse_ws_event
+from services.live_buffer import LiveFrameBuffer
+from services.reaction_coalescer import ReactionCoalescer
+from services.ws_transport import (
+    ConnectionHealth,
+    ConnectionStats,
+    MessageDispatcher,
+    WebSocketRejected,
+    get_engine,
+    run_reconnecting_connection,
+)
+from state.session_store import SessionStore
+from ui.overlay import is_stamp
+
+
+class WatchedSession:
+    """主セッションとは別に監視するセッション。接続は共有エンジン上で動く。
+
+    接続・再開・遡り取得は主セッションと同じ session_pipeline で進め、取り込み先
+    としてこのセッションのストアを渡す。
+    """
+
+    def __init__(self, session: str) -> None:
+        # key は監視開始時の名前、session はサーバーが正規化したセッション名。
+        self.key = session
+        self.session = session
+        self.store = SessionStore(session)
+        self.health = ConnectionHealth()
+        self.error: str | None = None
+        self._reactions = ReactionCoalescer(self.store.apply_reaction_updates)
+        # 履歴の取得が終わるまでライブのフレームを溜める。主セッションと同じ仕組み。
+        self.live_buffer = LiveFrameBuffer()
+        self._lock = threading.Lock()
+        self._active = True
+        self._future: concurrent.futures.Future[None] | None = None
+        # 履歴を置き換えるたびに進め、古い履歴の遡り取得を打ち切る目印にする。
+        self._history_epoch = 0
+
+    @property
+    def active(self) -> bool:
+        with self._lock:
+            return self._active
+
+    def stats(self) -> ConnectionStats:
+        return self.health.snapshot()
+
+    def _attach(self, future: concurrent.futures.Future[None]) -> bool:
+        """接続を差し替える。前の接続は閉じる。監視をやめていれば何もしない。"""
+        with self._lock:
+            if not self._active:
+                return False
+            previous, self._future = self._future, future
+        if previous is not None:
+            previous.cancel()
+        return True
+
+    def _fail(self, message: str) -> None:
+        """監視は続けたまま接続を閉じ、失敗を表示させる。watch_session で再試行できる。"""
+        with self._lock:
+            self.error = message
+            future = self._future
+            self._future = None
+        if future is not None:
+            future.cancel()
+        self.live_buffer.stop()
+        self.health.mark_closed()
+
+    def _retry(self) -> bool:
+        """失敗した監視なら失敗を消して True を返す。"""
+        with self._lock:
+            if not self._active or self.error is None:
+                return False
+            self.error = None
+            return True
+
+    def _stop(self) -> None:
+        with self._lock:
+            self._active = False
+            future = self._future
+            self._future = None
+        if future is not None:
+            future.cancel()
+        self.live_buffer.stop()
+        self._reactions.discard()
+
+    # 以下は session_pipeline の取り込み先としての実装
+
+    def is_current(self) -> bool:
+        return self.active
+
+    def is_subscribing(self, session: str) -> bool:
+        with self._lock:
+            return self._active and self.error is None
+
+    def start_socket(self, session: str, opened: threading.Event) -> bool:
+        return _start_watch_socket(self, session, opened)
+
+    def set_session(self, session: str) -> None:
+        self.session = session
+        self.store.session = session
+
+    def comment_cursor(self) -> int | None:
+        return self.store.comment_cursor()
+
+    def replace_history(self, messages: list[dict[str, object]]) -> None:
+        with self._lock:
+            self._history_epoch += 1
+        self.store.replace_history([m for m in messages if not is_stamp(m)])
+        # スタンプも ID は進めておく。差分取得で取り直さないため
+        for message in messages:
+            self.store.advance_comment_cursor(message.get("id"))
+
+    def history_epoch(self) -> int:
+        with self._lock:
+            return self._history_epoch
+
+    def prepend_history(self, messages: list[dict[str, object]]) -> None:
+        self.store.prepend_history([m for m in messages if not is_stamp(m)])
+
+    def add_comment(self, message: dict[str, object]) -> bool:
+        if is_stamp(message):
+            self.store.advance_comment_cursor(message.get("id"))
+            return True
+        return self.store.add_live(message)
+
+    def apply_reaction_updates(self, bookmark_counts: dict[int, int]) -> None:
+        self.store.apply_reaction_updates(bookmark_counts)
+
+    def dispatch(self, message: str, session: str, received_at: float) -> None:
+        _dispatch_to_store(message, self)
+
+
+_watch_lock = threading.Lock()
+_watched: dict[str, WatchedSession] = {}
+
+
+def watched_sessions() -> list[WatchedSession]:
+    with _watch_lock:
+        return list(_watched.values())
+
+
+def watch_session(session_name: str) -> WatchedSession:
+    """セッションの監視を始める。すでに監視中ならそのまま返す。
+
+    失敗して止まっている監視は同じ WatchedSession のまま始め直す。履歴の取得と
+    接続は裏で進み、結果は戻り値のストアと health に反映される。
+    """
+    key = session_name.strip() or "default"
+    with _watch_lock:
+        watched = _watched.get(key)
+        if watched is None:
+            watched = WatchedSession(key)
+            _watched[key] = watched
+        elif not watched._retry():
+            return watched
+
+    threading.Thread(target=_do_watch, args=(watched,), daemon=True).start()
+    return watched
+
+
+def unwatch_session(session_name: str) -> None:
+    key = session_name.strip() or "default"
+    with _watch_lock:
+        watched = _watched.pop(key, None)
+    if watched is not None:
+        watched._stop()
+
+
+def unwatch_all() -> None:
+    with _watch_lock:
+        targets = list(_watched.values())
+        _watched.clear()
+    for watched in targets:
+        watched._stop()
+
+
+def _do_watch(watched: WatchedSession) -> None:
+    try:
+        session_pipeline.connect(watched, watched.session)
+    except BackendApiError as exc:
+        watched._fail(str(exc))
+
+
+def _start_watch_socket(
+    watched: WatchedSession, session: str, opened: threading.Event
+) -> bool:
+    future = get_engine().submit(_run_watch(watched, session, opened))
+    if watched._attach(future):
+        return True
+    future.cancel()
+    return False
+
+
+def _dispatch_to_store(message: str, watched: WatchedSession) -> None:
+    parsed = parse_ws_event(message)
+    if parsed is None:
+        return
+    event_type, event = parsed
+    if event.get("session") != watched.session:
+        return
+    if event_type == "comment.created":
+        watched.add_comment(event)
+    elif event_type == "comment.reactions.updated":
+        comment_id = event.get("comment_id")
+        bookmark_count = event.get("bookmark_count")
+        if isinstance(comment_id, int) and isinstance(bookmark_count, int):
+            watched._reactions.submit(comment_id, bookmark_count)
+
+
+async def _run_watch(
+    watched: WatchedSession, session: str, opened: threading.Event
+) -> None:
+    def on_open(reconnected: bool) -> None:
+        opened.set()
+        if reconnected:
+            session_pipeline.resume_in_background(watched)
+
+    def handle_message(message: str, received_at: float) -> None:
+        session_pipeline.handle_live_frame(watched, session, message, received_at)
+
+    dispatcher = MessageDispatcher(handle_message, name=f"beaver-watch-{watched.key}")
+    try:
+        await run_reconnecting_connection(
+            build_ws_url(session),
+            origin=BACKEND_WS_ORIGIN,
+            health=watched.health,
+            should_continue=lambda: watched.active,
+            on_open=on_open,
+            on_message=dispatcher.submit,
+        )
+    except WebSocketRejected as exc:
+        watched._fail(str(exc))
+    finally:
+        dispatcher.close()
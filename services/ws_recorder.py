@@ -0,0 +1,145 @@
+"""WebSocket 受信フレームの記録と再生。
+
+記録は 1 行 1 JSON の JSONL で、先頭行がヘッダー、以降が
+``{"t": 記録開始からの秒数, "m": 受信したテキスト}`` になる。
+時刻は time.monotonic 基準なので、壁時計のずれに影響されない。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import IO
+
+from services import json_codec
+
+RECORDING_FORMAT_VERSION = 1
+
+
+class RecordingFormatError(ValueError):
+    pass
+
+
+class FrameRecorder:
+    """受信フレームを受信時刻つきで追記する。複数スレッドから呼んでよい。"""
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        session: str,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._started = clock()
+        self._file: IO[str] | None = self.path.open("w", encoding="utf-8")
+        self.frames = 0
+        header = {
+            "v": RECORDING_FORMAT_VERSION,
+            "session": session,
+            "started_at": datetime.now().astimezone().isoformat(),
+        }
+        self._write_line(header)
+
+    def record(self, message: str, *, received_at: float | None = None) -> None:
+        """received_at（clock と同じ基準）を渡すと、書き込み時刻ではなく受信時刻で記録する。"""
+        now = self._clock() if received_at is None else received_at
+        # 開く前に受信して溜めていたフレームは先頭（0 秒）に寄せる
+        offset = max(0.0, now - self._started)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(json_codec.dumps({"t": round(offset, 6), "m": message}))
+            self._file.write("\n")
+            self.frames += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._file = None
+
+    def _write_line(self, value: dict[str, object]) -> None:
+        assert self._file is not None
+        self._file.write(json_codec.dumps(value))
+        self._file.write("\n")
+
+
+def recording_path(directory: str | Path, session: str) -> Path:
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    safe_session = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in session)
+    return Path(directory) / f"ws-{safe_session or 'session'}-{stamp}.jsonl"
+
+
+def read_recording(
+    path: str | Path,
+) -> tuple[dict[str, object], list[tuple[float, str]]]:
+    """記録を読み込み、ヘッダーと (オフセット秒, メッセージ) の一覧を返す。"""
+    with Path(path).open(encoding="utf-8") as file:
+        lines = iter(file)
+        try:
+            header = json_codec.loads(next(lines))
+        except (StopIteration, ValueError) as exc:
+            raise RecordingFormatError("recording header is missing") from exc
+        if not isinstance(header, dict) or header.get("v") != RECORDING_FORMAT_VERSION:
+            raise RecordingFormatError("unsupported recording version")
+        frames: list[tuple[float, str]] = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json_codec.loads(line)
+            except ValueError as exc:
+                raise RecordingFormatError("frame record is not JSON") from exc
+            if not isinstance(record, dict):
+                raise RecordingFormatError("frame record is invalid")
+            offset = record.get("t")
+            message = record.get("m")
+            if not isinstance(offset, (int, float)) or not isinstance(message, str):
+                raise RecordingFormatError("frame record is invalid")
+            frames.append((float(offset), message))
+    return header, frames
+
+
+def _paced(
+    frames: list[tuple[float, str]],
+    speed: float,
+    clock: Callable[[], float],
+    sleep: Callable[[float], None],
+) -> Iterator[str]:
+    started = clock()
+    for offset, message in frames:
+        if speed > 0:
+            delay = (offset / speed) - (clock() - started)
+            if delay > 0:
+                sleep(delay)
+        yield message
+
+
+def replay_frames(
+    frames: list[tuple[float, str]],
+    dispatch: Callable[[str], None],
+    *,
+    speed: float = 1.0,
+    should_continue: Callable[[], bool] = lambda: True,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+) -> int:
+    """記録どおりの間隔の 1/speed でフレームを流す。speed が 0 以下なら待たずに流す。
+
+    流したフレーム数を返す。
+    """
+    count = 0
+    for message in _paced(frames, speed, clock, sleep):
+        if not should_continue():
+            break
+        dispatch(message)
+        count += 1
+    return count
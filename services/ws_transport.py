@@ -0,0 +1,667 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import dataclasses
+import logging
+import queue
+import random
+import ssl
+import threading
+import time
+from collections.abc import Callable, Coroutine
+from typing import Any
+from urllib.parse import urlsplit
+
+from wsproto import WSConnection
+from wsproto.connection import ConnectionState, ConnectionType
+from wsproto.events import (
+    AcceptConnection,
+    CloseConnection,
+    Ping,
+    Pong,
+    RejectConnection,
+    RejectData,
+    Request,
+    TextMessage,
+)
+from wsproto.extensions import Extension, PerMessageDeflate
+from wsproto.utilities import ProtocolError
+
+from config.constants import (
+    BACKEND_HTTP_TIMEOUT_SEC,
+    BACKEND_WS_PERMESSAGE_DEFLATE,
+    WS_HEARTBEAT_INTERVAL_SEC,
+    WS_HEARTBEAT_MAX_MISSED_PONGS,
+    WS_RECEIVE_BUFFER_MAX_BYTES,
+    WS_RECEIVE_BUFFER_MIN_BYTES,
+    WS_RECONNECT_BASE_DELAY_SEC,
+    WS_RECONNECT_JITTER_RATIO,
+    WS_RECONNECT_MAX_DELAY_SEC,
+    WS_STABLE_CONNECTION_SEC,
+)
+
+_logger = logging.getLogger(__name__)
+
+_SENDABLE_STATES = (ConnectionState.OPEN, ConnectionState.REMOTE_CLOSING)
+# 小さい読み込みがこの回数続いたらバッファを半分に縮める。
+_RECEIVE_BUFFER_SHRINK_AFTER_READS = 64
+
+
+class WebSocketRejected(RuntimeError):
+    pass
+
+
+class WebSocketStale(ConnectionError):
+    pass
+
+
+class WebSocketEngine:
+    """全 WebSocket 接続で共有する asyncio イベントループ（専用スレッド 1 本）。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if (
+                self._loop is not None
+                and self._thread is not None
+                and self._thread.is_alive()
+            ):
+                return self._loop
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=self._run_loop,
+                args=(loop,),
+                name="beaver-ws-engine",
+                daemon=True,
+            )
+            self._loop = loop
+            self._thread = thread
+            thread.start()
+            return loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> concurrent.futures.Future[Any]:
+        """コルーチンをエンジン上で実行する。戻り値の cancel() で即座に停止できる。"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def call_soon(self, callback: Callable[[], object]) -> None:
+        self._ensure_loop().call_soon_threadsafe(callback)
+
+    def call_later(self, delay: float, callback: Callable[[], object]) -> None:
+        """delay 秒後にエンジンのスレッドで callback を呼ぶ。どのスレッドから呼んでもよい。"""
+        loop = self._ensure_loop()
+        loop.call_soon_threadsafe(loop.call_later, delay, callback)
+
+
+_engine = WebSocketEngine()
+
+
+def get_engine() -> WebSocketEngine:
+    return _engine
+
+
+class MessageDispatcher:
+    """受信メッセージをループの外の専用スレッド 1 本で、届いた順に処理する。
+
+    ハンドラの処理や記録の書き込みが遅くても、共有ループ上の他の接続や ping は
+    止まらない。受信時刻（perf_counter）はループ上で取ってハンドラへ渡す。
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str, float], None],
+        *,
+        name: str = "beaver-ws-dispatch",
+    ) -> None:
+        self._handler = handler
+        self._queue: queue.SimpleQueue[tuple[str, float] | None] = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, message: str) -> None:
+        self._queue.put((message, time.perf_counter()))
+
+    def close(self) -> None:
+        """積まれた分を処理し終えたらスレッドを終える。"""
+        self._queue.put(None)
+
+    def join(self, timeout: float | None = None) -> None:
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            message, received_at = item
+            try:
+                self._handler(message, received_at)
+            except Exception:
+                # 1 件の処理に失敗しても、後続のメッセージは止めない
+                _logger.exception("websocket message handler failed")
+
+
+CONNECTION_CONNECTING = "connecting"
+CONNECTION_OPEN = "open"
+CONNECTION_DEGRADED = "degraded"
+CONNECTION_BACKING_OFF = "backing_off"
+CONNECTION_CLOSED = "closed"
+
+
+class ReconnectBackoff:
+    """指数バックオフ + ジッタ。全クライアントが同時に再接続しないよう遅延をばらつかせる。"""
+
+    def __init__(
+        self,
+        base_delay: float = WS_RECONNECT_BASE_DELAY_SEC,
+        max_delay: float = WS_RECONNECT_MAX_DELAY_SEC,
+        jitter_ratio: float = WS_RECONNECT_JITTER_RATIO,
+        *,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self._base_delay = max(0.0, base_delay)
+        self._max_delay = max(self._base_delay, max_delay)
+        self._jitter_ratio = min(1.0, max(0.0, jitter_ratio))
+        self._rng = rng
+        self._attempt = 0
+
+    @property
+    def attempt(self) -> int:
+        return self._attempt
+
+    def next_delay(self) -> float:
+        delay = min(self._max_delay, self._base_delay * (2**self._attempt))
+        self._attempt += 1
+        # 上限付きの遅延から最大 jitter_ratio 分だけランダムに差し引く。
+        return delay * (1.0 - self._jitter_ratio * self._rng())
+
+    def reset(self) -> None:
+        self._attempt = 0
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ConnectionStats:
+    state: str
+    reconnect_attempts: int
+    reconnects: int
+    last_time_to_reconnect_sec: float | None
+    max_time_to_reconnect_sec: float | None
+    next_retry_delay_sec: float | None
+
+
+class ConnectionHealth:
+    """接続状態の遷移と再接続カウンタを保持する。状態が変わると on_change を呼ぶ。"""
+
+    def __init__(
+        self,
+        on_change: Callable[[str, ConnectionStats], None] | None = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._on_change = on_change
+        self._clock = clock
+        self._state = CONNECTION_CLOSED
+        self._reconnect_attempts = 0
+        self._reconnects = 0
+        self._dropped_at: float | None = None
+        self._last_time_to_reconnect: float | None = None
+        self._max_time_to_reconnect: float | None = None
+        self._next_retry_delay: float | None = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def mark_connecting(self) -> None:
+        with self._lock:
+            if self._dropped_at is not None:
+                self._reconnect_attempts += 1
+            self._next_retry_delay = None
+        self._transition(CONNECTION_CONNECTING)
+
+    def mark_open(self, *, stable: bool) -> None:
+        with self._lock:
+            if self._dropped_at is not None:
+                elapsed = self._clock() - self._dropped_at
+                self._reconnects += 1
+                self._last_time_to_reconnect = elapsed
+                if (
+                    self._max_time_to_reconnect is None
+                    or elapsed > self._max_time_to_reconnect
+                ):
+                    self._max_time_to_reconnect = elapsed
+                self._dropped_at = None
+        self._transition(CONNECTION_OPEN if stable else CONNECTION_DEGRADED)
+
+    def mark_degraded(self) -> None:
+        if self.state == CONNECTION_OPEN:
+            self._transition(CONNECTION_DEGRADED)
+
+    def mark_stable(self) -> None:
+        if self.state == CONNECTION_DEGRADED:
+            self._transition(CONNECTION_OPEN)
+
+    def mark_dropped(self) -> None:
+        with self._lock:
+            if self._dropped_at is None:
+                self._dropped_at = self._clock()
+
+    def mark_backing_off(self, delay: float) -> None:
+        with self._lock:
+            self._next_retry_delay = delay
+        self._transition(CONNECTION_BACKING_OFF)
+
+    def mark_closed(self) -> None:
+        with self._lock:
+            self._dropped_at = None
+            self._next_retry_delay = None
+        self._transition(CONNECTION_CLOSED)
+
+    def snapshot(self) -> ConnectionStats:
+        with self._lock:
+            return ConnectionStats(
+                state=self._state,
+                reconnect_attempts=self._reconnect_attempts,
+                reconnects=self._reconnects,
+                last_time_to_reconnect_sec=self._last_time_to_reconnect,
+                max_time_to_reconnect_sec=self._max_time_to_reconnect,
+                next_retry_delay_sec=self._next_retry_delay,
+            )
+
+    def _transition(self, new_state: str) -> None:
+        with self._lock:
+            self._state = new_state
+        if self._on_change is not None:
+            self._on_change(new_state, self.snapshot())
+
+
+class _AdaptiveReceiveBuffer:
+    """recv_into 用の事前確保バッファ。
+
+    読み込みが満杯になれば倍に広げ、1/4 未満の読み込みが続けば縮める。
+    """
+
+    def __init__(
+        self,
+        min_size: int = WS_RECEIVE_BUFFER_MIN_BYTES,
+        max_size: int = WS_RECEIVE_BUFFER_MAX_BYTES,
+    ) -> None:
+        self._min_size = max(1, min_size)
+        self._max_size = max(self._min_size, max_size)
+        self._small_reads = 0
+        self._resize(self._min_size)
+
+    @property
+    def size(self) -> int:
+        return len(self._buffer)
+
+    def view(self) -> memoryview:
+        return self._view
+
+    def record_read(self, nbytes: int) -> None:
+        size = len(self._buffer)
+        if nbytes >= size:
+            self._small_reads = 0
+            if size < self._max_size:
+                self._resize(min(self._max_size, size * 2))
+            return
+        if nbytes * 4 <= size and size > self._min_size:
+            self._small_reads += 1
+            if self._small_reads >= _RECEIVE_BUFFER_SHRINK_AFTER_READS:
+                self._small_reads = 0
+                self._resize(max(self._min_size, size // 2))
+            return
+        self._small_reads = 0
+
+    def _resize(self, size: int) -> None:
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+
+
+class _WebSocketClientProtocol(asyncio.BufferedProtocol):
+    def __init__(
+        self,
+        request: Request,
+        on_open: Callable[[], None],
+        on_message: Callable[[str], None],
+        on_rtt: Callable[[float], None] | None = None,
+    ) -> None:
+        self._request = request
+        self._on_open = on_open
+        self._on_message = on_message
+        self._on_rtt = on_rtt
+        self._connection = WSConnection(ConnectionType.CLIENT)
+        self._ping_serial = 0
+        self._pending_pings: dict[bytes, float] = {}
+        self._transport: asyncio.Transport | None = None
+        self._receive_buffer = _AdaptiveReceiveBuffer()
+        self._message_parts: list[str] = []
+        self.accepted = False
+        self.closed: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        assert isinstance(transport, asyncio.Transport)
+        self._transport = transport
+        transport.write(self._connection.send(self._request))
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self._receive_buffer.view()
+
+    def buffer_updated(self, nbytes: int) -> None:
+        try:
+            # wsproto は内部 bytearray へ追記するだけなので、bytes を作らずスライスを渡す。
+            self._connection.receive_data(self._receive_buffer.view()[:nbytes])
+            self._receive_buffer.record_read(nbytes)
+            self._process_events()
+        except ProtocolError as exc:
+            self._abort(exc)
+
+    def eof_received(self) -> bool | None:
+        try:
+            self._connection.receive_data(None)
+            self._process_events()
+        except ProtocolError as exc:
+            self._abort(exc)
+            return None
+        self._finish()
+        return None
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self._finish(exc)
+
+    def close(self) -> None:
+        transport = self._transport
+        if transport is None or transport.is_closing():
+            return
+        if self._connection.state == ConnectionState.OPEN:
+            transport.write(self._connection.send(CloseConnection(code=1000)))
+        transport.close()
+
+    def _finish(self, exc: BaseException | None = None) -> None:
+        if self.closed.done():
+            return
+        if exc is None:
+            self.closed.set_result(None)
+        else:
+            self.closed.set_exception(exc)
+
+    @property
+    def missed_pongs(self) -> int:
+        return len(self._pending_pings)
+
+    def send_ping(self) -> None:
+        self._ping_serial += 1
+        payload = self._ping_serial.to_bytes(8, "big")
+        self._pending_pings[payload] = time.monotonic()
+        self._send(Ping(payload=payload))
+
+    def abort(self, exc: Exception) -> None:
+        self._abort(exc)
+
+    def _abort(self, exc: Exception) -> None:
+        self._finish(exc)
+        if self._transport is not None:
+            self._transport.close()
+
+    def _send(self, event: Any) -> None:
+        transport = self._transport
+        if transport is None or transport.is_closing():
+            return
+        if self._connection.state not in _SENDABLE_STATES:
+            return
+        transport.write(self._connection.send(event))
+
+    def _handle_pong(self, payload: bytes) -> None:
+        sent_at = self._pending_pings.pop(payload, None)
+        if sent_at is None:
+            return
+        # 応答があれば回線は生きているので、それ以前の未応答 ping も打ち切る。
+        self._pending_pings.clear()
+        if self._on_rtt is not None:
+            self._on_rtt(time.monotonic() - sent_at)
+
+    def _process_events(self) -> None:
+        for event in self._connection.events():
+            if isinstance(event, AcceptConnection):
+                self.accepted = True
+                self._on_open()
+            elif isinstance(event, RejectConnection):
+                self._finish(
+                    WebSocketRejected(
+                        f"websocket rejected with status {event.status_code}"
+                    )
+                )
+                if self._transport is not None:
+                    self._transport.close()
+                return
+            elif isinstance(event, RejectData):
+                continue
+            elif isinstance(event, TextMessage):
+                if event.message_finished and not self._message_parts:
+                    # 分割されていないメッセージは連結せずそのまま渡す。
+                    self._on_message(event.data)
+                    continue
+                self._message_parts.append(event.data)
+                if event.message_finished:
+                    message = "".join(self._message_parts)
+                    self._message_parts.clear()
+                    self._on_message(message)
+            elif isinstance(event, Ping):
+                self._send(event.response())
+            elif isinstance(event, Pong):
+                self._handle_pong(bytes(event.payload))
+            elif isinstance(event, CloseConnection):
+                self._send(event.response())
+                if self._transport is not None:
+                    self._transport.close()
+                self._finish()
+                return
+
+
+async def _create_connection_with_timeout(
+    connect: Coroutine[
+        Any, Any, tuple[asyncio.BaseTransport, _WebSocketClientProtocol]
+    ],
+    timeout: float,
+) -> tuple[asyncio.BaseTransport, _WebSocketClientProtocol]:
+    # asyncio.wait_for は接続完了と同時に届いたキャンセルを握りつぶすことがあるため、
+    # asyncio.wait で待ち、キャンセル時は確立済みの接続も確実に閉じる。
+    task = asyncio.ensure_future(connect)
+    try:
+        done, _pending = await asyncio.wait({task}, timeout=timeout)
+    except asyncio.CancelledError:
+        task.cancel()
+        task.add_done_callback(_close_if_connected)
+        raise
+    if not done:
+        task.cancel()
+        task.add_done_callback(_close_if_connected)
+        raise TimeoutError("websocket connect timed out")
+    return task.result()
+
+
+def _close_if_connected(task: asyncio.Future[Any]) -> None:
+    if task.cancelled() or task.exception() is not None:
+        return
+    transport, _protocol = task.result()
+    transport.close()
+
+
+async def _run_heartbeat(
+    protocol: _WebSocketClientProtocol,
+    interval: float,
+    max_missed_pongs: int,
+    on_pong_missed: Callable[[int], None] | None,
+) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        if not protocol.accepted:
+            continue
+        missed = protocol.missed_pongs
+        if missed >= max_missed_pongs:
+            protocol.abort(WebSocketStale(f"no pong for {missed} consecutive pings"))
+            return
+        if missed > 0 and on_pong_missed is not None:
+            on_pong_missed(missed)
+        protocol.send_ping()
+
+
+async def run_websocket_connection(
+    url: str,
+    *,
+    origin: str,
+    on_open: Callable[[], None],
+    on_message: Callable[[str], None],
+    compression: bool = BACKEND_WS_PERMESSAGE_DEFLATE,
+    heartbeat_interval: float = WS_HEARTBEAT_INTERVAL_SEC,
+    max_missed_pongs: int = WS_HEARTBEAT_MAX_MISSED_PONGS,
+    on_rtt: Callable[[float], None] | None = None,
+    on_pong_missed: Callable[[int], None] | None = None,
+) -> bool:
+    """1 回分の接続を閉じられるまで処理する。ハンドシェイクが成立していれば True。
+
+    キャンセルされると即座にソケットを閉じて CancelledError を送出する。
+    compression が真なら permessage-deflate を提案し、サーバーが応じなければ非圧縮で続ける。
+    heartbeat_interval ごとに ping を送り、max_missed_pongs 回続けて pong が返らなければ
+    WebSocketStale で接続を打ち切る。
+    """
+    parsed = urlsplit(url)
+    hostname = parsed.hostname
+    if hostname is None:
+        raise WebSocketRejected("websocket host is invalid")
+
+    port = parsed.port
+    if port is None:
+        port = 443 if parsed.scheme == "wss" else 80
+
+    target = parsed.path or "/"
+    if parsed.query:
+        target = f"{target}?{parsed.query}"
+    # 拡張は接続ごとに圧縮状態を持つため、毎回新しいインスタンスを渡す。
+    extensions: list[Extension] = [PerMessageDeflate()] if compression else []
+    request = Request(
+        host=parsed.netloc,
+        target=target,
+        extensions=extensions,
+        extra_headers=[(b"origin", origin.encode("utf-8"))],
+    )
+
+    ssl_context: ssl.SSLContext | None = None
+    if parsed.scheme == "wss":
+        ssl_context = ssl.create_default_context()
+
+    loop = asyncio.get_running_loop()
+    transport, protocol = await _create_connection_with_timeout(
+        loop.create_connection(
+            lambda: _WebSocketClientProtocol(request, on_open, on_message, on_rtt),
+            hostname,
+            port,
+            ssl=ssl_context,
+            server_hostname=hostname if ssl_context is not None else None,
+        ),
+        BACKEND_HTTP_TIMEOUT_SEC,
+    )
+    heartbeat: asyncio.Task[None] | None = None
+    if heartbeat_interval > 0:
+        heartbeat = loop.create_task(
+            _run_heartbeat(
+                protocol, heartbeat_interval, max(1, max_missed_pongs), on_pong_missed
+            )
+        )
+    try:
+        await protocol.closed
+    finally:
+        if heartbeat is not None:
+            heartbeat.cancel()
+        protocol.close()
+        transport.close()
+    return protocol.accepted
+
+
+async def run_reconnecting_connection(
+    url: str,
+    *,
+    origin: str,
+    health: ConnectionHealth,
+    should_continue: Callable[[], bool],
+    on_open: Callable[[bool], None],
+    on_message: Callable[[str], None],
+    on_rtt: Callable[[float], None] | None = None,
+    backoff: ReconnectBackoff | None = None,
+    stable_after: float = WS_STABLE_CONNECTION_SEC,
+) -> None:
+    """should_continue が真の間、切断されてもバックオフを挟んで接続し直す。
+
+    on_open には再接続かどうかを渡す。再接続直後は「不安定」として開き、
+    stable_after 秒もてば「接続済み」へ戻してバックオフをリセットする。
+    サーバーに拒否された場合は WebSocketRejected をそのまま送出する。
+    """
+    loop = asyncio.get_running_loop()
+    backoff = backoff or ReconnectBackoff()
+    stable_timer: list[asyncio.TimerHandle | None] = [None]
+
+    def mark_stable() -> None:
+        stable_timer[0] = None
+        backoff.reset()
+        health.mark_stable()
+
+    def handle_open() -> None:
+        reconnected = backoff.attempt > 0
+        health.mark_open(stable=not reconnected)
+        if reconnected:
+            stable_timer[0] = loop.call_later(stable_after, mark_stable)
+        on_open(reconnected)
+
+    def handle_rtt(seconds: float) -> None:
+        if on_rtt is not None:
+            on_rtt(seconds)
+        if stable_timer[0] is None:
+            health.mark_stable()
+
+    def handle_pong_missed(_missed: int) -> None:
+        health.mark_degraded()
+
+    try:
+        while should_continue():
+            health.mark_connecting()
+            try:
+                await run_websocket_connection(
+                    url,
+                    origin=origin,
+                    on_open=handle_open,
+                    on_message=on_message,
+                    on_rtt=handle_rtt,
+                    on_pong_missed=handle_pong_missed,
+                )
+            except WebSocketRejected:
+                if not should_continue():
+                    break
+                raise
+            except (OSError, ProtocolError):
+                # 通信断・タイムアウト・ping 無応答（WebSocketStale）はつなぎ直す
+                if not should_continue():
+                    break
+            finally:
+                if stable_timer[0] is not None:
+                    stable_timer[0].cancel()
+                    stable_timer[0] = None
+
+            if not should_continue():
+                break
+            health.mark_dropped()
+            delay = backoff.next_delay()
+            health.mark_backing_off(delay)
+            await asyncio.sleep(delay)
+    finally:
+        health.mark_closed()
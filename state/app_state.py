@@ -5,25 +5,35 @@ import queue
 import threading
 import time
 from collections import deque
+from collections.abc import Callable, Iterable, Mapping
 
 import tkinter as tk
 
 from config.constants import (
+    BEHAVIOR_EVENT_LOG_MAX_SIZE,
     STAMP_BALLOON_LIFETIME_SEC,
     STAMP_BALLOON_MAX_SPEED_PX,
     STAMP_BALLOON_MIN_SPEED_PX,
 )
-from ui.comment_ui import CommentEntry
+from state.ingest_queue import IngestQueue
+from state.message_store import MessageStore
 
-message_queue: queue.Queue[dict[str, object]] = queue.Queue()
+message_queue = IngestQueue()
 behavior_event_queue: queue.Queue[dict[str, object]] = queue.Queue()
-message_log: list[dict[str, object]] = []
+_message_store = MessageStore()
+message_log = _message_store.message_log
+# id の昇順。どのセッションのログかは _behavior_event_session で持つ
 behavior_event_log: list[dict[str, object]] = []
-messages: list[CommentEntry] = []
-_message_lock = threading.Lock()
-_message_generation = 0
+messages = _message_store.messages
 _behavior_event_lock = threading.Lock()
 _behavior_event_generation = 0
+_behavior_event_ids: set[int] = set()
+_behavior_event_session: str | None = None
+# 手元の最古より古いログがサーバーに残っているかどうか
+_behavior_event_has_older = True
+# 取得 API で途切れなく取り込めている最大 id。WebSocket で先に届いた分は含めないので、
+# 差分取得はここから始めれば間に抜けたログも拾える
+_behavior_event_synced_id: int | None = None
 
 overlay_window: tk.Toplevel | None = None
 overlay_canvas: tk.Canvas | None = None
@@ -86,44 +96,22 @@ def reset_stamp_experiment_settings() -> None:
 
 _server_offset_lock = threading.Lock()
 _server_offset: float | None = None
-def clear_messages() -> None:
-    global _message_generation
-    with _message_lock:
-        messages.clear()
-        _message_generation += 1
-
-
-def append_message(entry: CommentEntry) -> None:
-    with _message_lock:
-        messages.append(entry)
-
-
-def snapshot_messages() -> tuple[int, list[CommentEntry]]:
-    with _message_lock:
-        return _message_generation, list(messages)
+clear_messages = _message_store.clear_messages
+append_message = _message_store.append_message
+replace_message_log = _message_store.replace_message_log
+append_message_log = _message_store.append_message_log
+prepend_message_log = _message_store.prepend_message_log
+prepend_messages = _message_store.prepend_messages
+advance_comment_cursor = _message_store.advance_comment_cursor
+reset_comment_cursor = _message_store.reset_comment_cursor
+comment_cursor = _message_store.comment_cursor
+snapshot_messages = _message_store.snapshot_messages
+apply_reaction_updates = _message_store.apply_reaction_updates
 
 
 def apply_reaction_update(comment_id: int, bookmark_count: int) -> None:
     """注目度のライブ更新。変化があれば世代を進めて再描画させる。"""
-    global _message_generation
-    with _message_lock:
-        changed = False
-        for index, entry in enumerate(messages):
-            if entry.id == comment_id:
-                if entry.bookmark_count != bookmark_count:
-                    messages[index] = dataclasses.replace(
-                        entry, bookmark_count=bookmark_count
-                    )
-                    changed = True
-                break
-        for raw in message_log:
-            if raw.get("id") == comment_id:
-                if raw.get("bookmark_count") != bookmark_count:
-                    raw["bookmark_count"] = bookmark_count
-                    changed = True
-                break
-        if changed:
-            _message_generation += 1
+    apply_reaction_updates({comment_id: bookmark_count})
 
 
 def set_reaction_mode(mode: str, reaction_type_items: list[dict[str, object]]) -> None:
@@ -150,26 +138,151 @@ def snapshot_reaction_mode() -> tuple[int, str, list[dict[str, str]]]:
         return _reaction_mode_generation, reaction_mode, [dict(item) for item in reaction_types]
 
 
-def set_behavior_events(events: list[dict[str, object]]) -> None:
+@dataclasses.dataclass(frozen=True, slots=True)
+class BehaviorEventBounds:
+    oldest_id: int | None
+    newest_id: int | None
+    count: int
+    has_older: bool
+    # 取得 API で途切れなく取り込めている最大 id。まだ取得していなければ None
+    synced_id: int | None = None
+
+
+def _reset_behavior_events_locked(session: str | None) -> None:
+    global _behavior_event_session
+    global _behavior_event_has_older
+    global _behavior_event_synced_id
+    behavior_event_log.clear()
+    _behavior_event_ids.clear()
+    _behavior_event_session = session
+    _behavior_event_has_older = True
+    _behavior_event_synced_id = None
+
+
+def _merge_behavior_events_locked(
+    session: str, events: Iterable[Mapping[str, object]]
+) -> int:
     global _behavior_event_generation
+    global _behavior_event_has_older
+    if session != _behavior_event_session:
+        _reset_behavior_events_locked(session)
+    added: list[dict[str, object]] = []
+    for event in events:
+        event_id = event.get("id")
+        if not isinstance(event_id, int) or event_id in _behavior_event_ids:
+            continue
+        _behavior_event_ids.add(event_id)
+        added.append(dict(event))
+    if not added:
+        return 0
+    added.sort(key=_behavior_event_id)
+    if not behavior_event_log or _behavior_event_id(added[0]) > _behavior_event_id(
+        behavior_event_log[-1]
+    ):
+        behavior_event_log.extend(added)
+    elif _behavior_event_id(added[-1]) < _behavior_event_id(behavior_event_log[0]):
+        behavior_event_log[:0] = added
+    else:
+        # 取得とライブ配信が入り組んだときだけ。ほぼ整列済みなので sort は速い
+        behavior_event_log.extend(added)
+        behavior_event_log.sort(key=_behavior_event_id)
+    overflow = len(behavior_event_log) - BEHAVIOR_EVENT_LOG_MAX_SIZE
+    if overflow > 0:
+        for event in behavior_event_log[:overflow]:
+            _behavior_event_ids.discard(_behavior_event_id(event))
+        del behavior_event_log[:overflow]
+        _behavior_event_has_older = True
+    _behavior_event_generation += 1
+    return len(added)
+
+
+def _behavior_event_id(event: Mapping[str, object]) -> int:
+    return event["id"]  # type: ignore[return-value]
+
+
+def merge_behavior_events(
+    session: str,
+    events: Iterable[Mapping[str, object]],
+    *,
+    has_older: bool | None = None,
+    synced_through: int | None = None,
+) -> int:
+    """session のログへ id で重複を除いて取り込み、増えた件数を返す。
+
+    手元のログが別セッションのものなら捨ててから取り込む。has_older を渡すと、
+    最古より古いログが残っているかどうかも更新する（遡って取得したページ用）。
+    synced_through を渡すと、その id まで途切れなく取得できたものとして記録する。
+    """
+    global _behavior_event_has_older
+    global _behavior_event_synced_id
     with _behavior_event_lock:
-        behavior_event_log.clear()
-        behavior_event_log.extend(dict(event) for event in events)
-        _behavior_event_generation += 1
+        if session != _behavior_event_session:
+            _reset_behavior_events_locked(session)
+        if has_older is not None:
+            _behavior_event_has_older = has_older
+        if synced_through is not None and (
+            _behavior_event_synced_id is None
+            or synced_through > _behavior_event_synced_id
+        ):
+            _behavior_event_synced_id = synced_through
+        # 上限を超えて古い側を捨てたら、ここで has_older が戻る
+        return _merge_behavior_events_locked(session, events)
 
 
 def append_behavior_event(event: dict[str, object]) -> None:
+    session = event.get("session")
+    if not isinstance(session, str):
+        return
+    with _behavior_event_lock:
+        added = _merge_behavior_events_locked(session, (event,))
+    if added:
+        behavior_event_queue.put(dict(event))
+
+
+def behavior_event_bounds(session: str) -> BehaviorEventBounds:
+    """session について手元にあるログの範囲。別セッションのログしかなければ空として返す。"""
+    with _behavior_event_lock:
+        if session != _behavior_event_session:
+            return BehaviorEventBounds(None, None, 0, True)
+        if not behavior_event_log:
+            return BehaviorEventBounds(None, None, 0, True, _behavior_event_synced_id)
+        return BehaviorEventBounds(
+            _behavior_event_id(behavior_event_log[0]),
+            _behavior_event_id(behavior_event_log[-1]),
+            len(behavior_event_log),
+            _behavior_event_has_older,
+            _behavior_event_synced_id,
+        )
+
+
+def behavior_event_generation() -> int:
+    with _behavior_event_lock:
+        return _behavior_event_generation
+
+
+def clear_behavior_events() -> None:
     global _behavior_event_generation
     with _behavior_event_lock:
-        behavior_event_log.insert(0, dict(event))
-        del behavior_event_log[500:]
+        _reset_behavior_events_locked(None)
         _behavior_event_generation += 1
-    behavior_event_queue.put(dict(event))
 
 
-def snapshot_behavior_events() -> tuple[int, list[dict[str, object]]]:
+def snapshot_behavior_events(
+    limit: int | None = None,
+    match: Callable[[Mapping[str, object]], bool] | None = None,
+) -> tuple[int, list[dict[str, object]]]:
+    """新しい順に、match に合うログを最大 limit 件コピーして返す。"""
     with _behavior_event_lock:
-        return _behavior_event_generation, [dict(event) for event in behavior_event_log]
+        generation = _behavior_event_generation
+        if match is None and limit is None:
+            return generation, [dict(event) for event in reversed(behavior_event_log)]
+        result: list[dict[str, object]] = []
+        for event in reversed(behavior_event_log):
+            if limit is not None and len(result) >= limit:
+                break
+            if match is None or match(event):
+                result.append(dict(event))
+        return generation, result
 
 
 def set_visible_poll_results(results: dict[str, object] | None) -> None:
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import dataclasses
+import queue
+import threading
+from collections import deque
+from collections.abc import Callable
+
+from config.constants import (
+    INGEST_MERGE_DUPLICATE_STAMPS,
+    INGEST_STAMP_OVERFLOW_POLICY,
+    INGEST_STAMP_QUEUE_CAPACITY,
+    INGEST_TEXT_QUEUE_CAPACITY,
+)
+
+STAMP_POLICY_DROP_OLDEST = "drop_oldest"
+STAMP_POLICY_DROP_NEWEST = "drop_newest"
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class IngestQueueStats:
+    text_depth: int
+    stamp_depth: int
+    dropped_texts: int
+    dropped_stamps: int
+    merged_stamps: int
+
+
+def _is_stamp(entry: dict[str, object]) -> bool:
+    # ui.overlay は app_state 経由でこのモジュールを読み込むので、使う時点で読み込む
+    from ui.overlay import is_stamp
+
+    return is_stamp(entry)
+
+
+def _stamp_key(entry: dict[str, object]) -> object:
+    return entry.get("stamp_url") or entry.get("stamp")
+
+
+class IngestQueue:
+    """受信コメント用の上限付きキュー。
+
+    テキストコメントは常にスタンプより先に取り出す。スタンプは別枠で上限を持ち、
+    溢れたら方針（古い順に捨てる／新着を捨てる）に従い、同じスタンプの重複は
+    1 件にまとめる。queue.Queue と同じく空なら get_nowait が queue.Empty を送出する。
+    捨てたりまとめたりした項目は on_drop に渡す（テキストの取りこぼしも含む）。
+    """
+
+    def __init__(
+        self,
+        *,
+        text_capacity: int = INGEST_TEXT_QUEUE_CAPACITY,
+        stamp_capacity: int = INGEST_STAMP_QUEUE_CAPACITY,
+        stamp_policy: str = INGEST_STAMP_OVERFLOW_POLICY,
+        merge_duplicate_stamps: bool = INGEST_MERGE_DUPLICATE_STAMPS,
+        on_drop: Callable[[dict[str, object]], None] | None = None,
+    ) -> None:
+        if stamp_policy not in (STAMP_POLICY_DROP_OLDEST, STAMP_POLICY_DROP_NEWEST):
+            raise ValueError(f"unknown stamp overflow policy: {stamp_policy}")
+        self._lock = threading.Lock()
+        self._text_capacity = max(1, text_capacity)
+        self._stamp_capacity = max(1, stamp_capacity)
+        self._stamp_policy = stamp_policy
+        self._merge_duplicate_stamps = merge_duplicate_stamps
+        self._on_drop = on_drop
+        self._texts: deque[dict[str, object]] = deque()
+        self._stamps: deque[dict[str, object]] = deque()
+        self._stamp_keys: dict[object, int] = {}
+        self._dropped_texts = 0
+        self._dropped_stamps = 0
+        self._merged_stamps = 0
+
+    def put(self, entry: dict[str, object]) -> bool:
+        """キューへ積む。捨てたりまとめたりした場合は False を返す。"""
+        accepted, dropped = self._put(entry)
+        if dropped is not None and self._on_drop is not None:
+            self._on_drop(dropped)
+        return accepted
+
+    def set_drop_listener(
+        self, on_drop: Callable[[dict[str, object]], None] | None
+    ) -> None:
+        self._on_drop = on_drop
+
+    def _put(self, entry: dict[str, object]) -> tuple[bool, dict[str, object] | None]:
+        """積んだかどうかと、代わりに捨てた（またはまとめた）項目を返す。"""
+        stamp = _is_stamp(entry)
+        with self._lock:
+            if not stamp:
+                dropped = None
+                if len(self._texts) >= self._text_capacity:
+                    dropped = self._texts.popleft()
+                    self._dropped_texts += 1
+                self._texts.append(entry)
+                return True, dropped
+
+            key = _stamp_key(entry)
+            if self._merge_duplicate_stamps and key in self._stamp_keys:
+                self._merged_stamps += 1
+                return False, entry
+            dropped = None
+            if len(self._stamps) >= self._stamp_capacity:
+                if self._stamp_policy == STAMP_POLICY_DROP_NEWEST:
+                    self._dropped_stamps += 1
+                    return False, entry
+                dropped = self._stamps.popleft()
+                self._forget_stamp(dropped)
+                self._dropped_stamps += 1
+            self._stamps.append(entry)
+            self._stamp_keys[key] = self._stamp_keys.get(key, 0) + 1
+            return True, dropped
+
+    def get_nowait(self) -> dict[str, object]:
+        with self._lock:
+            if self._texts:
+                return self._texts.popleft()
+            if self._stamps:
+                entry = self._stamps.popleft()
+                self._forget_stamp(entry)
+                return entry
+        raise queue.Empty
+
+    def empty(self) -> bool:
+        with self._lock:
+            return not self._texts and not self._stamps
+
+    def qsize(self) -> int:
+        with self._lock:
+            return len(self._texts) + len(self._stamps)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._texts.clear()
+            self._stamps.clear()
+            self._stamp_keys.clear()
+
+    def stats(self) -> IngestQueueStats:
+        with self._lock:
+            return IngestQueueStats(
+                text_depth=len(self._texts),
+                stamp_depth=len(self._stamps),
+                dropped_texts=self._dropped_texts,
+                dropped_stamps=self._dropped_stamps,
+                merged_stamps=self._merged_stamps,
+            )
+
+    def _forget_stamp(self, entry: dict[str, object]) -> None:
+        key = _stamp_key(entry)
+        remaining = self._stamp_keys.get(key, 0) - 1
+        if remaining > 0:
+            self._stamp_keys[key] = remaining
+        else:
+            self._stamp_keys.pop(key, None)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import dataclasses
+import threading
+from collections.abc import Mapping
+
+from ui.comment_ui import CommentEntry
+
+
+class MessageStore:
+    """1 セッション分のコメント表示状態と受信ログ。
+
+    主セッションは app_state のモジュール関数から、監視セッションは SessionStore
+    から同じ操作を使う。messages と message_log は作り直さずに中身だけ入れ替える。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.messages: list[CommentEntry] = []
+        self.message_log: list[dict[str, object]] = []
+        self._generation = 0
+        # id から message_log の dict と messages 上の位置を引く索引。リアクション
+        # 更新を全件なめずに反映するため。位置は先頭への追加で動かないよう通し番号で
+        # 持ち、実際の添字は「通し番号 - _head」になる。
+        self._message_log_by_id: dict[int, dict[str, object]] = {}
+        self._message_positions: dict[int, int] = {}
+        self._head = 0
+        # 受信済みコメント ID の最大値。再接続時の差分取得の起点に使う。
+        self._comment_cursor: int | None = None
+
+    def clear_messages(self) -> None:
+        with self._lock:
+            self.messages.clear()
+            self._message_positions.clear()
+            self._head = 0
+            self._generation += 1
+
+    def append_message(self, entry: CommentEntry) -> None:
+        with self._lock:
+            self._message_positions[entry.id] = self._head + len(self.messages)
+            self.messages.append(entry)
+
+    def replace_message_log(self, entries: list[dict[str, object]]) -> None:
+        with self._lock:
+            self.message_log.clear()
+            self.message_log.extend(entries)
+            self._message_log_by_id.clear()
+            for entry in entries:
+                entry_id = entry.get("id")
+                if isinstance(entry_id, int):
+                    self._message_log_by_id.setdefault(entry_id, entry)
+
+    def append_message_log(self, entry: dict[str, object]) -> bool:
+        """ID が未登録なら履歴に追加して True を返す。重複なら何もしない。"""
+        entry_id = entry.get("id")
+        with self._lock:
+            if isinstance(entry_id, int):
+                if entry_id in self._message_log_by_id:
+                    return False
+                self._message_log_by_id[entry_id] = entry
+            self.message_log.append(entry)
+            return True
+
+    def prepend_message_log(
+        self, entries: list[dict[str, object]]
+    ) -> list[dict[str, object]]:
+        """遡って取得した古い履歴を先頭に足す。未登録だった分だけを古い順で返す。"""
+        added: list[dict[str, object]] = []
+        with self._lock:
+            for entry in entries:
+                entry_id = entry.get("id")
+                if isinstance(entry_id, int):
+                    if entry_id in self._message_log_by_id:
+                        continue
+                    self._message_log_by_id[entry_id] = entry
+                added.append(entry)
+            self.message_log[:0] = added
+        return added
+
+    def prepend_messages(self, entries: list[CommentEntry]) -> None:
+        """表示用の一覧の先頭（古い側）にまとめて足す。画面は世代の更新で描き直される。"""
+        if not entries:
+            return
+        with self._lock:
+            self._head -= len(entries)
+            for offset, entry in enumerate(entries):
+                # 同じ id が新しい側に既にあれば、そちらを指したままにする
+                self._message_positions.setdefault(entry.id, self._head + offset)
+            self.messages[:0] = entries
+            self._generation += 1
+
+    def advance_comment_cursor(self, comment_id: object) -> None:
+        if isinstance(comment_id, bool) or not isinstance(comment_id, int):
+            return
+        with self._lock:
+            if self._comment_cursor is None or comment_id > self._comment_cursor:
+                self._comment_cursor = comment_id
+
+    def reset_comment_cursor(self) -> None:
+        with self._lock:
+            self._comment_cursor = None
+
+    def comment_cursor(self) -> int | None:
+        with self._lock:
+            return self._comment_cursor
+
+    def snapshot_messages(self) -> tuple[int, list[CommentEntry]]:
+        with self._lock:
+            return self._generation, list(self.messages)
+
+    def apply_reaction_updates(self, updates: Mapping[int, int]) -> None:
+        """複数コメントの注目度をまとめて反映する。世代は変化があっても 1 回だけ進める。"""
+        if not updates:
+            return
+        with self._lock:
+            changed = False
+            for comment_id, bookmark_count in updates.items():
+                position = self._message_positions.get(comment_id)
+                if position is not None:
+                    index = position - self._head
+                    entry = self.messages[index]
+                    if entry.bookmark_count != bookmark_count:
+                        self.messages[index] = dataclasses.replace(
+                            entry, bookmark_count=bookmark_count
+                        )
+                        changed = True
+                raw = self._message_log_by_id.get(comment_id)
+                if raw is not None and raw.get("bookmark_count") != bookmark_count:
+                    raw["bookmark_count"] = bookmark_count
+                    changed = True
+            if changed:
+                self._generation += 1
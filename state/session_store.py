@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from state.ingest_queue import IngestQueue
+from state.message_store import MessageStore
+from ui.comment_ui import comment_entry_from_message
+
+
+class SessionStore(MessageStore):
+    """追加で監視するセッション 1 つ分のコメント状態。
+
+    主セッションは app_state のモジュール関数を使い、監視セッションはそれぞれ
+    このストアを持つ。どちらも MessageStore の同じ操作で状態を持つ。
+    """
+
+    def __init__(self, session: str) -> None:
+        super().__init__()
+        self.session = session
+        self.message_queue = IngestQueue()
+
+    def replace_history(self, entries: list[dict[str, object]]) -> None:
+        """ブートストラップの結果で状態を置き換え、表示用キューへ積み直す。"""
+        self.clear_messages()
+        self.replace_message_log(list(entries))
+        self.reset_comment_cursor()
+        for entry in entries:
+            self.advance_comment_cursor(entry.get("id"))
+        self.message_queue.clear()
+        for entry in entries:
+            queued = dict(entry)
+            queued["_from_history"] = True
+            self.message_queue.put(queued)
+
+    def prepend_history(self, entries: list[dict[str, object]]) -> None:
+        """遡って取得した古い履歴を、表示中の一覧の先頭へまとめて足す。"""
+        added = self.prepend_message_log(entries)
+        comment_entries = []
+        for message in added:
+            comment_entry = comment_entry_from_message(message)
+            if comment_entry is not None:
+                comment_entries.append(comment_entry)
+        self.prepend_messages(comment_entries)
+
+    def add_live(self, entry: dict[str, object]) -> bool:
+        """ライブで届いたコメントを登録する。重複なら False を返して何もしない。"""
+        self.advance_comment_cursor(entry.get("id"))
+        if not self.append_message_log(entry):
+            return False
+        self.message_queue.put(entry)
+        return True
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import unittest
+from unittest.mock import patch
+
+from state import app_state as state
+from ui.comment_ui import CommentEntry
+
+
+def _entry(comment_id: int, bookmark_count: int = 0) -> CommentEntry:
+    return CommentEntry(
+        id=comment_id,
+        session="demo",
+        name="A",
+        text=f"comment {comment_id}",
+        time="10:00",
+        stamp_url=None,
+        created_at="2026-03-10T00:00:00Z",
+        from_history=False,
+        bookmark_count=bookmark_count,
+    )
+
+
+class ApplyReactionUpdatesTests(unittest.TestCase):
+    def setUp(self) -> None:
+        state.clear_messages()
+        state.replace_message_log(
+            [{"id": 1, "bookmark_count": 0}, {"id": 2, "bookmark_count": 0}]
+        )
+        state.append_message(_entry(1))
+        state.append_message(_entry(2))
+
+    def tearDown(self) -> None:
+        state.clear_messages()
+        state.replace_message_log([])
+
+    def test_batch_bumps_generation_once(self) -> None:
+        before, _comments = state.snapshot_messages()
+
+        state.apply_reaction_updates({1: 5, 2: 3})
+
+        after, comments = state.snapshot_messages()
+        self.assertEqual(after, before + 1)
+        self.assertEqual([entry.bookmark_count for entry in comments], [5, 3])
+        self.assertEqual([raw["bookmark_count"] for raw in state.message_log], [5, 3])
+
+    def test_unchanged_counts_do_not_bump_generation(self) -> None:
+        before, _comments = state.snapshot_messages()
+
+        state.apply_reaction_updates({1: 0, 99: 4})
+
+        after, _comments = state.snapshot_messages()
+        self.assertEqual(after, before)
+
+    def test_updates_find_entries_after_prepend_and_append(self) -> None:
+        state.prepend_message_log([{"id": -1, "bookmark_count": 0}])
+        state.prepend_messages([_entry(-1)])
+        state.append_message_log({"id": 3, "bookmark_count": 0})
+        state.append_message(_entry(3))
+
+        state.apply_reaction_updates({-1: 2, 3: 9})
+
+        _generation, comments = state.snapshot_messages()
+        self.assertEqual(
+            [(entry.id, entry.bookmark_count) for entry in comments],
+            [(-1, 2), (1, 0), (2, 0), (3, 9)],
+        )
+        self.assertEqual(
+            [raw["bookmark_count"] for raw in state.message_log], [2, 0, 0, 9]
+        )
+
+    def test_clear_messages_resets_index(self) -> None:
+        state.clear_messages()
+        state.append_message(_entry(2))
+
+        state.apply_reaction_updates({1: 5, 2: 6})
+
+        _generation, comments = state.snapshot_messages()
+        self.assertEqual([entry.bookmark_count for entry in comments], [6])
+        self.assertEqual(state.message_log[0]["bookmark_count"], 5)
+
+
+def _event(
+    event_id: int, session: str = "demo", event_type: str = "tab.hidden"
+) -> dict[str, object]:
+    return {"id": event_id, "session": session, "event_type": event_type}
+
+
+class BehaviorEventLogTests(unittest.TestCase):
+    def setUp(self) -> None:
+        state.clear_behavior_events()
+        self.addCleanup(state.clear_behavior_events)
+
+    def test_merge_dedupes_and_keeps_id_order(self) -> None:
+        self.assertEqual(state.merge_behavior_events("demo", [_event(5), _event(3)]), 2)
+        state.append_behavior_event(_event(7))
+        # ライブで届いた分と取得した分が重なっても 1 件ずつ
+        self.assertEqual(
+            state.merge_behavior_events("demo", [_event(7), _event(6), _event(1)]), 2
+        )
+
+        _generation, events = state.snapshot_behavior_events()
+
+        self.assertEqual([event["id"] for event in events], [7, 6, 5, 3, 1])
+        bounds = state.behavior_event_bounds("demo")
+        self.assertEqual((bounds.oldest_id, bounds.newest_id, bounds.count), (1, 7, 5))
+
+    def test_other_session_replaces_log(self) -> None:
+        state.merge_behavior_events("demo", [_event(1), _event(2)], has_older=False)
+        state.append_behavior_event(_event(10, session="other"))
+
+        self.assertEqual(state.behavior_event_bounds("demo").count, 0)
+        bounds = state.behavior_event_bounds("other")
+        self.assertEqual((bounds.count, bounds.has_older), (1, True))
+
+    def test_synced_id_ignores_live_events_and_resets_with_session(self) -> None:
+        state.merge_behavior_events("demo", [_event(1), _event(2)], synced_through=2)
+        state.append_behavior_event(_event(9))
+
+        self.assertEqual(state.behavior_event_bounds("demo").synced_id, 2)
+        state.merge_behavior_events("demo", [], synced_through=1)
+        self.assertEqual(state.behavior_event_bounds("demo").synced_id, 2)
+
+        state.append_behavior_event(_event(10, session="other"))
+        self.assertIsNone(state.behavior_event_bounds("other").synced_id)
+
+    def test_snapshot_filters_newest_first_with_limit(self) -> None:
+        state.merge_behavior_events(
+            "demo",
+            [_event(i, event_type="a" if i % 2 else "b") for i in range(1, 11)],
+        )
+
+        _generation, events = state.snapshot_behavior_events(
+            limit=2, match=lambda event: event["event_type"] == "a"
+        )
+
+        self.assertEqual([event["id"] for event in events], [9, 7])
+
+    def test_overflow_drops_oldest_and_allows_refetch(self) -> None:
+        with patch.object(state, "BEHAVIOR_EVENT_LOG_MAX_SIZE", 3):
+            state.merge_behavior_events(
+                "demo", [_event(i) for i in range(1, 6)], has_older=False
+            )
+
+        bounds = state.behavior_event_bounds("demo")
+        self.assertEqual(
+            (bounds.oldest_id, bounds.count, bounds.has_older), (3, 3, True)
+        )
+        self.assertEqual(state.merge_behavior_events("demo", [_event(2)]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,12 +22,9 @@ class BackendApiTests(unittest.TestCase):
         response = Mock()
         response.status_code = 200
         response.reason = "OK"
-        response.json.return_value = {
-            "session": "demo",
-            "messages": [],
-        }
+        response.content = b'{"session":"demo","messages":[]}'
 
-        with patch.object(backend_api.requests, "get", return_value=response) as get:
+        with patch.object(backend_api.http_client, "get", return_value=response) as get:
             session, messages = backend_api.fetch_bootstrap("demo")
 
         self.assertEqual(session, "demo")
@@ -39,6 +36,123 @@ class BackendApiTests(unittest.TestCase):
         )
         self.assertEqual(get.call_args.kwargs["params"], {"session": "demo"})
 
+    def test_fetch_comments_since_sends_cursor_and_reports_gap(self) -> None:
+        response = Mock()
+        response.status_code = 200
+        response.reason = "OK"
+        response.content = b'{"session":"demo","messages":[],"hasMore":true}'
+
+        with patch.object(backend_api.http_client, "get", return_value=response) as get:
+            messages, reaction_updates, complete = backend_api.fetch_comments_since(
+                "demo", 42
+            )
+
+        self.assertEqual(messages, [])
+        self.assertEqual(reaction_updates, [])
+        self.assertFalse(complete)
+        self.assertEqual(
+            get.call_args.kwargs["params"], {"session": "demo", "afterId": "42"}
+        )
+
+
+class ConditionalGetTests(unittest.TestCase):
+    def setUp(self) -> None:
+        backend_api.clear_response_cache()
+        self.addCleanup(backend_api.clear_response_cache)
+
+    def _response(self, status: int, content: bytes = b"", **headers: str) -> Mock:
+        response = Mock()
+        response.status_code = status
+        response.reason = "OK"
+        response.content = content
+        response.headers = headers
+        return response
+
+    def test_not_modified_returns_previous_result_without_parsing(self) -> None:
+        first = self._response(
+            200,
+            b'{"session":"demo","mode":"like","reactionTypes":[]}',
+            ETag='"v1"',
+        )
+        second = self._response(304)
+
+        with patch.object(
+            backend_api.http_client, "get", side_effect=[first, second]
+        ) as get:
+            mode = backend_api.fetch_reaction_mode("demo")
+            with patch.object(backend_api.json_codec, "loads") as loads:
+                cached = backend_api.fetch_reaction_mode("demo")
+
+        self.assertIs(cached, mode)
+        loads.assert_not_called()
+        self.assertEqual(get.call_args_list[0].kwargs["headers"], {})
+        self.assertEqual(
+            get.call_args_list[1].kwargs["headers"], {"If-None-Match": '"v1"'}
+        )
+
+    def test_responses_without_validators_are_not_cached(self) -> None:
+        response = self._response(200, b"[]")
+
+        with patch.object(backend_api.http_client, "get", return_value=response) as get:
+            backend_api.fetch_polls("demo")
+            backend_api.fetch_polls("demo")
+
+        self.assertEqual(get.call_args.kwargs["headers"], {})
+
+    def test_cache_is_keyed_by_query(self) -> None:
+        response = self._response(
+            200, b"[]", **{"Last-Modified": "Sat, 17 Oct 2026 00:00:00 GMT"}
+        )
+
+        with patch.object(backend_api.http_client, "get", return_value=response) as get:
+            backend_api.fetch_behavior_events("demo", event_type="tab.hidden")
+            backend_api.fetch_behavior_events("demo", event_type="tab.visible")
+            backend_api.fetch_behavior_events("demo", event_type="tab.hidden")
+
+        self.assertEqual(
+            [call.kwargs["headers"] for call in get.call_args_list],
+            [
+                {},
+                {},
+                {"If-Modified-Since": "Sat, 17 Oct 2026 00:00:00 GMT"},
+            ],
+        )
+
+
+class ParseWsEventTests(unittest.TestCase):
+    def test_routes_reaction_update_by_type(self) -> None:
+        message = (
+            '{"type":"comment.reactions.updated","payload":{"session":"demo",'
+            '"commentId":7,"reactions":[{"reactionKey":"bookmark","count":3}]}}'
+        )
+
+        result = backend_api.parse_ws_event(message)
+
+        self.assertEqual(
+            result,
+            (
+                "comment.reactions.updated",
+                {"session": "demo", "comment_id": 7, "bookmark_count": 3},
+            ),
+        )
+
+    def test_decodes_each_frame_once(self) -> None:
+        message = (
+            '{"type":"behavior.event.created","payload":{"session":"demo","event":{}}}'
+        )
+
+        with patch.object(
+            backend_api.json_codec, "loads", wraps=backend_api.json_codec.loads
+        ) as loads:
+            backend_api.parse_ws_event(message)
+
+        loads.assert_called_once()
+
+    def test_returns_none_for_unknown_type_or_invalid_json(self) -> None:
+        self.assertIsNone(backend_api.parse_ws_event('{"type":"other","payload":{}}'))
+        self.assertIsNone(backend_api.parse_ws_event("not json"))
+        self.assertIsNone(backend_api.parse_ws_event("[1, 2]"))
+
 
 if __name__ == "__main__":
     unittest.main()
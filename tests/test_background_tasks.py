@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+
+from ui.background_tasks import BackgroundTasks
+
+
+class _FakeWindow:
+    def __init__(self) -> None:
+        self.alive = True
+        self.destroy_handlers: list = []
+
+    def bind(self, sequence: str, func, add: str | None = None) -> None:
+        self.destroy_handlers.append(func)
+
+    def winfo_exists(self) -> bool:
+        return self.alive
+
+    def destroy(self) -> None:
+        self.alive = False
+        event = type("Event", (), {"widget": self})()
+        for handler in self.destroy_handlers:
+            handler(event)
+
+
+class _FakeRoot:
+    def __init__(self) -> None:
+        self.scheduled: list = []
+        self.reported: list[BaseException] = []
+
+    def after(self, _ms: int, func) -> None:
+        self.scheduled.append(func)
+
+    def run_scheduled(self) -> None:
+        pending, self.scheduled = self.scheduled, []
+        for func in pending:
+            func()
+
+    def report_callback_exception(self, _exc_type, exc, _tb) -> None:
+        self.reported.append(exc)
+
+
+class BackgroundTasksTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tasks = BackgroundTasks(max_workers=1)
+        self.addCleanup(self.tasks.shutdown)
+
+    def _wait_until_idle(self) -> None:
+        # 結果はワーカーの完了コールバックで積まれるので、処理が外れるまで待つ
+        deadline = time.monotonic() + 5.0
+        while self.tasks.in_flight() and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    def _block_worker(self) -> threading.Event:
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocker() -> None:
+            started.set()
+            release.wait(5.0)
+
+        self.tasks.submit(_FakeWindow(), blocker)
+        self.assertTrue(started.wait(5.0))
+        return release
+
+    def test_results_are_delivered_only_when_dispatched(self) -> None:
+        window = _FakeWindow()
+        results: list[int] = []
+
+        self.tasks.submit(window, lambda: 42, on_success=results.append)
+        self._wait_until_idle()
+        self.assertEqual(results, [])
+
+        self.tasks.dispatch_pending()
+        self.assertEqual(results, [42])
+
+    def test_identical_in_flight_requests_share_one_call(self) -> None:
+        release = self._block_worker()
+        calls: list[str] = []
+        results: list[str] = []
+        window = _FakeWindow()
+
+        def work() -> str:
+            calls.append("fetch")
+            return "polls"
+
+        first = self.tasks.submit(window, work, key="polls", on_success=results.append)
+        second = self.tasks.submit(window, work, key="polls", on_success=results.append)
+        release.set()
+        self._wait_until_idle()
+        self.tasks.dispatch_pending()
+
+        self.assertIs(first, second)
+        self.assertEqual(calls, ["fetch"])
+        self.assertEqual(results, ["polls", "polls"])
+        self.assertEqual(self.tasks.in_flight(), 0)
+
+    def test_closing_window_cancels_pending_work_and_drops_results(self) -> None:
+        release = self._block_worker()
+        window = _FakeWindow()
+        calls: list[str] = []
+
+        pending = self.tasks.submit(window, lambda: calls.append("run"))
+        window.destroy()
+        release.set()
+
+        self.assertTrue(pending.cancelled())
+        self.tasks.dispatch_pending()
+        self.assertEqual(calls, [])
+
+    def test_errors_go_to_error_callback(self) -> None:
+        window = _FakeWindow()
+        errors: list[str] = []
+
+        def fail() -> None:
+            raise RuntimeError("boom")
+
+        future = self.tasks.submit(
+            window, fail, on_error=lambda exc: errors.append(str(exc))
+        )
+        with self.assertRaises(RuntimeError):
+            future.result(5.0)
+        self._wait_until_idle()
+        self.tasks.dispatch_pending()
+
+        self.assertEqual(errors, ["boom"])
+
+    def test_dispatch_loop_runs_only_while_work_is_pending(self) -> None:
+        root = _FakeRoot()
+        self.tasks.attach(root)
+        self.assertEqual(root.scheduled, [])
+
+        results: list[int] = []
+        self.tasks.submit(_FakeWindow(), lambda: 1, on_success=results.append)
+        self.assertEqual(len(root.scheduled), 1)
+        self._wait_until_idle()
+        root.run_scheduled()
+
+        self.assertEqual(results, [1])
+        self.assertEqual(root.scheduled, [])
+
+    def test_callback_errors_are_reported_and_do_not_stop_other_results(self) -> None:
+        root = _FakeRoot()
+        self.tasks.attach(root)
+        window = _FakeWindow()
+        results: list[int] = []
+
+        def broken(_result: int) -> None:
+            raise ValueError("callback")
+
+        self.tasks.submit(window, lambda: 1, key="k", on_success=broken)
+        self.tasks.submit(window, lambda: 1, key="k", on_success=results.append)
+        self._wait_until_idle()
+        self.tasks.dispatch_pending()
+
+        self.assertEqual([str(exc) for exc in root.reported], ["callback"])
+        self.assertEqual(results, [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import unittest
+from unittest.mock import patch
+
+from services import backend_api, behavior_sync
+from state import app_state as state
+from tools.stand_in_server import StandInServer
+
+
+class BehaviorSyncTests(unittest.TestCase):
+    def setUp(self) -> None:
+        backend_api.clear_response_cache()
+        backend_api.reset_circuit_breakers()
+        state.clear_behavior_events()
+        self.addCleanup(state.clear_behavior_events)
+        self.server = StandInServer().start()
+        self.addCleanup(self.server.stop)
+        patcher = patch.object(backend_api, "BACKEND_BASE_URL", self.server.base_url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _add_events(self, count: int, session: str = "demo") -> None:
+        for _ in range(count):
+            self.server.add_behavior_event(session, "tab.hidden")
+
+    def _ids(self) -> list[int]:
+        _generation, events = state.snapshot_behavior_events()
+        return [int(event["id"]) for event in events]  # type: ignore[call-overload]
+
+    def test_first_sync_loads_latest_page(self) -> None:
+        self._add_events(5)
+
+        added = behavior_sync.sync_latest("demo", page_size=3)
+
+        self.assertEqual(added, 3)
+        self.assertEqual(self._ids(), [5, 4, 3])
+        self.assertTrue(state.behavior_event_bounds("demo").has_older)
+
+    def test_later_sync_fetches_only_newer_pages(self) -> None:
+        self._add_events(3)
+        behavior_sync.sync_latest("demo", page_size=3)
+        self._add_events(7)
+        requests_before = self.server.http_requests
+
+        added = behavior_sync.sync_latest("demo", page_size=3)
+
+        self.assertEqual(added, 7)
+        self.assertEqual(self._ids(), list(range(10, 0, -1)))
+        # 3 + 3 + 1 件の 3 ページで追いつく
+        self.assertEqual(self.server.http_requests - requests_before, 3)
+
+    def test_live_events_are_not_duplicated(self) -> None:
+        self._add_events(2)
+        behavior_sync.sync_latest("demo", page_size=10)
+        self._add_events(2)
+        # WebSocket で先に届いた分
+        state.append_behavior_event(
+            {"id": 3, "session": "demo", "event_type": "tab.hidden"}
+        )
+
+        added = behavior_sync.sync_latest("demo", page_size=10)
+
+        self.assertEqual(added, 1)
+        self.assertEqual(self._ids(), [4, 3, 2, 1])
+
+    def test_live_event_ahead_of_a_gap_does_not_hide_it(self) -> None:
+        self._add_events(3)
+        behavior_sync.sync_latest("demo", page_size=10)
+        self._add_events(3)
+        # 4 と 5 を取りこぼして 6 だけ WebSocket で届いた
+        state.append_behavior_event(
+            {"id": 6, "session": "demo", "event_type": "tab.hidden"}
+        )
+
+        added = behavior_sync.sync_latest("demo", page_size=10)
+
+        self.assertEqual(added, 2)
+        self.assertEqual(self._ids(), [6, 5, 4, 3, 2, 1])
+        self.assertEqual(state.behavior_event_bounds("demo").synced_id, 6)
+
+    def test_stops_when_the_server_ignores_the_cursor(self) -> None:
+        self._add_events(3)
+        behavior_sync.sync_latest("demo", page_size=3)
+        page = [
+            {"id": event_id, "session": "demo", "event_type": "tab.hidden"}
+            for event_id in (3, 2, 1)
+        ]
+
+        with patch.object(
+            behavior_sync, "fetch_behavior_events", return_value=page
+        ) as fetch:
+            added = behavior_sync.sync_latest("demo", page_size=3)
+
+        self.assertEqual(added, 0)
+        fetch.assert_called_once()
+        self.assertEqual(state.behavior_event_bounds("demo").synced_id, 3)
+
+    def test_load_older_pages_back_until_exhausted(self) -> None:
+        self._add_events(7)
+        behavior_sync.sync_latest("demo", page_size=3)
+
+        self.assertEqual(behavior_sync.load_older("demo", page_size=3), 3)
+        self.assertEqual(behavior_sync.load_older("demo", page_size=3), 1)
+        self.assertFalse(state.behavior_event_bounds("demo").has_older)
+        self.assertEqual(behavior_sync.load_older("demo", page_size=3), 0)
+
+        self.assertEqual(self._ids(), list(range(7, 0, -1)))
+
+    def test_small_log_from_live_events_backfills_one_page(self) -> None:
+        self._add_events(4)
+        state.append_behavior_event(
+            {"id": 4, "session": "demo", "event_type": "tab.hidden"}
+        )
+
+        behavior_sync.sync_latest("demo", page_size=10)
+
+        self.assertEqual(self._ids(), [4, 3, 2, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
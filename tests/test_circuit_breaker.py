@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+import requests
+
+from services import backend_api
+from services.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    EndpointPolicy,
+)
+from tools.stand_in_server import StandInServer
+
+_POLICY = EndpointPolicy(timeout_sec=1.0, failure_threshold=2, reset_timeout_sec=5.0)
+
+
+class CircuitBreakerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = 100.0
+        self.breaker = CircuitBreaker("/api/test", _POLICY, clock=lambda: self.now)
+
+    def _fail(self) -> None:
+        self.breaker.acquire()
+        self.breaker.record_failure(0.1)
+
+    def test_opens_after_consecutive_failures_and_fails_fast(self) -> None:
+        self._fail()
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+        self._fail()
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+
+        self.now += 2.0
+        with self.assertRaises(CircuitOpenError) as raised:
+            self.breaker.acquire()
+
+        self.assertAlmostEqual(raised.exception.retry_after_sec, 3.0)
+        self.assertEqual(self.breaker.snapshot().rejected, 1)
+
+    def test_success_resets_the_failure_streak(self) -> None:
+        self._fail()
+        self.breaker.acquire()
+        self.breaker.record_success(0.05)
+        self._fail()
+
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+
+    def test_half_open_lets_one_probe_through(self) -> None:
+        self._fail()
+        self._fail()
+        self.now += 5.0
+
+        self.breaker.acquire()
+        self.assertEqual(self.breaker.state, STATE_HALF_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.acquire()
+
+        self.breaker.record_success(0.05)
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+        self.breaker.acquire()
+
+    def test_failed_probe_reopens(self) -> None:
+        self._fail()
+        self._fail()
+        self.now += 5.0
+
+        self._fail()
+
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+        snapshot = self.breaker.snapshot()
+        self.assertEqual(snapshot.failures, 3)
+        self.assertEqual(snapshot.latency.count, 3)
+        self.assertAlmostEqual(snapshot.retry_after_sec or 0.0, 5.0)
+
+    def test_release_frees_the_half_open_probe(self) -> None:
+        self._fail()
+        self._fail()
+        self.now += 5.0
+
+        self.breaker.acquire()
+        self.breaker.release()
+
+        self.breaker.acquire()
+        self.assertEqual(self.breaker.state, STATE_HALF_OPEN)
+
+    def test_registry_uses_policy_per_name(self) -> None:
+        slow = EndpointPolicy(
+            timeout_sec=9.0, failure_threshold=2, reset_timeout_sec=5.0
+        )
+        registry = CircuitBreakerRegistry(_POLICY, {"/slow": slow})
+
+        self.assertIs(registry.get("/slow"), registry.get("/slow"))
+        self.assertEqual(registry.get("/slow").policy.timeout_sec, 9.0)
+        self.assertEqual(registry.get("/other").policy.timeout_sec, 1.0)
+        self.assertEqual([s.name for s in registry.snapshot()], ["/other", "/slow"])
+
+
+class BackendBreakerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        backend_api.reset_circuit_breakers()
+        self.addCleanup(backend_api.reset_circuit_breakers)
+
+    def test_open_endpoint_fails_without_contacting_server(self) -> None:
+        with (
+            StandInServer() as server,
+            patch.object(backend_api, "BACKEND_BASE_URL", server.base_url),
+        ):
+            server.fail_next_posts = 3
+            for _ in range(3):
+                with self.assertRaises(backend_api.BackendUnavailableError):
+                    backend_api.start_poll("demo", 1)
+            requests_before = server.http_requests
+
+            with self.assertRaises(backend_api.BackendCircuitOpenError):
+                backend_api.start_poll("demo", 1)
+            # 他のエンドポイントは巻き込まない
+            backend_api.fetch_polls("demo")
+
+            self.assertEqual(server.http_requests, requests_before + 1)
+        stats = {s.name: s for s in backend_api.snapshot_endpoint_stats()}
+        self.assertEqual(stats["/api/client/polls/start"].state, STATE_OPEN)
+        self.assertEqual(stats["/api/client/polls"].state, STATE_CLOSED)
+
+    def test_timeout_comes_from_endpoint_policy(self) -> None:
+        response = Mock()
+        response.status_code = 200
+        response.reason = "OK"
+        response.content = b'{"session":"demo","messages":[]}'
+
+        with (
+            patch.dict(
+                backend_api.BACKEND_ENDPOINT_TIMEOUTS_SEC,
+                {"/api/client/bootstrap": 7.5},
+            ),
+            patch.object(backend_api.http_client, "get", return_value=response) as get,
+        ):
+            backend_api.reset_circuit_breakers()
+            backend_api.fetch_bootstrap("demo")
+
+        self.assertEqual(get.call_args.kwargs["timeout"], 7.5)
+
+    def _patch_bootstrap_timeout(self, timeout_sec: float) -> None:
+        for patcher in (
+            patch.dict(
+                backend_api.BACKEND_ENDPOINT_TIMEOUTS_SEC,
+                {"/api/client/bootstrap": timeout_sec},
+            ),
+            patch.object(backend_api, "HTTP_RETRY_BACKOFF_SEC", 0.01),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        backend_api.reset_circuit_breakers()
+
+    def test_timeout_is_a_budget_for_all_attempts(self) -> None:
+        self._patch_bootstrap_timeout(0.2)
+
+        def hang(_url: str, *, timeout: float, **_kwargs: object) -> None:
+            # 応答のないサーバーのように、渡されたタイムアウトまで待って諦める
+            time.sleep(timeout)
+            raise requests.ReadTimeout(f"read timed out after {timeout}")
+
+        with (
+            patch.object(backend_api.http_client, "get", side_effect=hang) as get,
+            self.assertRaises(backend_api.BackendUnavailableError),
+        ):
+            backend_api.fetch_bootstrap("demo")
+
+        get.assert_called_once()
+        self.assertEqual(get.call_args.kwargs["retry"], False)
+
+    def test_get_is_retried_within_the_budget_and_each_attempt_is_recorded(
+        self,
+    ) -> None:
+        self._patch_bootstrap_timeout(2.0)
+        unavailable = Mock(status_code=503, reason="Service Unavailable")
+        ok = Mock(status_code=200, reason="OK", headers={})
+        ok.content = b'{"session":"demo","messages":[]}'
+
+        with patch.object(
+            backend_api.http_client, "get", side_effect=[unavailable, ok]
+        ) as get:
+            backend_api.fetch_bootstrap("demo")
+
+        self.assertEqual(get.call_count, 2)
+        self.assertLess(get.call_args_list[1].kwargs["timeout"], 2.0)
+        stats = {s.name: s for s in backend_api.snapshot_endpoint_stats()}
+        self.assertEqual(stats["/api/client/bootstrap"].calls, 2)
+        self.assertEqual(stats["/api/client/bootstrap"].failures, 1)
+
+    def test_unexpected_error_does_not_hold_the_half_open_probe(self) -> None:
+        with patch.object(backend_api, "BACKEND_CIRCUIT_RESET_SEC", 0.0):
+            backend_api.reset_circuit_breakers()
+        unavailable = Mock(status_code=503, reason="Service Unavailable")
+        with patch.object(backend_api.http_client, "post", return_value=unavailable):
+            for _ in range(3):
+                with self.assertRaises(backend_api.BackendUnavailableError):
+                    backend_api.start_poll("demo", 1)
+        with (
+            patch.object(
+                backend_api.http_client, "post", side_effect=RuntimeError("boom")
+            ),
+            self.assertRaises(RuntimeError),
+        ):
+            backend_api.start_poll("demo", 1)
+
+        # 試しの枠が戻っていれば、次の呼び出しはサーバーまで届く
+        with (
+            patch.object(backend_api.http_client, "post", return_value=unavailable),
+            self.assertRaises(backend_api.BackendUnavailableError) as raised,
+        ):
+            backend_api.start_poll("demo", 1)
+        self.assertNotIsInstance(raised.exception, backend_api.BackendCircuitOpenError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,431 @@
+from __future__ import annotations
+
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from services import backend_api, events, session_pipeline
+from services.metrics import MessageLatencyTracker
+from services.ws_recorder import read_recording
+from state import app_state as state
+from state.ingest_queue import IngestQueue
+from tools.stand_in_server import StandInServer
+
+
+def _comment(comment_id: int, *, bookmark_count: int = 0) -> dict[str, object]:
+    return {
+        "id": comment_id,
+        "session": "demo",
+        "name": "A",
+        "real_name": "A",
+        "text": f"comment {comment_id}",
+        "time": "10:00",
+        "stamp": None,
+        "stamp_url": None,
+        "source": "textbox",
+        "created_at": "2026-03-10T00:00:00Z",
+        "server_time_iso": "2026-03-10T00:00:00Z",
+        "bookmark_count": bookmark_count,
+    }
+
+
+def _drain_message_queue() -> list[dict[str, object]]:
+    drained: list[dict[str, object]] = []
+    while not state.message_queue.empty():
+        drained.append(state.message_queue.get_nowait())
+    return drained
+
+
+class DispatchWsMessageTests(unittest.TestCase):
+    def test_routes_event_to_registered_handler(self) -> None:
+        calls: list[dict] = []
+        message = (
+            '{"type":"comment.reactions.updated","payload":{"session":"demo",'
+            '"commentId":7,"reactions":[]}}'
+        )
+
+        with patch.dict(
+            events._WS_EVENT_HANDLERS,
+            {"comment.reactions.updated": calls.append},
+        ):
+            events._dispatch_ws_message(message, "demo")
+
+        self.assertEqual(
+            calls, [{"session": "demo", "comment_id": 7, "bookmark_count": 0}]
+        )
+
+    def test_ignores_events_for_other_sessions(self) -> None:
+        calls: list[dict] = []
+        message = (
+            '{"type":"comment.reactions.updated","payload":{"session":"other",'
+            '"commentId":7,"reactions":[]}}'
+        )
+
+        with patch.dict(
+            events._WS_EVENT_HANDLERS,
+            {"comment.reactions.updated": calls.append},
+        ):
+            events._dispatch_ws_message(message, "demo")
+
+        self.assertEqual(calls, [])
+
+    def test_stamps_live_comments_for_latency_tracking(self) -> None:
+        tracker = MessageLatencyTracker()
+        message = (
+            '{"type":"comment.created","payload":{"id":41,"session":"demo",'
+            '"name":"A","realName":"A","text":"hi","time":"10:00","stamp":null,'
+            '"stampPath":null,"source":"textbox",'
+            '"createdAt":"2026-03-10T00:00:00Z","reactions":[]}}'
+        )
+        self.addCleanup(state.replace_message_log, [])
+        self.addCleanup(_drain_message_queue)
+
+        with patch.object(events, "message_latency", tracker):
+            events._dispatch_ws_message(message, "demo", received_at=0.0)
+        tracker.mark(41, "dequeued")
+        tracker.mark_drawn([41])
+
+        segments = tracker.snapshot()
+        self.assertEqual(segments["total"].count, 1)
+        self.assertEqual(segments["handle"].count, 1)
+
+    def test_comments_dropped_by_the_ingest_queue_stop_being_tracked(self) -> None:
+        tracker = MessageLatencyTracker()
+        ingest = IngestQueue(text_capacity=1, on_drop=events._forget_dropped_entry)
+        self.addCleanup(state.replace_message_log, [])
+        for comment_id in (51, 52):
+            tracker.begin(comment_id, 0.0)
+
+        with (
+            patch.object(events, "message_latency", tracker),
+            patch.object(state, "message_queue", ingest),
+        ):
+            events._on_new_comment(_comment(51))
+            events._on_new_comment(_comment(52))
+
+        self.assertEqual(list(tracker._pending), [52])
+        self.assertEqual(ingest.stats().dropped_texts, 1)
+
+
+class ResumeSessionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        state.clear_messages()
+        events._on_history([_comment(1), _comment(2)])
+        _drain_message_queue()
+        self._target = events._PrimarySession(events._next_connection_serial(), "demo")
+
+    def tearDown(self) -> None:
+        events._live_buffer.stop()
+        state.clear_messages()
+        state.replace_message_log([])
+        state.reset_comment_cursor()
+        _drain_message_queue()
+
+    def test_merges_only_comments_after_cursor(self) -> None:
+        with (
+            patch.object(
+                session_pipeline,
+                "fetch_comments_since",
+                return_value=(
+                    [_comment(2, bookmark_count=4), _comment(3)],
+                    [],
+                    True,
+                ),
+            ) as fetch_since,
+            patch.object(session_pipeline, "fetch_bootstrap_page") as bootstrap,
+        ):
+            session_pipeline.resume(self._target)
+
+        fetch_since.assert_called_once_with("demo", 2)
+        bootstrap.assert_not_called()
+        self.assertEqual([entry["id"] for entry in state.message_log], [1, 2, 3])
+        self.assertEqual(state.message_log[1]["bookmark_count"], 4)
+        self.assertEqual([entry["id"] for entry in _drain_message_queue()], [3])
+        self.assertEqual(state.comment_cursor(), 3)
+
+    def test_skips_comments_already_received_live(self) -> None:
+        events._on_new_comment(_comment(3))
+        _drain_message_queue()
+
+        with patch.object(
+            session_pipeline,
+            "fetch_comments_since",
+            return_value=([_comment(3), _comment(4)], [], True),
+        ):
+            session_pipeline.resume(self._target)
+
+        self.assertEqual([entry["id"] for entry in state.message_log], [1, 2, 3, 4])
+        self.assertEqual([entry["id"] for entry in _drain_message_queue()], [4])
+
+    def test_live_comments_wait_for_the_resume_after_reconnecting(self) -> None:
+        release = threading.Event()
+
+        def slow_fetch(session: str, cursor: int):
+            release.wait(5.0)
+            return [_comment(3)], [], True
+
+        with patch.object(
+            session_pipeline, "fetch_comments_since", side_effect=slow_fetch
+        ):
+            session_pipeline.resume_in_background(self._target)
+            session_pipeline.handle_live_frame(
+                self._target, "demo", _comment_frame(4), 0.0
+            )
+            self.assertEqual([entry["id"] for entry in state.message_log], [1, 2])
+            release.set()
+            deadline = time.monotonic() + 5.0
+            while len(state.message_log) < 4 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        self.assertEqual([entry["id"] for entry in state.message_log], [1, 2, 3, 4])
+        self.assertEqual([entry["id"] for entry in _drain_message_queue()], [3, 4])
+
+    def test_falls_back_to_full_bootstrap_when_gap_is_incomplete(self) -> None:
+        with (
+            patch.object(
+                session_pipeline, "fetch_comments_since", return_value=([], [], False)
+            ),
+            patch.object(
+                session_pipeline,
+                "fetch_bootstrap_page",
+                return_value=("demo", [_comment(1), _comment(2), _comment(5)], False),
+            ) as bootstrap,
+        ):
+            session_pipeline.resume(self._target)
+
+        bootstrap.assert_called_once_with("demo")
+        self.assertEqual([entry["id"] for entry in state.message_log], [1, 2, 5])
+        queued = _drain_message_queue()
+        self.assertTrue(all(entry["_from_history"] for entry in queued))
+
+
+class HistoryBackfillTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._target = events._PrimarySession(events._next_connection_serial(), "demo")
+        state.clear_messages()
+        events._on_history([_comment(5), _comment(6)])
+        _drain_message_queue()
+
+    def tearDown(self) -> None:
+        state.clear_messages()
+        state.replace_message_log([])
+        state.reset_comment_cursor()
+        _drain_message_queue()
+
+    def _run_backfill(self, pages: list[tuple[str, list, bool]]) -> list:
+        calls: list = []
+
+        def fake_page(session: str, *, before_id: int | None = None):
+            calls.append(before_id)
+            return pages[len(calls) - 1]
+
+        with (
+            patch.object(backend_api, "fetch_bootstrap_page", side_effect=fake_page),
+            patch.object(events.threading.Thread, "start", lambda thread: thread.run()),
+        ):
+            session_pipeline.start_history_backfill(
+                self._target, [_comment(5), _comment(6)]
+            )
+        return calls
+
+    def test_prepends_older_pages_until_exhausted(self) -> None:
+        calls = self._run_backfill(
+            [
+                ("demo", [_comment(3), _comment(4)], True),
+                ("demo", [_comment(1), _comment(2)], False),
+            ]
+        )
+
+        self.assertEqual(calls, [5, 3])
+        self.assertEqual(
+            [entry["id"] for entry in state.message_log], [1, 2, 3, 4, 5, 6]
+        )
+        _generation, messages = state.snapshot_messages()
+        self.assertEqual([entry.id for entry in messages], [1, 2, 3, 4])
+        self.assertEqual(state.comment_cursor(), 6)
+        self.assertTrue(state.message_queue.empty())
+
+    def test_stops_when_history_was_replaced(self) -> None:
+        def replaced_page(session: str, *, before_id: int | None = None):
+            events._on_history([_comment(10)])
+            return ("demo", [_comment(3), _comment(4)], True)
+
+        with (
+            patch.object(
+                backend_api, "fetch_bootstrap_page", side_effect=replaced_page
+            ),
+            patch.object(events.threading.Thread, "start", lambda thread: thread.run()),
+        ):
+            session_pipeline.start_history_backfill(
+                self._target, [_comment(5), _comment(6)]
+            )
+
+        self.assertEqual([entry["id"] for entry in state.message_log], [10])
+
+
+def _comment_frame(comment_id: int, session: str = "demo") -> str:
+    return (
+        f'{{"type":"comment.created","payload":{{"id":{comment_id},'
+        f'"session":"{session}","name":"A","realName":"A","text":"hi",'
+        '"time":"10:00","stamp":null,"stampPath":null,"source":"textbox",'
+        '"createdAt":"2026-03-10T00:00:00Z","reactions":[]}}'
+    )
+
+
+class LiveBufferTests(unittest.TestCase):
+    def tearDown(self) -> None:
+        events._live_buffer.stop()
+        state.clear_messages()
+        state.replace_message_log([])
+        state.reset_comment_cursor()
+        _drain_message_queue()
+
+    def test_buffered_frames_are_deduped_against_history(self) -> None:
+        frame = _comment_frame
+        events._live_buffer.start()
+        self.assertTrue(events._live_buffer.offer(frame(2), "demo", 0.0))
+        self.assertTrue(events._live_buffer.offer(frame(3), "demo", 0.0))
+        self.assertEqual(state.message_log, [])
+
+        events._on_history([_comment(1), _comment(2)])
+        session_pipeline.flush_live_frames(
+            events._PrimarySession(events._next_connection_serial(), "demo")
+        )
+
+        self.assertFalse(events._live_buffer.offer(frame(4), "demo", 0.0))
+        self.assertEqual([entry["id"] for entry in state.message_log], [1, 2, 3])
+        self.assertEqual([entry["id"] for entry in _drain_message_queue()], [1, 2, 3])
+
+
+class ConnectSessionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = StandInServer().start()
+        self.addCleanup(self.server.stop)
+        patcher = patch.multiple(
+            backend_api,
+            BACKEND_BASE_URL=self.server.base_url,
+            BACKEND_CLIENT_WS_BASE_URL=self.server.ws_base_url,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        events.disconnect_session(show_status=False)
+        state.clear_messages()
+        state.replace_message_log([])
+        state.reset_comment_cursor()
+        _drain_message_queue()
+
+    def test_no_comment_is_missed_or_duplicated_while_connecting(self) -> None:
+        self.server.add_comment("demo", "one", broadcast=False)
+        second = self.server.add_comment("demo", "two", broadcast=False)
+        fetch_page = backend_api.fetch_bootstrap_page
+
+        def slow_bootstrap(session: str, **kwargs: object):
+            result = fetch_page(session, **kwargs)
+            # 履歴の取得後、購読前に出たコメントと、取得中に届いたライブのコメント
+            self.server.add_comment("demo", "gap", broadcast=False)
+            self.assertTrue(self.server.wait_for_clients(1, "demo"))
+            self.server.emit("demo", "comment.created", second)
+            self.server.add_comment("demo", "live")
+            time.sleep(0.1)
+            return result
+
+        done = threading.Event()
+        original_resume = session_pipeline.resume
+        original_start = events._start_websocket
+
+        def resume(*args: object, **kwargs: object) -> None:
+            original_resume(*args, **kwargs)
+            done.set()
+
+        def late_start(*args: object) -> bool:
+            # 購読が履歴の取得より後になる場合を再現する
+            threading.Timer(0.05, original_start, args).start()
+            return True
+
+        with (
+            patch.object(
+                session_pipeline, "fetch_bootstrap_page", side_effect=slow_bootstrap
+            ),
+            patch.object(session_pipeline, "resume", side_effect=resume),
+            patch.object(events, "_start_websocket", side_effect=late_start),
+        ):
+            events.connect_session("demo")
+            self.assertTrue(done.wait(5.0))
+            deadline = time.monotonic() + 5.0
+            while len(state.message_log) < 4 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        # 取りこぼした分は、溜めていたライブのコメントより先に並ぶ
+        texts = [entry["text"] for entry in state.message_log]
+        self.assertEqual(texts, ["one", "two", "gap", "live"])
+        queued = [entry["text"] for entry in _drain_message_queue()]
+        self.assertEqual(queued, ["one", "two", "gap", "live"])
+
+    def test_contiguous_live_frames_skip_the_catch_up_request(self) -> None:
+        self.server.add_comment("demo", "one", broadcast=False)
+        fetch_page = backend_api.fetch_bootstrap_page
+
+        def bootstrap_then_live(session: str, **kwargs: object):
+            result = fetch_page(session, **kwargs)
+            self.assertTrue(self.server.wait_for_clients(1, "demo"))
+            self.server.add_comment("demo", "live")
+            time.sleep(0.1)
+            return result
+
+        with (
+            patch.object(
+                session_pipeline,
+                "fetch_bootstrap_page",
+                side_effect=bootstrap_then_live,
+            ),
+            patch.object(session_pipeline, "fetch_comments_since") as fetch_since,
+        ):
+            events.connect_session("demo")
+            deadline = time.monotonic() + 5.0
+            while len(state.message_log) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.2)
+
+        fetch_since.assert_not_called()
+        texts = [entry["text"] for entry in state.message_log]
+        self.assertEqual(texts, ["one", "live"])
+
+    def test_normalized_session_is_recorded_to_one_file(self) -> None:
+        fetch_page = backend_api.fetch_bootstrap_page
+
+        def normalizing_bootstrap(session: str, **kwargs: object):
+            _session, messages, has_more = fetch_page(session.lower(), **kwargs)
+            return "demo", messages, has_more
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with (
+                patch.object(events, "WS_RECORD_DIR", tmp),
+                patch.object(
+                    session_pipeline,
+                    "fetch_bootstrap_page",
+                    side_effect=normalizing_bootstrap,
+                ),
+            ):
+                events.connect_session("Demo")
+                self.assertTrue(self.server.wait_for_clients(1, "demo"))
+                self.server.add_comment("demo", "live")
+                deadline = time.monotonic() + 5.0
+                while not state.message_log and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                events.disconnect_session(show_status=False)
+
+            recordings = list(Path(tmp).iterdir())
+            self.assertEqual(len(recordings), 1)
+            header, frames = read_recording(recordings[0])
+
+        self.assertEqual(header["session"], "demo")
+        self.assertEqual(len(frames), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import unittest
+from unittest.mock import patch
+
+from services import backend_api, http_client
+from tools.stand_in_server import StandInServer
+
+
+class HttpClientTests(unittest.TestCase):
+    def setUp(self) -> None:
+        http_client.close_session()
+        self.addCleanup(http_client.close_session)
+
+    def test_get_session_is_shared(self) -> None:
+        self.assertIs(http_client.get_session(), http_client.get_session())
+
+    def test_close_session_builds_new_session_next_time(self) -> None:
+        first = http_client.get_session()
+        http_client.close_session()
+        self.assertIsNot(first, http_client.get_session())
+
+    def test_only_idempotent_methods_are_retried(self) -> None:
+        adapter = http_client.get_session().get_adapter("http://example.invalid/")
+        retry = adapter.max_retries
+        self.assertTrue(retry.is_retry("GET", 503))
+        self.assertFalse(retry.is_retry("POST", 503))
+
+    def test_backend_requests_reuse_one_connection(self) -> None:
+        with (
+            StandInServer() as server,
+            patch.object(backend_api, "BACKEND_BASE_URL", server.base_url),
+        ):
+            server.add_comment("demo", "hello", broadcast=False)
+            backend_api.fetch_bootstrap("demo")
+            backend_api.fetch_reaction_mode("demo")
+            backend_api.fetch_behavior_events("demo")
+
+            self.assertEqual(server.http_requests, 3)
+            self.assertEqual(server.http_connections, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import queue
+import unittest
+
+from state.ingest_queue import STAMP_POLICY_DROP_NEWEST, IngestQueue
+
+
+def _text(comment_id: int) -> dict[str, object]:
+    return {"id": comment_id, "text": f"comment {comment_id}"}
+
+
+def _stamp(comment_id: int, url: str = "/stamps/a.png") -> dict[str, object]:
+    return {"id": comment_id, "stamp_url": url}
+
+
+class IngestQueueTests(unittest.TestCase):
+    def test_text_comments_are_taken_before_stamps(self) -> None:
+        ingest = IngestQueue()
+        ingest.put(_stamp(1))
+        ingest.put(_text(2))
+        ingest.put(_text(3))
+
+        order = [ingest.get_nowait()["id"] for _ in range(3)]
+
+        self.assertEqual(order, [2, 3, 1])
+        with self.assertRaises(queue.Empty):
+            ingest.get_nowait()
+        self.assertTrue(ingest.empty())
+
+    def test_stamp_flood_drops_oldest_and_counts(self) -> None:
+        ingest = IngestQueue(stamp_capacity=2, merge_duplicate_stamps=False)
+        for comment_id in range(1, 5):
+            ingest.put(_stamp(comment_id))
+
+        self.assertEqual([ingest.get_nowait()["id"] for _ in range(2)], [3, 4])
+        self.assertEqual(ingest.stats().dropped_stamps, 2)
+
+    def test_drop_newest_policy_keeps_queued_stamps(self) -> None:
+        ingest = IngestQueue(
+            stamp_capacity=2,
+            stamp_policy=STAMP_POLICY_DROP_NEWEST,
+            merge_duplicate_stamps=False,
+        )
+        for comment_id in range(1, 5):
+            ingest.put(_stamp(comment_id))
+
+        self.assertEqual([ingest.get_nowait()["id"] for _ in range(2)], [1, 2])
+        self.assertEqual(ingest.stats().dropped_stamps, 2)
+
+    def test_merges_duplicate_stamps_while_queued(self) -> None:
+        ingest = IngestQueue()
+        self.assertTrue(ingest.put(_stamp(1)))
+        self.assertFalse(ingest.put(_stamp(2)))
+        self.assertTrue(ingest.put(_stamp(3, "/stamps/b.png")))
+
+        self.assertEqual(ingest.stats().merged_stamps, 1)
+        self.assertEqual(ingest.get_nowait()["id"], 1)
+        # 取り出した後は同じスタンプをまた積める
+        self.assertTrue(ingest.put(_stamp(4)))
+
+    def test_text_overflow_drops_oldest_text(self) -> None:
+        ingest = IngestQueue(text_capacity=2)
+        for comment_id in range(1, 4):
+            ingest.put(_text(comment_id))
+
+        stats = ingest.stats()
+        self.assertEqual(stats.text_depth, 2)
+        self.assertEqual(stats.dropped_texts, 1)
+        self.assertEqual(ingest.get_nowait()["id"], 2)
+
+    def test_dropped_and_merged_entries_are_reported(self) -> None:
+        dropped: list[object] = []
+        ingest = IngestQueue(
+            text_capacity=1,
+            stamp_capacity=1,
+            stamp_policy=STAMP_POLICY_DROP_NEWEST,
+            on_drop=lambda entry: dropped.append(entry["id"]),
+        )
+        ingest.put(_text(1))
+        ingest.put(_text(2))
+        ingest.put(_stamp(3))
+        ingest.put(_stamp(4))
+        ingest.put(_stamp(5, "/stamps/b.png"))
+
+        self.assertEqual(dropped, [1, 4, 5])
+
+    def test_clear_empties_both_lanes(self) -> None:
+        ingest = IngestQueue()
+        ingest.put(_text(1))
+        ingest.put(_stamp(2))
+
+        ingest.clear()
+
+        self.assertEqual(ingest.qsize(), 0)
+        self.assertTrue(ingest.put(_stamp(3)))
+
+    def test_rejects_unknown_policy(self) -> None:
+        with self.assertRaises(ValueError):
+            IngestQueue(stamp_policy="random")
+
+
+if __name__ == "__main__":
+    unittest.main()
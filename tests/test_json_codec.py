@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import unittest
+
+from services.json_codec import available_codecs, select_codec
+
+
+class JsonCodecTests(unittest.TestCase):
+    def test_every_available_codec_round_trips_and_rejects_invalid_input(self) -> None:
+        value = {"type": "comment.created", "payload": {"text": "こんにちは", "n": 1}}
+
+        for codec in available_codecs():
+            with self.subTest(codec=codec.name):
+                encoded = codec.dumps(value)
+                self.assertIsInstance(encoded, str)
+                self.assertIn("こんにちは", encoded)
+                self.assertEqual(codec.loads(encoded), value)
+                self.assertEqual(codec.loads(encoded.encode("utf-8")), value)
+                with self.assertRaises(ValueError):
+                    codec.loads("not json")
+
+    def test_select_codec_honours_preference_and_falls_back(self) -> None:
+        self.assertEqual(select_codec("stdlib").name, "stdlib")
+        self.assertEqual(select_codec("unknown").name, available_codecs()[0].name)
+        self.assertEqual(available_codecs()[-1].name, "stdlib")
+
+
+if __name__ == "__main__":
+    unittest.main()
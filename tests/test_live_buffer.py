@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import unittest
+
+from services.live_buffer import LiveFrameBuffer
+
+
+def _comment_frame(comment_id: int, session: str = "demo") -> str:
+    return (
+        f'{{"type":"comment.created","payload":{{"id":{comment_id},'
+        f'"session":"{session}","name":"A","realName":"A","text":"hi",'
+        '"time":"10:00","stamp":null,"stampPath":null,"source":"textbox",'
+        '"createdAt":"2026-03-10T00:00:00Z","reactions":[]}}'
+    )
+
+
+class LiveFrameBufferTests(unittest.TestCase):
+    def test_offer_is_refused_until_started_and_after_flush(self) -> None:
+        buffer = LiveFrameBuffer()
+        self.assertFalse(buffer.offer(_comment_frame(1), "demo", 0.0))
+
+        buffer.start()
+        self.assertTrue(buffer.offer(_comment_frame(1), "demo", 0.0))
+        handled: list[str] = []
+        buffer.flush("demo", lambda message, _received_at: handled.append(message))
+
+        self.assertEqual(len(handled), 1)
+        self.assertFalse(buffer.offer(_comment_frame(2), "demo", 0.0))
+
+    def test_keeps_buffering_until_every_start_is_flushed(self) -> None:
+        buffer = LiveFrameBuffer()
+        buffer.start()
+        buffer.offer(_comment_frame(1), "demo", 0.0)
+        buffer.start()
+        buffer.offer(_comment_frame(2), "demo", 0.0)
+        handled: list[str] = []
+
+        buffer.flush("demo", lambda message, _received_at: handled.append(message))
+        self.assertEqual(handled, [])
+        self.assertTrue(buffer.offer(_comment_frame(3), "demo", 0.0))
+
+        buffer.flush("demo", lambda message, _received_at: handled.append(message))
+        self.assertEqual(handled, [_comment_frame(i) for i in (1, 2, 3)])
+        self.assertFalse(buffer.offer(_comment_frame(4), "demo", 0.0))
+
+    def test_frames_buffered_under_another_name_are_dropped(self) -> None:
+        buffer = LiveFrameBuffer()
+        buffer.start()
+        buffer.offer(_comment_frame(3, "Demo"), "Demo", 0.0)
+        buffer.offer(_comment_frame(4), "demo", 0.0)
+
+        self.assertEqual(buffer.first_comment_id("demo", 2), 4)
+        handled: list[str] = []
+        buffer.flush("demo", lambda message, _received_at: handled.append(message))
+
+        self.assertEqual(handled, [_comment_frame(4)])
+
+    def test_follows_only_when_the_first_new_comment_is_next_to_cursor(self) -> None:
+        buffer = LiveFrameBuffer()
+        buffer.start()
+        buffer.offer(_comment_frame(2), "demo", 0.0)
+        buffer.offer(_comment_frame(3), "demo", 0.0)
+
+        self.assertTrue(buffer.follows("demo", 2))
+        self.assertTrue(buffer.follows("demo", 1))
+        self.assertFalse(buffer.follows("demo", 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import unittest
+
+from services import backend_api
+from tools.load_generator import LoadProfile, run_load
+
+
+class RunLoadTests(unittest.TestCase):
+    def test_small_mixed_load_is_fully_received_and_consumed(self) -> None:
+        base_url = backend_api.BACKEND_BASE_URL
+        profile = LoadProfile(
+            duration_sec=0.3,
+            comments_per_sec=100.0,
+            stamps_per_sec=100.0,
+            reactions_per_sec=100.0,
+            hot_comments=2,
+            long_token_ratio=0.5,
+        )
+
+        report = run_load(profile)
+
+        self.assertEqual(report.sent["comments"], 30)
+        self.assertEqual(report.dropped_frames, 0)
+        self.assertEqual(report.consumed_comments, 30)
+        self.assertEqual(report.final_queue_depth, 0)
+        self.assertEqual(backend_api.BACKEND_BASE_URL, base_url)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from services.metrics import LatencyHistogram, MessageLatencyTracker
+
+
+class LatencyHistogramTests(unittest.TestCase):
+    def test_reports_percentiles_in_milliseconds(self) -> None:
+        histogram = LatencyHistogram()
+        for value_ms in range(1, 101):
+            histogram.record(value_ms / 1000.0)
+
+        snapshot = histogram.snapshot()
+
+        self.assertEqual(snapshot.count, 100)
+        self.assertAlmostEqual(snapshot.p50_ms or 0.0, 50.0)
+        self.assertAlmostEqual(snapshot.p95_ms or 0.0, 95.0)
+        self.assertAlmostEqual(snapshot.p99_ms or 0.0, 99.0)
+        self.assertAlmostEqual(snapshot.min_ms or 0.0, 1.0)
+        self.assertAlmostEqual(snapshot.max_ms or 0.0, 100.0)
+
+    def test_buckets_count_every_sample_including_overflow(self) -> None:
+        histogram = LatencyHistogram(bucket_bounds_ms=(10.0, 100.0), sample_size=2)
+        for seconds in (0.005, 0.05, 0.5, 5.0):
+            histogram.record(seconds)
+
+        snapshot = histogram.snapshot()
+
+        self.assertEqual(snapshot.buckets, ((10.0, 1), (100.0, 1), (None, 2)))
+        self.assertEqual(snapshot.count, 4)
+        self.assertEqual(snapshot.p50_ms, 500.0)
+
+    def test_empty_histogram_has_no_percentiles(self) -> None:
+        snapshot = LatencyHistogram().snapshot()
+
+        self.assertEqual(snapshot.count, 0)
+        self.assertIsNone(snapshot.p99_ms)
+
+
+class MessageLatencyTrackerTests(unittest.TestCase):
+    def test_records_each_segment_when_drawn(self) -> None:
+        tracker = MessageLatencyTracker()
+        tracker.begin(1, received_at=10.000, decoded_at=10.001)
+        tracker.mark(1, "enqueued", at=10.002)
+        tracker.mark(1, "dequeued", at=10.080)
+        tracker.mark_drawn([1], at=10.100)
+
+        segments = tracker.snapshot()
+
+        self.assertAlmostEqual(segments["decode"].p50_ms or 0.0, 1.0)
+        self.assertAlmostEqual(segments["queue"].p50_ms or 0.0, 78.0)
+        self.assertAlmostEqual(segments["draw"].p50_ms or 0.0, 20.0)
+        self.assertAlmostEqual(segments["total"].p50_ms or 0.0, 100.0)
+
+    def test_ignores_untracked_and_discarded_messages(self) -> None:
+        tracker = MessageLatencyTracker(max_pending=1)
+        tracker.mark(9, "dequeued", at=1.0)
+        tracker.begin(1, received_at=0.0)
+        tracker.discard(1)
+        tracker.begin(2, received_at=0.0)
+        tracker.begin(3, received_at=0.0)
+        tracker.mark_drawn([1, 2, 3, 9], at=1.0)
+
+        self.assertEqual(tracker.snapshot()["total"].count, 1)
+
+    def test_dump_json_skips_when_nothing_measured(self) -> None:
+        tracker = MessageLatencyTracker()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "latency.json"
+            self.assertFalse(tracker.dump_json(path))
+
+            tracker.begin(1, received_at=0.0)
+            tracker.mark_drawn([1], at=0.5)
+            self.assertTrue(tracker.dump_json(path))
+            data = json.loads(path.read_text(encoding="utf-8"))
+
+        self.assertEqual(data["segments"]["total"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from services import backend_api
+from services.backend_api import BackendApiError, BackendUnavailableError
+from services.outbox import (
+    KIND_CREATE_POLL,
+    KIND_SAKURA_COMMENT,
+    Outbox,
+    OutboxCounts,
+    OutboxPending,
+)
+from tools.stand_in_server import StandInServer
+
+
+class OutboxTests(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "outbox.sqlite3")
+        backend_api.reset_circuit_breakers()
+        self.addCleanup(backend_api.reset_circuit_breakers)
+        self.server = StandInServer().start()
+        self.addCleanup(self.server.stop)
+        patcher = patch.object(backend_api, "BACKEND_BASE_URL", self.server.base_url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _outbox(self, **kwargs: object) -> Outbox:
+        outbox = Outbox(self.path, retry_initial_sec=0.01, retry_max_sec=0.05, **kwargs)  # type: ignore[arg-type]
+        self.addCleanup(outbox.stop)
+        return outbox
+
+    def _comment(self, text: str) -> dict[str, object]:
+        return {
+            "session": "demo",
+            "display_name": "sakura",
+            "text": text,
+            "operator_name": "admin",
+        }
+
+    def _texts(self) -> list[str]:
+        _session, messages = backend_api.fetch_bootstrap("demo")
+        return [str(message["text"]) for message in messages]
+
+    def test_retries_transient_failures_in_order_without_duplicates(self) -> None:
+        self.server.fail_next_posts = 2
+        outbox = self._outbox()
+        outbox.start()
+
+        outbox.enqueue(KIND_SAKURA_COMMENT, self._comment("first"))
+        result = outbox.submit(KIND_SAKURA_COMMENT, self._comment("second"), wait=5)
+
+        self.assertEqual(result["text"], "second")  # type: ignore[index]
+        self.assertEqual(self._texts(), ["first", "second"])
+        self.assertEqual(outbox.counts(), OutboxCounts())
+
+    def test_same_request_id_is_sent_once(self) -> None:
+        outbox = self._outbox()
+        outbox.start()
+
+        first = outbox.submit(
+            KIND_SAKURA_COMMENT, self._comment("once"), request_id="req-1", wait=5
+        )
+        second = outbox.submit(
+            KIND_SAKURA_COMMENT, self._comment("once"), request_id="req-1", wait=5
+        )
+
+        self.assertEqual(first, second)
+        self.assertEqual(self._texts(), ["once"])
+
+    def test_server_replays_response_for_resent_request_id(self) -> None:
+        first = backend_api.post_sakura_comment(
+            "demo", "sakura", "hello", "admin", request_id="req-2"
+        )
+        second = backend_api.post_sakura_comment(
+            "demo", "sakura", "hello", "admin", request_id="req-2"
+        )
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.server.replayed_requests, 1)
+        self.assertEqual(self._texts(), ["hello"])
+
+    def test_rejected_request_fails_without_retry_and_can_be_requeued(self) -> None:
+        outbox = self._outbox()
+        outbox.start()
+
+        with self.assertRaises(BackendApiError):
+            outbox.submit(
+                KIND_CREATE_POLL,
+                {
+                    "session": "demo",
+                    "question": None,
+                    "options": [],
+                    "duration_sec": 30,
+                },
+                wait=5,
+            )
+        self.assertEqual(outbox.counts(), OutboxCounts(failed=1))
+        # 失敗が先頭に残っても後ろの操作は止めない
+        outbox.submit(KIND_SAKURA_COMMENT, self._comment("after"), wait=5)
+
+        self.assertEqual(outbox.retry_failed(), 1)
+        self.assertEqual(outbox.discard_failed(), 0)
+
+    def test_pending_operations_survive_restart(self) -> None:
+        outbox = self._outbox()
+        with self.assertRaises(OutboxPending):
+            outbox.submit(KIND_SAKURA_COMMENT, self._comment("offline"), wait=0)
+        self.assertEqual(outbox.counts(), OutboxCounts(pending=1))
+        outbox.stop()
+
+        restarted = self._outbox()
+        restarted.start()
+        restarted.submit(KIND_SAKURA_COMMENT, self._comment("online"), wait=5)
+
+        self.assertEqual(self._texts(), ["offline", "online"])
+
+    def test_stale_operations_are_not_sent(self) -> None:
+        now = [1000.0]
+        outbox = self._outbox(max_age_sec=60, clock=lambda: now[0])
+        outbox.enqueue(KIND_SAKURA_COMMENT, self._comment("late"))
+        now[0] += 61
+        outbox.start()
+
+        outbox.submit(KIND_SAKURA_COMMENT, self._comment("fresh"), wait=5)
+
+        self.assertEqual(outbox.counts(), OutboxCounts(failed=1))
+        self.assertEqual(self._texts(), ["fresh"])
+
+    def test_unknown_kind_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            self._outbox().enqueue("unknown", {})
+
+    def test_leftovers_can_be_held_as_failed_instead_of_sent(self) -> None:
+        now = [1000.0]
+        outbox = self._outbox(max_age_sec=60, clock=lambda: now[0])
+        outbox.enqueue(KIND_SAKURA_COMMENT, self._comment("stale"))
+        now[0] += 61
+        outbox.enqueue(KIND_SAKURA_COMMENT, self._comment("leftover"))
+        outbox.stop()
+
+        restarted = self._outbox(max_age_sec=60, clock=lambda: now[0])
+        self.assertEqual(restarted.open(), 1)
+        self.assertEqual(restarted.fail_pending("held"), 2)
+        restarted.start()
+        restarted.submit(KIND_SAKURA_COMMENT, self._comment("fresh"), wait=5)
+
+        self.assertEqual(self._texts(), ["fresh"])
+        self.assertEqual(restarted.counts(), OutboxCounts(failed=2))
+
+    def test_sends_directly_when_the_store_cannot_be_opened(self) -> None:
+        # 置き場所のディレクトリがあるべき所にファイルがあって作れない
+        blocker = os.path.join(os.path.dirname(self.path), "blocker")
+        open(blocker, "w").close()
+        self.path = os.path.join(blocker, "outbox.sqlite3")
+        outbox = self._outbox()
+        with self.assertRaises(sqlite3.Error):
+            outbox.start()
+
+        result = outbox.submit(KIND_SAKURA_COMMENT, self._comment("direct"), wait=0)
+
+        self.assertEqual(result["text"], "direct")  # type: ignore[index]
+        self.assertEqual(self._texts(), ["direct"])
+
+    def test_worker_starts_once_the_store_opens_after_a_failed_start(self) -> None:
+        blocker = os.path.join(os.path.dirname(self.path), "blocker")
+        open(blocker, "w").close()
+        self.path = os.path.join(blocker, "outbox.sqlite3")
+        outbox = self._outbox()
+        with self.assertRaises(sqlite3.Error):
+            outbox.start()
+        os.remove(blocker)
+
+        outbox.submit(KIND_SAKURA_COMMENT, self._comment("queued"), wait=5)
+
+        self.assertEqual(self._texts(), ["queued"])
+
+    def test_creates_the_data_directory(self) -> None:
+        self.path = os.path.join(os.path.dirname(self.path), "data", "outbox.sqlite3")
+        outbox = self._outbox()
+        outbox.start()
+
+        outbox.submit(KIND_SAKURA_COMMENT, self._comment("stored"), wait=5)
+
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_unexpected_sender_error_fails_the_entry_and_keeps_going(self) -> None:
+        def broken(**_params: object) -> object:
+            raise RuntimeError("boom")
+
+        outbox = self._outbox(
+            senders={
+                KIND_CREATE_POLL: broken,
+                KIND_SAKURA_COMMENT: backend_api.post_sakura_comment,
+            }
+        )
+        outbox.enqueue(KIND_CREATE_POLL, {})
+
+        with self.assertLogs("services.outbox", level="ERROR"):
+            outbox.start()
+            outbox.submit(KIND_SAKURA_COMMENT, self._comment("after"), wait=5)
+
+        self.assertEqual(self._texts(), ["after"])
+        self.assertEqual(outbox.counts(), OutboxCounts(failed=1))
+
+    def test_worker_survives_store_errors(self) -> None:
+        outbox = self._outbox()
+        original = outbox._head_locked
+        calls = [0]
+
+        def flaky_head() -> object:
+            calls[0] += 1
+            if calls[0] == 1:
+                raise sqlite3.OperationalError("disk I/O error")
+            return original()
+
+        with patch.object(outbox, "_head_locked", flaky_head):
+            outbox.start()
+            outbox.submit(KIND_SAKURA_COMMENT, self._comment("recovered"), wait=5)
+
+        self.assertEqual(self._texts(), ["recovered"])
+
+
+class PostClassificationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        backend_api.reset_circuit_breakers()
+        self.addCleanup(backend_api.reset_circuit_breakers)
+        self.server = StandInServer().start()
+        self.addCleanup(self.server.stop)
+        patcher = patch.object(backend_api, "BACKEND_BASE_URL", self.server.base_url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_server_errors_are_transient_and_client_errors_are_not(self) -> None:
+        self.server.fail_next_posts = 1
+        with self.assertRaises(BackendUnavailableError):
+            backend_api.start_poll("demo", 1)
+        with self.assertRaises(BackendApiError) as raised:
+            backend_api.start_poll("demo", 1)
+        self.assertNotIsInstance(raised.exception, BackendUnavailableError)
+
+
+if __name__ == "__main__":
+    unittest.main()
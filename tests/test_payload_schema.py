@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import types
+import unittest
+
+from services import backend_api
+from services.payload_schema import (
+    KIND_CONVERT,
+    KIND_INT,
+    KIND_INT_LIST,
+    KIND_LIST,
+    KIND_NUMBER,
+    Field,
+    compile_schema,
+)
+
+
+class _SchemaError(Exception):
+    pass
+
+
+_normalize_item = compile_schema(
+    "item",
+    (Field("value", "value", KIND_INT),),
+    error=_SchemaError,
+)
+
+_normalize = compile_schema(
+    "sample",
+    (
+        Field("id", "id", KIND_INT),
+        Field("label", "displayLabel"),
+        Field("note", "note", nullable=True),
+        Field("rate", "rate", KIND_NUMBER),
+        Field("counts", "counts", KIND_INT_LIST, item_label="count"),
+        Field("items", "items", KIND_LIST, item=_normalize_item),
+        Field("size", "tags", KIND_CONVERT, convert=lambda value: len(value or ())),
+    ),
+    error=_SchemaError,
+)
+
+
+def _sample(**overrides: object) -> dict[str, object]:
+    payload: dict[str, object] = {
+        "id": 1,
+        "displayLabel": "a",
+        "note": None,
+        "rate": 1,
+        "counts": [1, 2],
+        "items": [{"value": 3}],
+        "tags": ["x", "y"],
+    }
+    payload.update(overrides)
+    return payload
+
+
+class CompileSchemaTests(unittest.TestCase):
+    def test_converts_camel_case_payload(self) -> None:
+        self.assertEqual(
+            _normalize(_sample()),
+            {
+                "id": 1,
+                "label": "a",
+                "note": None,
+                "rate": 1.0,
+                "counts": [1, 2],
+                "items": [{"value": 3}],
+                "size": 2,
+            },
+        )
+        self.assertIsInstance(_normalize(_sample())["rate"], float)
+
+    def test_missing_keys_are_validated_as_none(self) -> None:
+        payload = _sample()
+        del payload["note"]
+        del payload["tags"]
+        self.assertEqual(_normalize(payload)["note"], None)
+        self.assertEqual(_normalize(payload)["size"], 0)
+
+        del payload["id"]
+        with self.assertRaisesRegex(_SchemaError, "^id is invalid$"):
+            _normalize(payload)
+
+    def test_rejects_bool_for_int_and_number(self) -> None:
+        for field, value in (("id", True), ("rate", False)):
+            with self.subTest(field=field), self.assertRaises(_SchemaError):
+                _normalize(_sample(**{field: value}))
+
+    def test_list_errors_use_item_label(self) -> None:
+        with self.assertRaisesRegex(_SchemaError, "^count is invalid$"):
+            _normalize(_sample(counts=[1, "2"]))
+        with self.assertRaisesRegex(_SchemaError, "^counts is invalid$"):
+            _normalize(_sample(counts="12"))
+        with self.assertRaisesRegex(_SchemaError, "^value is invalid$"):
+            _normalize(_sample(items=[{"value": None}]))
+
+    def test_accepts_other_mappings_and_sequences(self) -> None:
+        payload = types.MappingProxyType(_sample(counts=(4, 5)))
+        self.assertEqual(_normalize(payload)["counts"], [4, 5])
+        with self.assertRaisesRegex(_SchemaError, "^sample is invalid$"):
+            _normalize(["not", "a", "mapping"])
+
+
+class BackendNormalizerTests(unittest.TestCase):
+    def test_comment_item_keeps_its_output_shape(self) -> None:
+        comment = backend_api.normalize_comment_item(
+            {
+                "id": 5,
+                "session": "demo",
+                "name": "A",
+                "realName": "B",
+                "text": "hi",
+                "time": "10:00",
+                "stampPath": "/stamps/a.png",
+                "source": "textbox",
+                "createdAt": "2026-03-10T00:00:00Z",
+                "reactions": [{"key": "like", "count": 2}, {"count": True}],
+            }
+        )
+
+        self.assertEqual(
+            comment,
+            {
+                "id": 5,
+                "session": "demo",
+                "name": "A",
+                "real_name": "B",
+                "text": "hi",
+                "time": "10:00",
+                "stamp": None,
+                "stamp_url": "/stamps/a.png",
+                "source": "textbox",
+                "created_at": "2026-03-10T00:00:00Z",
+                "server_time_iso": "2026-03-10T00:00:00Z",
+                "bookmark_count": 2,
+            },
+        )
+
+    def test_invalid_payload_raises_backend_error(self) -> None:
+        with self.assertRaisesRegex(backend_api.BackendApiError, "optionCount"):
+            backend_api.normalize_poll_results(
+                {
+                    "pollId": 1,
+                    "runId": 1,
+                    "question": "Q",
+                    "options": ["A"],
+                    "durationSec": 30,
+                    "startedAt": "2026-03-10T00:00:00Z",
+                    "deliveredCount": 1,
+                    "answerCount": 0,
+                    "answerRate": 0,
+                    "averageResponseMs": None,
+                    "optionCounts": [None],
+                    "answers": [],
+                }
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
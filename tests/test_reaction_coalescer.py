@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import threading
+import unittest
+
+from services.reaction_coalescer import ReactionCoalescer
+
+
+class ReactionCoalescerTests(unittest.TestCase):
+    def test_keeps_latest_count_per_comment_and_applies_once(self) -> None:
+        batches: list[dict[int, int]] = []
+        coalescer = ReactionCoalescer(batches.append, window_sec=60.0)
+
+        for count in range(1, 51):
+            coalescer.submit(7, count)
+        coalescer.submit(8, 2)
+        coalescer.flush()
+
+        self.assertEqual(batches, [{7: 50, 8: 2}])
+
+    def test_flushes_automatically_after_window(self) -> None:
+        applied = threading.Event()
+        batches: list[dict[int, int]] = []
+
+        def apply_batch(batch: dict[int, int]) -> None:
+            batches.append(batch)
+            applied.set()
+
+        coalescer = ReactionCoalescer(apply_batch, window_sec=0.01)
+        coalescer.submit(1, 3)
+
+        self.assertTrue(applied.wait(5.0))
+        self.assertEqual(batches, [{1: 3}])
+
+    def test_stale_window_does_not_flush_a_later_batch(self) -> None:
+        batches: list[dict[int, int]] = []
+        scheduled: list = []
+        coalescer = ReactionCoalescer(
+            batches.append,
+            window_sec=60.0,
+            schedule=lambda _delay, callback: scheduled.append(callback),
+        )
+
+        coalescer.submit(1, 3)
+        coalescer.discard()
+        coalescer.submit(2, 5)
+        scheduled[0]()
+        self.assertEqual(batches, [])
+
+        scheduled[1]()
+        self.assertEqual(batches, [{2: 5}])
+
+    def test_zero_window_applies_immediately(self) -> None:
+        batches: list[dict[int, int]] = []
+        coalescer = ReactionCoalescer(batches.append, window_sec=0.0)
+
+        coalescer.submit(1, 3)
+
+        self.assertEqual(batches, [{1: 3}])
+
+    def test_discard_drops_pending_updates(self) -> None:
+        batches: list[dict[int, int]] = []
+        coalescer = ReactionCoalescer(batches.append, window_sec=60.0)
+
+        coalescer.submit(1, 3)
+        coalescer.discard()
+        coalescer.flush()
+
+        self.assertEqual(batches, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
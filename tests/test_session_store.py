@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import unittest
+
+from state.session_store import SessionStore
+from ui.comment_ui import comment_entry_from_message
+
+
+def _comment(comment_id: int) -> dict[str, object]:
+    return {
+        "id": comment_id,
+        "session": "room-a",
+        "name": "A",
+        "text": f"comment {comment_id}",
+        "time": "10:00",
+        "created_at": "2026-03-10T00:00:00Z",
+        "bookmark_count": 0,
+    }
+
+
+class SessionStoreTests(unittest.TestCase):
+    def test_history_sets_cursor_and_queues_entries_as_history(self) -> None:
+        store = SessionStore("room-a")
+
+        store.replace_history([_comment(3), _comment(5)])
+
+        self.assertEqual(store.comment_cursor(), 5)
+        queued = [store.message_queue.get_nowait() for _ in range(2)]
+        self.assertTrue(all(entry["_from_history"] for entry in queued))
+
+    def test_live_comments_are_deduplicated_and_advance_cursor(self) -> None:
+        store = SessionStore("room-a")
+        store.replace_history([_comment(1)])
+        store.message_queue.clear()
+
+        self.assertFalse(store.add_live(_comment(1)))
+        self.assertTrue(store.add_live(_comment(2)))
+
+        self.assertEqual(store.comment_cursor(), 2)
+        self.assertEqual(store.message_queue.qsize(), 1)
+
+    def test_older_history_is_prepended_once(self) -> None:
+        store = SessionStore("room-a")
+        store.replace_history([_comment(3)])
+        entry = comment_entry_from_message(store.message_queue.get_nowait())
+        assert entry is not None
+        store.append_message(entry)
+
+        store.prepend_history([_comment(1), _comment(2), _comment(3)])
+
+        _generation, messages = store.snapshot_messages()
+        self.assertEqual([m.id for m in messages], [1, 2, 3])
+        self.assertEqual([m["id"] for m in store.message_log], [1, 2, 3])
+        self.assertEqual(store.comment_cursor(), 3)
+
+    def test_reaction_updates_bump_generation_once(self) -> None:
+        store = SessionStore("room-a")
+        for comment_id in (1, 2):
+            entry = comment_entry_from_message(_comment(comment_id))
+            assert entry is not None
+            store.append_message(entry)
+        generation, _ = store.snapshot_messages()
+
+        store.apply_reaction_updates({1: 4, 2: 7})
+
+        new_generation, messages = store.snapshot_messages()
+        self.assertEqual(new_generation, generation + 1)
+        self.assertEqual([m.bookmark_count for m in messages], [4, 7])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from services import backend_api, session_pipeline, session_watch
+from tools.stand_in_server import StandInServer
+
+
+def _collect(
+    watched: session_watch.WatchedSession, count: int, timeout: float = 5.0
+) -> list[dict[str, object]]:
+    collected: list[dict[str, object]] = []
+    deadline = time.monotonic() + timeout
+    while len(collected) < count and time.monotonic() < deadline:
+        while not watched.store.message_queue.empty():
+            collected.append(watched.store.message_queue.get_nowait())
+        time.sleep(0.01)
+    return collected
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class WatchSessionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = StandInServer().start()
+        self.addCleanup(self.server.stop)
+        patcher = patch.multiple(
+            backend_api,
+            BACKEND_BASE_URL=self.server.base_url,
+            BACKEND_CLIENT_WS_BASE_URL=self.server.ws_base_url,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(session_watch.unwatch_all)
+
+    def test_routes_each_session_to_its_own_store(self) -> None:
+        self.server.add_comment("room-a", "history a", broadcast=False)
+        room_a = session_watch.watch_session("room-a")
+        room_b = session_watch.watch_session("room-b")
+        self.assertIs(session_watch.watch_session("room-a"), room_a)
+        self.assertTrue(self.server.wait_for_clients(1, "room-a"))
+        self.assertTrue(self.server.wait_for_clients(1, "room-b"))
+
+        self.server.add_comment("room-a", "live a")
+        self.server.add_comment("room-b", "live b")
+        self.server.add_comment("room-b", "stamp", stamp="s", stamp_path="/s.png")
+        self.server.add_comment("room-b", "after stamp")
+
+        received_a = _collect(room_a, 2)
+        received_b = _collect(room_b, 2)
+
+        self.assertEqual([e["text"] for e in received_a], ["history a", "live a"])
+        self.assertEqual([e["text"] for e in received_b], ["live b", "after stamp"])
+
+    def test_no_comment_is_missed_while_the_watch_connects(self) -> None:
+        self.server.add_comment("room-a", "one", broadcast=False)
+        fetch_page = backend_api.fetch_bootstrap_page
+        original_start = session_watch._start_watch_socket
+
+        def slow_bootstrap(session: str, **kwargs: object):
+            result = fetch_page(session, **kwargs)
+            # 履歴の取得後、購読前に出たコメントと、取得中に届いたライブのコメント
+            self.server.add_comment("room-a", "gap", broadcast=False)
+            self.assertTrue(self.server.wait_for_clients(1, "room-a"))
+            self.server.add_comment("room-a", "live")
+            time.sleep(0.1)
+            return result
+
+        def late_start(*args) -> bool:
+            # 購読が履歴の取得より後になる場合を再現する
+            threading.Timer(0.05, original_start, args).start()
+            return True
+
+        with (
+            patch.object(
+                session_pipeline, "fetch_bootstrap_page", side_effect=slow_bootstrap
+            ),
+            patch.object(session_watch, "_start_watch_socket", side_effect=late_start),
+        ):
+            watched = session_watch.watch_session("room-a")
+            received = _collect(watched, 3)
+
+        self.assertEqual(sorted(e["text"] for e in received), ["gap", "live", "one"])
+
+    def test_watching_again_retries_a_failed_watch(self) -> None:
+        self.server.add_comment("room-a", "history", broadcast=False)
+        with patch.object(
+            session_pipeline,
+            "fetch_bootstrap_page",
+            side_effect=backend_api.BackendApiError("down"),
+        ):
+            watched = session_watch.watch_session("room-a")
+            self.assertTrue(_wait_for(lambda: watched.error is not None))
+
+        self.assertIs(session_watch.watch_session("room-a"), watched)
+        received = _collect(watched, 1)
+
+        self.assertIsNone(watched.error)
+        self.assertEqual([e["text"] for e in received], ["history"])
+
+    def test_unwatch_closes_the_connection(self) -> None:
+        session_watch.watch_session("room-a")
+        self.assertTrue(self.server.wait_for_clients(1, "room-a"))
+
+        session_watch.unwatch_session("room-a")
+
+        self.assertTrue(_wait_for(lambda: self.server.client_count("room-a") == 0))
+        self.assertEqual(session_watch.watched_sessions(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import threading
+import unittest
+from unittest.mock import patch
+
+from services import backend_api
+from services.ws_transport import get_engine, run_websocket_connection
+from tools.stand_in_server import StandInServer
+
+
+class StandInServerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = StandInServer().start()
+        self.addCleanup(self.server.stop)
+        patcher = patch.multiple(
+            backend_api,
+            BACKEND_BASE_URL=self.server.base_url,
+            BACKEND_CLIENT_WS_BASE_URL=self.server.ws_base_url,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_serves_client_http_endpoints(self) -> None:
+        first = self.server.add_comment("demo", "hello", broadcast=False)
+        self.server.add_comment("demo", "world", broadcast=False)
+        self.server.add_behavior_event("demo", "tab.hidden")
+
+        session, messages = backend_api.fetch_bootstrap("demo")
+        newer, _updates, complete = backend_api.fetch_comments_since(
+            "demo", int(first["id"])
+        )
+        reaction_mode = backend_api.fetch_reaction_mode("demo")
+        poll = backend_api.create_poll("demo", "Q?", ["A", "B"], 30)
+        started = backend_api.start_poll("demo", poll["id"])
+        results = backend_api.fetch_poll_results(poll["id"], started["run_id"], "demo")
+        behavior = backend_api.fetch_behavior_events("demo")
+
+        self.assertEqual(session, "demo")
+        self.assertEqual([m["text"] for m in messages], ["hello", "world"])
+        self.assertEqual([m["text"] for m in newer], ["world"])
+        self.assertTrue(complete)
+        self.assertEqual(reaction_mode["session"], "demo")
+        self.assertEqual(backend_api.fetch_polls("demo")[0]["question"], "Q?")
+        self.assertEqual(results["option_counts"], [0, 0])
+        self.assertEqual(behavior[0]["event_type"], "tab.hidden")
+
+    def test_bootstrap_pages_from_newest(self) -> None:
+        for index in range(5):
+            self.server.add_comment("demo", f"c{index}", broadcast=False)
+
+        _session, newest, has_more = backend_api.fetch_bootstrap_page("demo", limit=2)
+        _session, older, _more = backend_api.fetch_bootstrap_page(
+            "demo", before_id=int(newest[0]["id"]), limit=2
+        )
+        _session, oldest, no_more = backend_api.fetch_bootstrap_page(
+            "demo", before_id=int(older[0]["id"]), limit=2
+        )
+
+        self.assertEqual([m["text"] for m in newest], ["c3", "c4"])
+        self.assertTrue(has_more)
+        self.assertEqual([m["text"] for m in older], ["c1", "c2"])
+        self.assertEqual([m["text"] for m in oldest], ["c0"])
+        self.assertFalse(no_more)
+
+    def test_unchanged_poll_results_are_revalidated_with_not_modified(self) -> None:
+        backend_api.clear_response_cache()
+        self.addCleanup(backend_api.clear_response_cache)
+        poll = backend_api.create_poll("demo", "Q?", ["A", "B"], 30)
+        started = backend_api.start_poll("demo", poll["id"])
+
+        first = backend_api.fetch_poll_results(poll["id"], started["run_id"], "demo")
+        second = backend_api.fetch_poll_results(poll["id"], started["run_id"], "demo")
+
+        self.assertIs(second, first)
+        self.assertEqual(self.server.not_modified_responses, 1)
+
+    def test_broadcasts_events_to_subscribed_socket(self) -> None:
+        received: list[tuple[str, dict[str, object]]] = []
+        done = threading.Event()
+
+        def on_message(message: str) -> None:
+            parsed = backend_api.parse_ws_event(message)
+            if parsed is not None:
+                received.append(parsed)
+            if len(received) == 2:
+                done.set()
+
+        future = get_engine().submit(
+            run_websocket_connection(
+                backend_api.build_ws_url("demo"),
+                origin="https://example.test",
+                on_open=lambda: None,
+                on_message=on_message,
+            )
+        )
+        self.addCleanup(future.cancel)
+        self.assertTrue(self.server.wait_for_clients(1, "demo"))
+
+        comment = self.server.add_comment("demo", "live")
+        self.server.add_comment("other", "not for us")
+        self.server.update_reactions("demo", int(comment["id"]), 3)
+
+        self.assertTrue(done.wait(5.0))
+        self.assertEqual(received[0][0], "comment.created")
+        self.assertEqual(received[0][1]["text"], "live")
+        self.assertEqual(received[1][1]["bookmark_count"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
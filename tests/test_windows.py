@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import os
 import sys
+import tempfile
 import unittest
 import types
 from unittest.mock import patch
@@ -12,6 +14,11 @@ if "wsproto" not in sys.modules:
 
     connection_module = types.ModuleType("wsproto.connection")
     connection_module.ConnectionType = type("ConnectionType", (), {"CLIENT": "CLIENT"})
+    connection_module.ConnectionState = type(
+        "ConnectionState",
+        (),
+        {"OPEN": "OPEN", "REMOTE_CLOSING": "REMOTE_CLOSING"},
+    )
     sys.modules["wsproto.connection"] = connection_module
 
     events_module = types.ModuleType("wsproto.events")
@@ -19,6 +26,7 @@ if "wsproto" not in sys.modules:
         "AcceptConnection",
         "CloseConnection",
         "Ping",
+        "Pong",
         "RejectConnection",
         "RejectData",
         "Request",
@@ -27,6 +35,11 @@ if "wsproto" not in sys.modules:
         setattr(events_module, name, type(name, (), {}))
     sys.modules["wsproto.events"] = events_module
 
+    extensions_module = types.ModuleType("wsproto.extensions")
+    for name in ("Extension", "PerMessageDeflate"):
+        setattr(extensions_module, name, type(name, (), {}))
+    sys.modules["wsproto.extensions"] = extensions_module
+
 if "requests" not in sys.modules:
     requests_module = types.ModuleType("requests")
     requests_module.codes = types.SimpleNamespace(ok=200, created=201)
@@ -43,6 +56,7 @@ from ui.admin_cards import (
     build_poll_results_view,
 )
 from ui.file_utils import build_export_filename, sanitize_filename_component
+from ui import windows
 from ui.windows import (
     _create_menu_child_window,
     _open_history_window,
@@ -56,6 +70,7 @@ from services.backend_api import (
     normalize_poll_results,
     parse_reaction_update_event,
 )
+from services.outbox import KIND_SAKURA_COMMENT, Outbox
 
 
 class ReactionUpdateParsingTests(unittest.TestCase):
@@ -501,5 +516,35 @@ class MenuDialogParentTests(unittest.TestCase):
         create_window.assert_not_called()
 
 
+class OperationRequestIdTests(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.outbox = Outbox(os.path.join(directory.name, "outbox.sqlite3"))
+        self.addCleanup(self.outbox.stop)
+        for patcher in (
+            patch.object(windows, "outbox", self.outbox),
+            patch.dict(windows._queued_request_ids, clear=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.params = {"session": "demo", "text": "hello"}
+
+    def test_resubmitting_a_queued_operation_reuses_its_request_id(self) -> None:
+        first = windows._operation_request_id(("sakura",), self.params)
+        self.outbox.enqueue(KIND_SAKURA_COMMENT, self.params, request_id=first)
+
+        self.assertEqual(windows._operation_request_id(("sakura",), self.params), first)
+        other = dict(self.params, text="changed")
+        self.assertNotEqual(windows._operation_request_id(("sakura",), other), first)
+
+    def test_sent_operation_gets_a_new_request_id(self) -> None:
+        first = windows._operation_request_id(("sakura",), self.params)
+
+        self.assertNotEqual(
+            windows._operation_request_id(("sakura",), self.params), first
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
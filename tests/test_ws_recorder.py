@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from services.ws_recorder import (
+    FrameRecorder,
+    RecordingFormatError,
+    read_recording,
+    replay_frames,
+)
+
+
+class FrameRecorderTests(unittest.TestCase):
+    def test_round_trips_frames_with_monotonic_offsets(self) -> None:
+        now = [50.0]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "nested" / "rec.jsonl"
+            recorder = FrameRecorder(path, session="demo", clock=lambda: now[0])
+            now[0] = 50.25
+            recorder.record('{"type":"a"}')
+            now[0] = 51.0
+            recorder.record("日本語")
+            recorder.close()
+            recorder.record("ignored after close")
+
+            header, frames = read_recording(path)
+
+        self.assertEqual(header["session"], "demo")
+        self.assertEqual(frames, [(0.25, '{"type":"a"}'), (1.0, "日本語")])
+
+    def test_records_the_given_receive_time(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "rec.jsonl"
+            recorder = FrameRecorder(path, session="demo", clock=lambda: 10.0)
+            recorder.record("early", received_at=9.0)
+            recorder.record("late", received_at=12.5)
+            recorder.close()
+
+            _header, frames = read_recording(path)
+
+        self.assertEqual(frames, [(0.0, "early"), (2.5, "late")])
+
+    def test_rejects_file_without_header(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "empty.jsonl"
+            path.write_text("", encoding="utf-8")
+
+            with self.assertRaises(RecordingFormatError):
+                read_recording(path)
+
+    def test_rejects_frame_lines_that_are_not_objects(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "rec.jsonl"
+            for line in ("[1, 2]", "3", "{broken"):
+                with self.subTest(line=line):
+                    path.write_text('{"v": 1, "session": "demo"}\n' + line + "\n")
+
+                    with self.assertRaises(RecordingFormatError):
+                        read_recording(path)
+
+
+class ReplayFramesTests(unittest.TestCase):
+    def test_paces_frames_by_speed(self) -> None:
+        now: list[float] = [0.0]
+        sleeps: list[float] = []
+
+        def sleep(seconds: float) -> None:
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        dispatched: list[str] = []
+        count = replay_frames(
+            [(0.0, "a"), (1.0, "b"), (3.0, "c")],
+            dispatched.append,
+            speed=2.0,
+            clock=lambda: now[0],
+            sleep=sleep,
+        )
+
+        self.assertEqual(count, 3)
+        self.assertEqual(dispatched, ["a", "b", "c"])
+        self.assertEqual(sleeps, [0.5, 1.0])
+
+    def test_max_speed_never_sleeps_and_can_stop(self) -> None:
+        sleeps: list[float] = []
+        dispatched: list[str] = []
+
+        count = replay_frames(
+            [(0.0, "a"), (5.0, "b"), (9.0, "c")],
+            dispatched.append,
+            speed=0,
+            should_continue=lambda: len(dispatched) < 2,
+            sleep=sleeps.append,
+        )
+
+        self.assertEqual(count, 2)
+        self.assertEqual(sleeps, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
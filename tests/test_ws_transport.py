@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import socket
+import threading
+import time
+import unittest
+
+from wsproto import WSConnection
+from wsproto.connection import ConnectionType
+from wsproto.events import AcceptConnection, Ping, Request, TextMessage
+from wsproto.extensions import PerMessageDeflate
+
+from services.ws_transport import (
+    CONNECTION_BACKING_OFF,
+    CONNECTION_CONNECTING,
+    CONNECTION_DEGRADED,
+    CONNECTION_OPEN,
+    ConnectionHealth,
+    MessageDispatcher,
+    ReconnectBackoff,
+    WebSocketStale,
+    _AdaptiveReceiveBuffer,
+    get_engine,
+    run_websocket_connection,
+)
+
+
+class _SingleClientServer:
+    """1 接続だけ受け付け、ハンドシェイク後にメッセージを送って待機する。"""
+
+    def __init__(
+        self,
+        messages: list[str],
+        *,
+        accept_deflate: bool = False,
+        answer_pings: bool = True,
+    ) -> None:
+        self._messages = messages
+        self._accept_deflate = accept_deflate
+        self._answer_pings = answer_pings
+        self.bytes_sent = 0
+        self._listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self._listener.getsockname()[1]
+        self.client_closed = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self) -> None:
+        conn, _addr = self._listener.accept()
+        with conn:
+            ws = WSConnection(ConnectionType.SERVER)
+            while True:
+                data = conn.recv(4096)
+                if not data:
+                    self.client_closed.set()
+                    return
+                ws.receive_data(data)
+                for event in ws.events():
+                    if isinstance(event, Request):
+                        extensions = []
+                        if self._accept_deflate and any(
+                            str(offer).startswith(PerMessageDeflate.name)
+                            for offer in event.extensions
+                        ):
+                            extensions.append(PerMessageDeflate())
+                        conn.sendall(ws.send(AcceptConnection(extensions=extensions)))
+                        for message in self._messages:
+                            frame = ws.send(TextMessage(data=message))
+                            self.bytes_sent += len(frame)
+                            conn.sendall(frame)
+                    elif isinstance(event, Ping) and self._answer_pings:
+                        conn.sendall(ws.send(event.response()))
+
+    def close(self) -> None:
+        self._listener.close()
+
+
+class RunWebSocketConnectionTests(unittest.TestCase):
+    def test_delivers_messages_and_cancels_without_polling_delay(self) -> None:
+        server = _SingleClientServer(["hello", "world"])
+        self.addCleanup(server.close)
+        received: list[str] = []
+        opened = threading.Event()
+        got_all = threading.Event()
+
+        def on_message(message: str) -> None:
+            received.append(message)
+            if len(received) == 2:
+                got_all.set()
+
+        future = get_engine().submit(
+            run_websocket_connection(
+                f"ws://127.0.0.1:{server.port}/client/ws?session=demo",
+                origin="https://example.test",
+                on_open=opened.set,
+                on_message=on_message,
+            )
+        )
+
+        self.assertTrue(got_all.wait(5.0))
+        self.assertTrue(opened.is_set())
+        self.assertEqual(received, ["hello", "world"])
+
+        started = time.monotonic()
+        future.cancel()
+        self.assertTrue(server.client_closed.wait(5.0))
+        self.assertLess(time.monotonic() - started, 0.5)
+
+
+class MessageDispatcherTests(unittest.TestCase):
+    def test_runs_handler_off_the_caller_thread_in_order(self) -> None:
+        handled: list[tuple[str, str]] = []
+
+        def handler(message: str, _received_at: float) -> None:
+            if message == "boom":
+                raise RuntimeError("handler bug")
+            handled.append((message, threading.current_thread().name))
+
+        dispatcher = MessageDispatcher(handler, name="test-dispatch")
+        with self.assertLogs("services.ws_transport", "ERROR"):
+            for message in ("a", "boom", "b"):
+                dispatcher.submit(message)
+            dispatcher.close()
+            dispatcher.join(5.0)
+
+        self.assertEqual(handled, [("a", "test-dispatch"), ("b", "test-dispatch")])
+
+
+class PerMessageDeflateTests(unittest.TestCase):
+    def _receive_all(self, server: _SingleClientServer, expected: int) -> list[str]:
+        received: list[str] = []
+        done = threading.Event()
+
+        def on_message(message: str) -> None:
+            received.append(message)
+            if len(received) == expected:
+                done.set()
+
+        future = get_engine().submit(
+            run_websocket_connection(
+                f"ws://127.0.0.1:{server.port}/client/ws",
+                origin="https://example.test",
+                on_open=lambda: None,
+                on_message=on_message,
+                compression=True,
+            )
+        )
+        self.addCleanup(future.cancel)
+        self.assertTrue(done.wait(5.0))
+        return received
+
+    def test_compresses_frames_when_server_accepts(self) -> None:
+        messages = ['{"type":"comment.created","payload":{"text":"hello"}}'] * 20
+        server = _SingleClientServer(messages, accept_deflate=True)
+        self.addCleanup(server.close)
+
+        received = self._receive_all(server, len(messages))
+
+        self.assertEqual(received, messages)
+        self.assertLess(server.bytes_sent, sum(len(m) for m in messages))
+
+    def test_falls_back_to_plain_frames_when_server_declines(self) -> None:
+        messages = ['{"type":"comment.created","payload":{"text":"hello"}}'] * 20
+        server = _SingleClientServer(messages, accept_deflate=False)
+        self.addCleanup(server.close)
+
+        received = self._receive_all(server, len(messages))
+
+        self.assertEqual(received, messages)
+        self.assertGreater(server.bytes_sent, sum(len(m) for m in messages))
+
+
+class HeartbeatTests(unittest.TestCase):
+    def test_measures_rtt_from_matching_pongs(self) -> None:
+        server = _SingleClientServer([])
+        self.addCleanup(server.close)
+        rtts: list[float] = []
+        measured = threading.Event()
+
+        def on_rtt(seconds: float) -> None:
+            rtts.append(seconds)
+            measured.set()
+
+        future = get_engine().submit(
+            run_websocket_connection(
+                f"ws://127.0.0.1:{server.port}/client/ws",
+                origin="https://example.test",
+                on_open=lambda: None,
+                on_message=lambda _message: None,
+                heartbeat_interval=0.02,
+                on_rtt=on_rtt,
+            )
+        )
+        self.addCleanup(future.cancel)
+
+        self.assertTrue(measured.wait(5.0))
+        self.assertGreaterEqual(rtts[0], 0.0)
+        self.assertLess(rtts[0], 1.0)
+
+    def test_declares_link_stale_after_missed_pongs(self) -> None:
+        server = _SingleClientServer([], answer_pings=False)
+        self.addCleanup(server.close)
+        missed: list[int] = []
+
+        future = get_engine().submit(
+            run_websocket_connection(
+                f"ws://127.0.0.1:{server.port}/client/ws",
+                origin="https://example.test",
+                on_open=lambda: None,
+                on_message=lambda _message: None,
+                heartbeat_interval=0.02,
+                max_missed_pongs=2,
+                on_pong_missed=missed.append,
+            )
+        )
+
+        with self.assertRaises(WebSocketStale):
+            future.result(timeout=5.0)
+        self.assertEqual(missed, [1])
+        self.assertTrue(server.client_closed.wait(5.0))
+
+
+class AdaptiveReceiveBufferTests(unittest.TestCase):
+    def test_grows_on_full_reads_up_to_max(self) -> None:
+        buffer = _AdaptiveReceiveBuffer(min_size=1024, max_size=4096)
+
+        buffer.record_read(1024)
+        self.assertEqual(buffer.size, 2048)
+        buffer.record_read(2048)
+        buffer.record_read(4096)
+        self.assertEqual(buffer.size, 4096)
+
+    def test_shrinks_after_sustained_small_reads(self) -> None:
+        buffer = _AdaptiveReceiveBuffer(min_size=1024, max_size=4096)
+        buffer.record_read(1024)
+        buffer.record_read(2048)
+
+        for _ in range(64):
+            buffer.record_read(10)
+
+        self.assertEqual(buffer.size, 2048)
+
+
+class ReconnectBackoffTests(unittest.TestCase):
+    def test_doubles_until_ceiling_without_jitter(self) -> None:
+        backoff = ReconnectBackoff(1.0, 8.0, 0.0)
+
+        delays = [backoff.next_delay() for _ in range(6)]
+
+        self.assertEqual(delays, [1.0, 2.0, 4.0, 8.0, 8.0, 8.0])
+
+    def test_jitter_only_shortens_delay(self) -> None:
+        backoff = ReconnectBackoff(2.0, 30.0, 0.5, rng=lambda: 1.0)
+
+        self.assertEqual(backoff.next_delay(), 1.0)
+        backoff.reset()
+        self.assertEqual(backoff.attempt, 0)
+
+
+class ConnectionHealthTests(unittest.TestCase):
+    def test_tracks_states_and_time_to_reconnect(self) -> None:
+        now = [100.0]
+        transitions: list[str] = []
+        health = ConnectionHealth(
+            lambda new_state, _stats: transitions.append(new_state),
+            clock=lambda: now[0],
+        )
+
+        health.mark_connecting()
+        health.mark_open(stable=True)
+        health.mark_dropped()
+        health.mark_backing_off(1.5)
+        now[0] = 102.5
+        health.mark_connecting()
+        health.mark_open(stable=False)
+        health.mark_stable()
+
+        self.assertEqual(
+            transitions,
+            [
+                CONNECTION_CONNECTING,
+                CONNECTION_OPEN,
+                CONNECTION_BACKING_OFF,
+                CONNECTION_CONNECTING,
+                CONNECTION_DEGRADED,
+                CONNECTION_OPEN,
+            ],
+        )
+        stats = health.snapshot()
+        self.assertEqual(stats.reconnect_attempts, 1)
+        self.assertEqual(stats.reconnects, 1)
+        self.assertEqual(stats.last_time_to_reconnect_sec, 2.5)
+        self.assertIsNone(stats.next_retry_delay_sec)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""JSON 実装ごとの「デコード＋正規化」コストを 1 メッセージあたりで比べる。
+
+記録ファイル（BEAVER_WS_RECORD_DIR で保存したもの）を渡せば実際のトラフィックで、
+渡さなければコメント・リアクション・スタンプを混ぜた合成フレームで測る。
+
+    python -m tools.bench_json_codec
+    python -m tools.bench_json_codec recordings/ws-lecture-20260310-100000.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from services.backend_api import normalize_ws_event
+from services.json_codec import JsonCodec, available_codecs
+from services.ws_recorder import read_recording
+
+
+def _synthetic_frames(count: int) -> list[str]:
+    frames: list[str] = []
+    for index in range(count):
+        kind = index % 10
+        if kind < 6:
+            payload: dict[str, object] = {
+                "id": index,
+                "session": "bench",
+                "name": f"student-{index % 300}",
+                "realName": f"Student {index % 300}",
+                "text": "なるほど、わかりやすいです！" * 3,
+                "time": "10:00",
+                "stamp": None,
+                "stampPath": None,
+                "source": "textbox",
+                "createdAt": "2026-03-10T00:00:00Z",
+                "reactions": [{"key": "like", "count": index % 7}],
+            }
+            frames.append(json.dumps({"type": "comment.created", "payload": payload}))
+        elif kind < 9:
+            frames.append(
+                json.dumps(
+                    {
+                        "type": "comment.reactions.updated",
+                        "payload": {
+                            "session": "bench",
+                            "commentId": index - kind,
+                            "reactions": [{"key": "like", "count": index}],
+                        },
+                    }
+                )
+            )
+        else:
+            payload = {
+                "id": index,
+                "session": "bench",
+                "name": "s",
+                "realName": "s",
+                "text": "",
+                "time": "10:00",
+                "stamp": "clap",
+                "stampPath": "/stamps/clap.png",
+                "source": "stamp",
+                "createdAt": "2026-03-10T00:00:00Z",
+                "reactions": [],
+            }
+            frames.append(json.dumps({"type": "comment.created", "payload": payload}))
+    return frames
+
+
+def _measure(codec: JsonCodec, frames: list[str], rounds: int) -> float:
+    loads = codec.loads
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for frame in frames:
+            payload = loads(frame)
+            if isinstance(payload, dict):
+                normalize_ws_event(payload)
+        best = min(best, time.perf_counter() - started)
+    return best / len(frames)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", nargs="?")
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.recording:
+        _header, recorded = read_recording(args.recording)
+        frames = [message for _offset, message in recorded]
+    else:
+        frames = _synthetic_frames(args.frames)
+    if not frames:
+        raise SystemExit("no frames to measure")
+
+    results = [
+        (codec.name, _measure(codec, frames, args.rounds))
+        for codec in available_codecs()
+    ]
+    baseline = dict(results).get("stdlib")
+    print(f"frames={len(frames)} rounds={args.rounds}")
+    for name, per_message in results:
+        ratio = f" ({baseline / per_message:.2f}x stdlib)" if baseline else ""
+        print(f"{name:>8}: {per_message * 1e6:.2f} us/message{ratio}")
+
+
+if __name__ == "__main__":
+    main()
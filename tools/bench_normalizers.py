@@ -0,0 +1,150 @@
+"""ペイロード種別ごとに、正規化（検証と変換）だけのコストを 1 件あたりで測る。
+
+JSON のデコードは含まない。デコード込みの比較は tools.bench_json_codec を使う。
+
+    python -m tools.bench_normalizers
+    python -m tools.bench_normalizers --items 50000 --rounds 7
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Callable
+
+from services.backend_api import (
+    normalize_behavior_event,
+    normalize_comment_item,
+    normalize_poll_item,
+    normalize_poll_results,
+    normalize_reaction_mode,
+    normalize_ws_event,
+)
+
+
+def _comment(index: int) -> dict[str, object]:
+    return {
+        "id": index,
+        "session": "bench",
+        "name": f"student-{index % 300}",
+        "realName": f"Student {index % 300}",
+        "text": "なるほど、わかりやすいです！",
+        "time": "10:00",
+        "stamp": None,
+        "stampPath": None,
+        "source": "textbox",
+        "createdAt": "2026-03-10T00:00:00Z",
+        "reactions": [{"key": "like", "count": index % 7}],
+    }
+
+
+def _behavior_event(index: int) -> dict[str, object]:
+    return {
+        "id": index,
+        "session": "bench",
+        "actorType": "student",
+        "actorName": f"student-{index % 300}",
+        "actorRealName": f"Student {index % 300}",
+        "eventType": "tab.hidden",
+        "targetType": None,
+        "targetId": None,
+        "occurredAt": "2026-03-10T00:00:00Z",
+        "receivedAt": "2026-03-10T00:00:01Z",
+        "payload": {"visibility": "hidden"},
+    }
+
+
+def _poll(index: int) -> dict[str, object]:
+    return {
+        "id": index,
+        "session": "bench",
+        "question": "今日の内容は理解できましたか？",
+        "options": ["はい", "だいたい", "いいえ"],
+        "durationSec": 30,
+        "createdAt": "2026-03-10T00:00:00Z",
+    }
+
+
+def _poll_results(index: int) -> dict[str, object]:
+    answers = [
+        {
+            "name": f"student-{answer}",
+            "realName": f"Student {answer}",
+            "optionIndex": answer % 3,
+            "responseMs": 1200 + answer,
+            "clientElapsedMs": None,
+            "createdAt": "2026-03-10T00:00:00Z",
+        }
+        for answer in range(40)
+    ]
+    return {
+        "pollId": index,
+        "runId": 1,
+        "question": "今日の内容は理解できましたか？",
+        "options": ["はい", "だいたい", "いいえ"],
+        "durationSec": 30,
+        "startedAt": "2026-03-10T00:00:00Z",
+        "deliveredCount": 50,
+        "answerCount": 40,
+        "answerRate": 0.8,
+        "averageResponseMs": 1500.5,
+        "optionCounts": [14, 13, 13],
+        "answers": answers,
+    }
+
+
+def _reaction_mode(_index: int) -> dict[str, object]:
+    return {
+        "session": "bench",
+        "mode": "five_buttons",
+        "reactionTypes": [
+            {"key": f"r{slot}", "label": f"label {slot}", "emoji": "👍"}
+            for slot in range(5)
+        ],
+    }
+
+
+def _ws_comment(index: int) -> dict[str, object]:
+    return {"type": "comment.created", "payload": _comment(index)}
+
+
+_CASES: tuple[
+    tuple[str, Callable[[int], object], Callable[[object], object], int], ...
+] = (
+    ("comment", _comment, normalize_comment_item, 1),
+    ("ws comment.created", _ws_comment, normalize_ws_event, 1),
+    ("behavior event", _behavior_event, normalize_behavior_event, 1),
+    ("poll", _poll, normalize_poll_item, 1),
+    ("reaction mode", _reaction_mode, normalize_reaction_mode, 1),
+    # 集計は回答 40 件を含むので件数を減らす
+    ("poll results (40 answers)", _poll_results, normalize_poll_results, 20),
+)
+
+
+def _measure(
+    normalize: Callable[[object], object], items: list[object], rounds: int
+) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for item in items:
+            normalize(item)
+        best = min(best, time.perf_counter() - started)
+    return best / len(items)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"items={args.items} rounds={args.rounds}")
+    for name, build, normalize, divisor in _CASES:
+        items = [build(index) for index in range(max(1, args.items // divisor))]
+        per_item = _measure(normalize, items, args.rounds)
+        print(f"{name:>26}: {per_item * 1e6:.2f} us/item")
+
+
+if __name__ == "__main__":
+    main()
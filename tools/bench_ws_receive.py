@@ -0,0 +1,197 @@
+"""WebSocket 受信経路のベンチマーク。
+
+ローカルのサーバーからコメント相当の小フレーム群とブートストラップ相当の
+大きなフレームを送り、旧来の recv(4096) ループと ws_transport の受信経路で
+全メッセージを受け取り終えるまでの時間を比べる。
+
+    python -m tools.bench_ws_receive --frames 20000 --large-frames 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import threading
+import time
+from collections.abc import Callable
+
+from wsproto import WSConnection
+from wsproto.connection import ConnectionType
+from wsproto.events import (
+    AcceptConnection,
+    CloseConnection,
+    Request,
+    TextMessage,
+)
+
+from services.ws_transport import get_engine, run_websocket_connection
+
+
+def _comment_frame(index: int) -> str:
+    return json.dumps(
+        {
+            "type": "comment.created",
+            "payload": {
+                "id": index,
+                "session": "bench",
+                "name": f"student-{index % 300}",
+                "realName": f"Student {index % 300}",
+                "text": "なるほど、わかりやすいです！" * 3,
+                "time": "10:00",
+                "stamp": None,
+                "stampPath": None,
+                "source": "textbox",
+                "createdAt": "2026-03-10T00:00:00Z",
+                "reactions": [],
+            },
+        },
+        ensure_ascii=False,
+    )
+
+
+def build_messages(frames: int, large_frames: int, large_bytes: int) -> list[str]:
+    messages = [_comment_frame(index) for index in range(frames)]
+    filler = "x" * large_bytes
+    for index in range(large_frames):
+        messages.append(
+            json.dumps({"type": "bench.large", "payload": filler, "n": index})
+        )
+    return messages
+
+
+class _BurstServer:
+    """接続ごとにハンドシェイクを済ませ、用意したフレーム列を一気に送る。"""
+
+    def __init__(self, messages: list[str]) -> None:
+        self._messages = messages
+        self._listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self._listener.getsockname()[1]
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                conn, _addr = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn: socket.socket) -> None:
+        with conn:
+            ws = WSConnection(ConnectionType.SERVER)
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    return
+                ws.receive_data(data)
+                for event in ws.events():
+                    if isinstance(event, Request):
+                        payload = bytearray(ws.send(AcceptConnection()))
+                        for message in self._messages:
+                            payload += ws.send(TextMessage(data=message))
+                        conn.sendall(payload)
+                    elif isinstance(event, CloseConnection):
+                        return
+
+    def close(self) -> None:
+        self._listener.close()
+
+
+def run_legacy_loop(port: int, expected: int) -> tuple[float, int]:
+    """ベースラインの _run_websocket と同じ recv(4096) + join のループ。"""
+    sock = socket.create_connection(("127.0.0.1", port))
+    connection = WSConnection(ConnectionType.CLIENT)
+    started = time.perf_counter()
+    sock.sendall(connection.send(Request(host=f"127.0.0.1:{port}", target="/")))
+    message_parts: list[str] = []
+    received_count = 0
+    recv_calls = 0
+    try:
+        while received_count < expected:
+            received = sock.recv(4096)
+            recv_calls += 1
+            if not received:
+                break
+            connection.receive_data(received)
+            for event in connection.events():
+                if isinstance(event, TextMessage):
+                    message_parts.append(event.data)
+                    if event.message_finished:
+                        "".join(message_parts)
+                        message_parts.clear()
+                        received_count += 1
+    finally:
+        sock.close()
+    return time.perf_counter() - started, recv_calls
+
+
+def run_transport(port: int, expected: int) -> float:
+    done = threading.Event()
+    counter = [0]
+
+    def on_message(_message: str) -> None:
+        counter[0] += 1
+        if counter[0] >= expected:
+            done.set()
+
+    started = time.perf_counter()
+    future = get_engine().submit(
+        run_websocket_connection(
+            f"ws://127.0.0.1:{port}/",
+            origin="http://127.0.0.1",
+            on_open=lambda: None,
+            on_message=on_message,
+        )
+    )
+    done.wait(120.0)
+    elapsed = time.perf_counter() - started
+    future.cancel()
+    return elapsed
+
+
+def _best_of(repeat: int, func: Callable[[], float]) -> float:
+    return min(func() for _ in range(repeat))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--large-frames", type=int, default=5)
+    parser.add_argument("--large-bytes", type=int, default=2 * 1024 * 1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    messages = build_messages(args.frames, args.large_frames, args.large_bytes)
+    total_bytes = sum(len(message.encode("utf-8")) for message in messages)
+    server = _BurstServer(messages)
+    try:
+        legacy_recv_calls = [0]
+
+        def legacy() -> float:
+            elapsed, recv_calls = run_legacy_loop(server.port, len(messages))
+            legacy_recv_calls[0] = recv_calls
+            return elapsed
+
+        legacy_sec = _best_of(args.repeat, legacy)
+        transport_sec = _best_of(
+            args.repeat, lambda: run_transport(server.port, len(messages))
+        )
+    finally:
+        server.close()
+
+    megabytes = total_bytes / (1024 * 1024)
+    print(f"messages: {len(messages)}  payload: {megabytes:.1f} MiB")
+    print(
+        f"legacy recv(4096) loop : {legacy_sec * 1000:8.1f} ms"
+        f"  ({megabytes / legacy_sec:7.1f} MiB/s, {legacy_recv_calls[0]} recv calls)"
+    )
+    print(
+        f"ws_transport recv_into : {transport_sec * 1000:8.1f} ms"
+        f"  ({megabytes / transport_sec:7.1f} MiB/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
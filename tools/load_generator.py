@@ -0,0 +1,320 @@
+"""コメント・スタンプ・リアクションの負荷をかけ、クライアントが追従できるかを測る。
+
+スタンドインサーバー（tools.stand_in_server）を立て、本番と同じ connect_session と
+WebSocket 受信経路で接続する。画面の代わりに app.update_comments と同じ間隔で
+受信キューを取り出すスレッドを動かし、キューの深さ・取りこぼし・tick の遅れを表示する。
+Tk の描画は含まないので、実機の上限はこの結果より低くなる。
+
+    python -m tools.load_generator --duration 10 --comments 200 --stamps 1000
+    python -m tools.load_generator --comments 50 --long-token-ratio 0.5
+    python -m tools.load_generator --reactions 500 --hot-comments 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import json
+import random
+import threading
+import time
+
+from app import COMMENT_POLL_INTERVAL_MS
+from services import backend_api, events
+from services.metrics import LatencyHistogram
+from state import app_state as state
+from tools.stand_in_server import StandInServer
+from ui.comment_ui import comment_entry_from_message, insert_soft_wraps
+from ui.overlay import annotate_entry, is_stamp
+
+_SESSION = "load"
+_STEP_SEC = 0.01
+_STAMP_PATHS = tuple(f"/stamps/load-{index}.png" for index in range(8))
+
+
+@dataclasses.dataclass(slots=True)
+class LoadProfile:
+    duration_sec: float = 10.0
+    comments_per_sec: float = 200.0
+    stamps_per_sec: float = 0.0
+    reactions_per_sec: float = 0.0
+    hot_comments: int = 5
+    long_token_ratio: float = 0.0
+    long_token_length: int = 400
+
+
+@dataclasses.dataclass(slots=True)
+class LoadReport:
+    sent: dict[str, int]
+    received_frames: int
+    consumed_comments: int
+    consumed_stamps: int
+    max_queue_depth: int
+    final_queue_depth: int
+    dropped_texts: int
+    dropped_stamps: int
+    merged_stamps: int
+    tick_lateness_p95_ms: float | None
+    tick_lateness_max_ms: float | None
+    tick_work_p95_ms: float | None
+    queue_latency_p95_ms: float | None
+    total_latency_p95_ms: float | None
+
+    @property
+    def dropped_frames(self) -> int:
+        return max(0, sum(self.sent.values()) - self.received_frames)
+
+    def keeps_up(self, tick_interval_ms: float) -> bool:
+        lateness = self.tick_lateness_p95_ms
+        return (
+            self.dropped_frames == 0
+            and self.final_queue_depth == 0
+            and (lateness is None or lateness < tick_interval_ms)
+        )
+
+
+class _Consumer:
+    """app.update_comments と同じ処理を一定間隔で回し、tick の遅れを測る。"""
+
+    def __init__(self, interval_sec: float) -> None:
+        self._interval = interval_sec
+        self._stop = threading.Event()
+        self.lateness = LatencyHistogram()
+        self.work = LatencyHistogram()
+        self.max_depth = 0
+        self.comments = 0
+        self.stamps = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        scheduled = time.perf_counter()
+        while not self._stop.is_set():
+            started = time.perf_counter()
+            self.lateness.record(max(0.0, started - scheduled))
+            self.max_depth = max(self.max_depth, state.message_queue.qsize())
+            self._drain()
+            finished = time.perf_counter()
+            self.work.record(finished - started)
+            # root.after と同じく、処理が終わってから次の間隔を数える
+            scheduled = finished + self._interval
+            self._stop.wait(self._interval)
+
+    def _drain(self) -> None:
+        while not state.message_queue.empty():
+            entry = annotate_entry(state.message_queue.get_nowait())
+            if is_stamp(entry):
+                if isinstance(entry.get("id"), int):
+                    events.message_latency.discard(entry["id"])
+                self.stamps += 1
+                continue
+            comment_entry = comment_entry_from_message(entry)
+            if comment_entry is None:
+                continue
+            events.message_latency.mark(comment_entry.id, "dequeued")
+            insert_soft_wraps(comment_entry.text)
+            state.append_message(comment_entry)
+            # 描画の代わりに処理し終えた時点を描画完了とみなす
+            events.message_latency.mark_drawn([comment_entry.id])
+            self.comments += 1
+
+
+def _comment_text(rng: random.Random, profile: LoadProfile) -> str:
+    if rng.random() < profile.long_token_ratio:
+        return "w" * profile.long_token_length
+    return "なるほど、わかりやすいです！"
+
+
+def _generate(
+    server: StandInServer, profile: LoadProfile, rng: random.Random
+) -> dict[str, int]:
+    sent = {"comments": 0, "stamps": 0, "reactions": 0}
+    hot_ids: list[int] = []
+    reaction_counts: dict[int, int] = {}
+    started = time.perf_counter()
+    while True:
+        elapsed = min(time.perf_counter() - started, profile.duration_sec)
+        messages: list[str] = []
+        due_comments = int(elapsed * profile.comments_per_sec) - sent["comments"]
+        for _ in range(due_comments):
+            comment = server.add_comment(
+                _SESSION, _comment_text(rng, profile), broadcast=False
+            )
+            messages.append(_encode("comment.created", comment))
+            if len(hot_ids) < profile.hot_comments:
+                hot_ids.append(int(comment["id"]))
+        sent["comments"] += max(0, due_comments)
+
+        due_stamps = int(elapsed * profile.stamps_per_sec) - sent["stamps"]
+        for _ in range(due_stamps):
+            path = rng.choice(_STAMP_PATHS)
+            stamp = server.add_comment(
+                _SESSION, "", stamp=path, stamp_path=path, broadcast=False
+            )
+            messages.append(_encode("comment.created", stamp))
+        sent["stamps"] += max(0, due_stamps)
+
+        due_reactions = int(elapsed * profile.reactions_per_sec) - sent["reactions"]
+        if hot_ids:
+            for _ in range(due_reactions):
+                comment_id = rng.choice(hot_ids)
+                reaction_counts[comment_id] = reaction_counts.get(comment_id, 0) + 1
+                messages.append(
+                    _encode(
+                        "comment.reactions.updated",
+                        {
+                            "session": _SESSION,
+                            "commentId": comment_id,
+                            "reactions": [
+                                {"key": "like", "count": reaction_counts[comment_id]}
+                            ],
+                        },
+                    )
+                )
+            sent["reactions"] += max(0, due_reactions)
+
+        server.emit_raw(_SESSION, *messages)
+        if elapsed >= profile.duration_sec:
+            return sent
+        time.sleep(_STEP_SEC)
+
+
+def _encode(event_type: str, payload: object) -> str:
+    return json.dumps({"type": event_type, "payload": payload}, ensure_ascii=False)
+
+
+def run_load(profile: LoadProfile, *, seed: int = 0) -> LoadReport:
+    server = StandInServer().start()
+    original_urls = (
+        backend_api.BACKEND_BASE_URL,
+        backend_api.BACKEND_CLIENT_WS_BASE_URL,
+    )
+    backend_api.BACKEND_BASE_URL = server.base_url
+    backend_api.BACKEND_CLIENT_WS_BASE_URL = server.ws_base_url
+
+    received = [0]
+    dispatch = events._dispatch_ws_message
+
+    def counting_dispatch(
+        message: str, session: str, received_at: float | None = None
+    ) -> None:
+        received[0] += 1
+        dispatch(message, session, received_at)
+
+    events._dispatch_ws_message = counting_dispatch
+    events.message_latency.reset()
+    consumer = _Consumer(COMMENT_POLL_INTERVAL_MS / 1000.0)
+    try:
+        events.connect_session(_SESSION)
+        if not server.wait_for_clients(1, _SESSION, timeout=10.0):
+            raise RuntimeError("client did not connect to the stand-in server")
+        consumer.start()
+        sent = _generate(server, profile, random.Random(seed))
+
+        # 送り終えた分を受け取り切るまで少し待つ
+        expected = sum(sent.values())
+        deadline = time.monotonic() + 5.0
+        while received[0] < expected and time.monotonic() < deadline:
+            time.sleep(0.05)
+        time.sleep(COMMENT_POLL_INTERVAL_MS / 1000.0 * 2)
+        consumer.stop()
+    finally:
+        events.disconnect_session(show_status=False)
+        events._dispatch_ws_message = dispatch
+        backend_api.BACKEND_BASE_URL, backend_api.BACKEND_CLIENT_WS_BASE_URL = (
+            original_urls
+        )
+        server.stop()
+
+    ingest = state.message_queue.stats()
+    lateness = consumer.lateness.snapshot()
+    work = consumer.work.snapshot()
+    segments = events.message_latency.snapshot()
+    return LoadReport(
+        sent=sent,
+        received_frames=received[0],
+        consumed_comments=consumer.comments,
+        consumed_stamps=consumer.stamps,
+        max_queue_depth=consumer.max_depth,
+        final_queue_depth=ingest.text_depth + ingest.stamp_depth,
+        dropped_texts=ingest.dropped_texts,
+        dropped_stamps=ingest.dropped_stamps,
+        merged_stamps=ingest.merged_stamps,
+        tick_lateness_p95_ms=lateness.p95_ms,
+        tick_lateness_max_ms=lateness.max_ms,
+        tick_work_p95_ms=work.p95_ms,
+        queue_latency_p95_ms=segments["queue"].p95_ms,
+        total_latency_p95_ms=segments["total"].p95_ms,
+    )
+
+
+def _format_ms(value: float | None) -> str:
+    return "-" if value is None else f"{value:.1f}ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--comments", type=float, default=200.0, help="コメント/秒")
+    parser.add_argument("--stamps", type=float, default=0.0, help="スタンプ/秒")
+    parser.add_argument(
+        "--reactions", type=float, default=0.0, help="リアクション更新/秒"
+    )
+    parser.add_argument("--hot-comments", type=int, default=5)
+    parser.add_argument(
+        "--long-token-ratio",
+        type=float,
+        default=0.0,
+        help="改行なしの長いトークンにするコメントの割合",
+    )
+    parser.add_argument("--long-token-length", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    profile = LoadProfile(
+        duration_sec=args.duration,
+        comments_per_sec=args.comments,
+        stamps_per_sec=args.stamps,
+        reactions_per_sec=args.reactions,
+        hot_comments=args.hot_comments,
+        long_token_ratio=args.long_token_ratio,
+        long_token_length=args.long_token_length,
+    )
+    report = run_load(profile, seed=args.seed)
+    print(
+        "sent "
+        + " ".join(f"{key}={value}" for key, value in report.sent.items())
+        + f" received_frames={report.received_frames}"
+        + f" dropped_frames={report.dropped_frames}"
+    )
+    print(
+        f"consumed comments={report.consumed_comments} stamps={report.consumed_stamps}"
+    )
+    print(
+        f"queue max_depth={report.max_queue_depth} final={report.final_queue_depth}"
+        f" dropped_texts={report.dropped_texts} dropped_stamps={report.dropped_stamps}"
+        f" merged_stamps={report.merged_stamps}"
+    )
+    print(
+        f"tick lateness p95={_format_ms(report.tick_lateness_p95_ms)}"
+        f" max={_format_ms(report.tick_lateness_max_ms)}"
+        f" work p95={_format_ms(report.tick_work_p95_ms)}"
+    )
+    print(
+        f"comment latency p95 queue={_format_ms(report.queue_latency_p95_ms)}"
+        f" receive-to-processed={_format_ms(report.total_latency_p95_ms)}"
+    )
+    verdict = (
+        "keeps up" if report.keeps_up(COMMENT_POLL_INTERVAL_MS) else "falls behind"
+    )
+    print(f"result: {verdict}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""記録した WebSocket セッションを画面なしで再生する。
+
+BEAVER_WS_RECORD_DIR を設定して接続すると記録が残る。その記録を本番と同じ
+受信処理（_dispatch_ws_message）へ流し、処理時間と受信キューの状態を表示する。
+画面つきで再生したい場合は BEAVER_WS_REPLAY にパスを設定してアプリを起動する。
+
+    python -m tools.replay_session recordings/ws-lecture-20260310-100000.jsonl --speed 0
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from services import events
+from services.ws_recorder import read_recording, replay_frames
+from state import app_state as state
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0.0,
+        help="再生倍率。0 以下なら待たずに流す（既定: 0）",
+    )
+    args = parser.parse_args()
+
+    header, frames = read_recording(args.path)
+    session = str(header.get("session") or "default")
+    state.CURRENT_SESSION = session
+    duration = frames[-1][0] if frames else 0.0
+    print(f"session={session} frames={len(frames)} recorded={duration:.1f}s")
+
+    max_depth = 0
+
+    def dispatch(message: str) -> None:
+        nonlocal max_depth
+        events._dispatch_ws_message(message, session)
+        max_depth = max(max_depth, state.message_queue.qsize())
+
+    started = time.perf_counter()
+    replayed = replay_frames(frames, dispatch, speed=args.speed)
+    events._reaction_coalescer.flush()
+    elapsed = time.perf_counter() - started
+
+    stats = state.message_queue.stats()
+    rate = replayed / elapsed if elapsed > 0 else float("inf")
+    print(f"replayed={replayed} elapsed={elapsed * 1000:.0f}ms ({rate:.0f} frames/s)")
+    print(
+        f"queue max_depth={max_depth} text={stats.text_depth} stamp={stats.stamp_depth}"
+        f" dropped_texts={stats.dropped_texts} dropped_stamps={stats.dropped_stamps}"
+        f" merged_stamps={stats.merged_stamps}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,743 @@
+"""BEAVER-server の代わりに動くローカルサーバー。
+
+クライアントが使う /api/client/bootstrap、/api/reaction-mode、/api/client/polls*、
+/api/client/poll-results*、/api/client/behavior-events と /client/ws を実装する。
+ネットワークのない環境でのベンチマークや結合テストに使う。イベントは
+add_comment / update_reactions などのメソッドか run_script で送り出せる。
+
+    python -m tools.stand_in_server --port 8787 --comments 200
+    BACKEND_BASE_URL=http://127.0.0.1:8787 python main.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+from urllib.parse import parse_qs, urlsplit
+
+import h11
+from wsproto import WSConnection
+from wsproto.connection import ConnectionType
+from wsproto.events import (
+    AcceptConnection,
+    CloseConnection,
+    Ping,
+    RejectConnection,
+    Request,
+    TextMessage,
+)
+from wsproto.extensions import PerMessageDeflate
+from wsproto.utilities import LocalProtocolError
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+DEFAULT_REACTION_TYPES: list[dict[str, str]] = [
+    {"key": "like", "label": "いいね", "emoji": "👍"},
+]
+
+_WS_PATH = "/client/ws"
+_READ_CHUNK = 64 * 1024
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _header(request: h11.Request, name: bytes) -> bytes | None:
+    for key, value in request.headers:
+        if key == name:
+            return value
+    return None
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _first(query: Mapping[str, list[str]], key: str) -> str | None:
+    values = query.get(key)
+    return values[0] if values else None
+
+
+class _WebSocketClient:
+    def __init__(
+        self, session: str, ws: WSConnection, writer: asyncio.StreamWriter
+    ) -> None:
+        self.session = session
+        self.ws = ws
+        self.writer = writer
+
+    def send_text(self, text: str) -> None:
+        self.writer.write(self.ws.send(TextMessage(data=text)))
+
+
+class StandInServer:
+    """別スレッドのイベントループで動くスタンドインサーバー。
+
+    状態はすべてメモリ上に持つ。公開メソッドはどのスレッドから呼んでもよく、
+    ブロードキャストは接続中のクライアントへ書き込み終えてから戻る。
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        accept_deflate: bool = True,
+    ) -> None:
+        self._host = host
+        self._port = port
+        self._accept_deflate = accept_deflate
+        self._lock = threading.Lock()
+        self._comments: dict[str, list[dict[str, object]]] = {}
+        self._reaction_modes: dict[str, dict[str, object]] = {}
+        self._polls: dict[int, dict[str, object]] = {}
+        self._poll_results: dict[int, dict[str, object]] = {}
+        self._behavior_events: list[dict[str, object]] = []
+        self._next_comment_id = 1
+        self._next_poll_id = 1
+        self._next_run_id = 1
+        self._next_behavior_id = 1
+        self._clients: list[_WebSocketClient] = []
+        self._connection_tasks: set[asyncio.Task[object]] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._thread: threading.Thread | None = None
+        self._ready = threading.Event()
+        self.http_requests = 0
+        self.http_connections = 0
+        self.not_modified_responses = 0
+        # 次の N 件の POST に 503 を返す。回線断や障害の再現に使う
+        self.fail_next_posts = 0
+        self.replayed_requests = 0
+        self._idempotent_responses: dict[str, tuple[int, object]] = {}
+
+    # --- 起動と停止 ---
+
+    def start(self) -> Self:
+        self._thread = threading.Thread(
+            target=self._run, name="beaver-stand-in", daemon=True
+        )
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=5.0)
+        loop.call_soon_threadsafe(loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        self._loop = None
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, *_exc: object) -> None:
+        self.stop()
+
+    @property
+    def port(self) -> int:
+        return self._port
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self._host}:{self._port}"
+
+    @property
+    def ws_base_url(self) -> str:
+        return f"ws://{self._host}:{self._port}{_WS_PATH}"
+
+    def client_count(self, session: str | None = None) -> int:
+        with self._lock:
+            return sum(
+                1
+                for client in self._clients
+                if session is None or client.session == session
+            )
+
+    def wait_for_clients(
+        self, count: int, session: str | None = None, timeout: float = 5.0
+    ) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.client_count(session) >= count:
+                return True
+            time.sleep(0.01)
+        return False
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._server = loop.run_until_complete(
+            asyncio.start_server(self._handle_connection, self._host, self._port)
+        )
+        self._port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _shutdown(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        with self._lock:
+            clients = list(self._clients)
+            self._clients.clear()
+        for client in clients:
+            client.writer.close()
+        # keep-alive のまま待っている HTTP 接続も片付けてからループを止める
+        tasks = [task for task in self._connection_tasks if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # --- 状態の操作とイベント送出 ---
+
+    def add_comment(
+        self,
+        session: str = "default",
+        text: str = "",
+        *,
+        name: str = "student",
+        real_name: str | None = None,
+        stamp: str | None = None,
+        stamp_path: str | None = None,
+        source: str | None = "textbox",
+        broadcast: bool = True,
+    ) -> dict[str, object]:
+        with self._lock:
+            comment_id = self._next_comment_id
+            self._next_comment_id += 1
+            comment: dict[str, object] = {
+                "id": comment_id,
+                "session": session,
+                "name": name,
+                "realName": real_name if real_name is not None else name,
+                "text": text,
+                "time": datetime.now().strftime("%H:%M"),
+                "stamp": stamp,
+                "stampPath": stamp_path,
+                "source": source,
+                "createdAt": _now_iso(),
+                "reactions": [],
+            }
+            self._comments.setdefault(session, []).append(comment)
+        if broadcast:
+            self.emit(session, "comment.created", comment)
+        return comment
+
+    def update_reactions(self, session: str, comment_id: int, count: int) -> None:
+        reactions = [{"key": "like", "count": count}] if count > 0 else []
+        with self._lock:
+            for comment in self._comments.get(session, []):
+                if comment["id"] == comment_id:
+                    comment["reactions"] = reactions
+                    break
+        self.emit(
+            session,
+            "comment.reactions.updated",
+            {"session": session, "commentId": comment_id, "reactions": reactions},
+        )
+
+    def set_reaction_mode(self, session: str, mode: str) -> dict[str, object]:
+        reaction_mode: dict[str, object] = {
+            "session": session,
+            "mode": mode,
+            "reactionTypes": list(DEFAULT_REACTION_TYPES),
+        }
+        with self._lock:
+            self._reaction_modes[session] = reaction_mode
+        self.emit(session, "reaction.mode.updated", reaction_mode)
+        return reaction_mode
+
+    def add_behavior_event(
+        self,
+        session: str,
+        event_type: str,
+        *,
+        actor_name: str = "student",
+        actor_real_name: str | None = None,
+        payload: Mapping[str, object] | None = None,
+    ) -> dict[str, object]:
+        with self._lock:
+            event: dict[str, object] = {
+                "id": self._next_behavior_id,
+                "session": session,
+                "actorType": "student",
+                "actorName": actor_name,
+                "actorRealName": actor_real_name
+                if actor_real_name is not None
+                else actor_name,
+                "eventType": event_type,
+                "targetType": None,
+                "targetId": None,
+                "occurredAt": _now_iso(),
+                "receivedAt": _now_iso(),
+                "payload": dict(payload or {}),
+            }
+            self._next_behavior_id += 1
+            self._behavior_events.append(event)
+        self.emit(
+            session, "behavior.event.created", {"session": session, "event": event}
+        )
+        return event
+
+    def emit(self, session: str, event_type: str, payload: Mapping[str, object]) -> int:
+        """session を購読中のクライアントへイベントを送る。送った接続数を返す。"""
+        message = json.dumps(
+            {"type": event_type, "payload": payload}, ensure_ascii=False
+        )
+        return self.emit_raw(session, message)
+
+    def emit_raw(self, session: str, *messages: str) -> int:
+        """エンコード済みのメッセージをまとめて送る。負荷試験では 1 回で複数送る。"""
+        loop = self._loop
+        if loop is None or not messages:
+            return 0
+        if _running_loop() is loop:
+            # HTTP の処理中（ループ上）から呼ばれたときは待つと詰まるので、送信を予約する
+            task = loop.create_task(self._broadcast(session, messages))
+            self._connection_tasks.add(task)
+            task.add_done_callback(self._connection_tasks.discard)
+            with self._lock:
+                return self._client_count_locked(session)
+        return asyncio.run_coroutine_threadsafe(
+            self._broadcast(session, messages), loop
+        ).result(timeout=5.0)
+
+    def run_script(
+        self, steps: Iterable[tuple[float, str, str, Mapping[str, object]]]
+    ) -> None:
+        """(直前からの待ち秒数, セッション, イベント種別, ペイロード) を順に送る。"""
+        for delay, session, event_type, payload in steps:
+            if delay > 0:
+                time.sleep(delay)
+            self.emit(session, event_type, payload)
+
+    async def _broadcast(self, session: str, messages: Iterable[str]) -> int:
+        with self._lock:
+            targets = [client for client in self._clients if client.session == session]
+        for client in targets:
+            try:
+                for message in messages:
+                    client.send_text(message)
+            except (OSError, LocalProtocolError):
+                # 切断済み（閉じたソケットや閉じた WebSocket）のクライアントは外す
+                self._drop_client(client)
+        for client in targets:
+            try:
+                await client.writer.drain()
+            except OSError:
+                self._drop_client(client)
+        return len(targets)
+
+    def _drop_client(self, client: _WebSocketClient) -> None:
+        with self._lock:
+            if client in self._clients:
+                self._clients.remove(client)
+
+    # --- 接続処理 ---
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        task = asyncio.current_task()
+        if task is not None:
+            self._connection_tasks.add(task)
+            task.add_done_callback(self._connection_tasks.discard)
+        # stop() は接続のタスクを取り消す。取り消しを外へ出すと asyncio が
+        # コールバックの例外として記録するので、ここで閉じて終える
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (
+            asyncio.CancelledError,
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+            ConnectionError,
+        ):
+            writer.close()
+            return
+        request_line = head.split(b"\r\n", 1)[0].decode("latin-1")
+        parts = request_line.split(" ")
+        target = parts[1] if len(parts) >= 2 else "/"
+        try:
+            if urlsplit(target).path == _WS_PATH:
+                await self._serve_websocket(head, reader, writer)
+            else:
+                await self._serve_http(head, reader, writer)
+        except (asyncio.CancelledError, ConnectionError, h11.ProtocolError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_websocket(
+        self,
+        head: bytes,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        ws = WSConnection(ConnectionType.SERVER)
+        ws.receive_data(head)
+        client: _WebSocketClient | None = None
+        try:
+            while True:
+                for event in ws.events():
+                    if isinstance(event, Request):
+                        query = parse_qs(urlsplit(event.target).query)
+                        session = _first(query, "session") or "default"
+                        extensions = []
+                        if self._accept_deflate and any(
+                            str(offer).startswith(PerMessageDeflate.name)
+                            for offer in event.extensions
+                        ):
+                            extensions.append(PerMessageDeflate())
+                        writer.write(ws.send(AcceptConnection(extensions=extensions)))
+                        await writer.drain()
+                        client = _WebSocketClient(session, ws, writer)
+                        with self._lock:
+                            self._clients.append(client)
+                    elif isinstance(event, Ping):
+                        writer.write(ws.send(event.response()))
+                    elif isinstance(event, CloseConnection):
+                        writer.write(ws.send(event.response()))
+                        await writer.drain()
+                        return
+                    elif isinstance(event, RejectConnection):
+                        return
+                data = await reader.read(_READ_CHUNK)
+                if not data:
+                    return
+                ws.receive_data(data)
+        finally:
+            if client is not None:
+                self._drop_client(client)
+
+    async def _serve_http(
+        self,
+        head: bytes,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        self.http_connections += 1
+        conn = h11.Connection(h11.SERVER)
+        conn.receive_data(head)
+        request: h11.Request | None = None
+        body = bytearray()
+        while True:
+            event = conn.next_event()
+            if event is h11.NEED_DATA:
+                conn.receive_data(await reader.read(_READ_CHUNK))
+                continue
+            if isinstance(event, h11.Request):
+                request = event
+                body.clear()
+            elif isinstance(event, h11.Data):
+                body.extend(event.data)
+            elif isinstance(event, h11.EndOfMessage) and request is not None:
+                status, payload = self._handle_http(
+                    request.method.decode("ascii"),
+                    request.target.decode("latin-1"),
+                    bytes(body),
+                )
+                encoded = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                headers = [("Content-Type", "application/json; charset=utf-8")]
+                if request.method == b"GET" and status == 200:
+                    # 本番と同じく読み出し系は ETag を付け、一致すれば 304 で本文を省く
+                    etag = f'"{hashlib.sha1(encoded).hexdigest()}"'
+                    headers.append(("ETag", etag))
+                    if _header(request, b"if-none-match") == etag.encode("ascii"):
+                        status = 304
+                        encoded = b""
+                        self.not_modified_responses += 1
+                headers.append(("Content-Length", str(len(encoded))))
+                writer.write(
+                    conn.send(h11.Response(status_code=status, headers=headers))
+                )
+                if encoded:
+                    writer.write(conn.send(h11.Data(data=encoded)))
+                writer.write(conn.send(h11.EndOfMessage()))
+                await writer.drain()
+                if conn.our_state is not h11.DONE or conn.their_state is not h11.DONE:
+                    return
+                conn.start_next_cycle()
+                request = None
+            elif isinstance(event, h11.ConnectionClosed) or event is h11.PAUSED:
+                return
+
+    # --- HTTP エンドポイント ---
+
+    def _handle_http(self, method: str, target: str, body: bytes) -> tuple[int, object]:
+        self.http_requests += 1
+        split = urlsplit(target)
+        query = parse_qs(split.query)
+        route = (method, split.path)
+        try:
+            data = json.loads(body) if body else {}
+        except json.JSONDecodeError:
+            return 400, {"error": "invalid json"}
+        if not isinstance(data, dict):
+            return 400, {"error": "invalid json"}
+        if method != "POST":
+            return self._route_http(route, query, data)
+
+        with self._lock:
+            if self.fail_next_posts > 0:
+                self.fail_next_posts -= 1
+                return 503, {"error": "service unavailable"}
+        # 同じ requestId の再送には、操作をやり直さず前回の応答を返す
+        request_id = data.get("requestId")
+        if not isinstance(request_id, str):
+            return self._route_http(route, query, data)
+        with self._lock:
+            previous = self._idempotent_responses.get(request_id)
+            if previous is not None:
+                self.replayed_requests += 1
+                return previous
+        status, payload = self._route_http(route, query, data)
+        with self._lock:
+            self._idempotent_responses[request_id] = (status, payload)
+        return status, payload
+
+    def _route_http(
+        self,
+        route: tuple[str, str],
+        query: Mapping[str, list[str]],
+        data: Mapping[str, object],
+    ) -> tuple[int, object]:
+        if route == ("GET", "/api/client/bootstrap"):
+            return self._bootstrap(query)
+        if route == ("GET", "/api/reaction-mode"):
+            session = _first(query, "session") or "default"
+            return 200, self._reaction_mode(session)
+        if route == ("POST", "/api/client/reaction-mode"):
+            mode = data.get("mode")
+            if not isinstance(mode, str):
+                return 400, {"error": "mode is required"}
+            return 200, self.set_reaction_mode(
+                str(data.get("session") or "default"), mode
+            )
+        if route == ("GET", "/api/client/polls"):
+            session = _first(query, "session") or "default"
+            with self._lock:
+                return 200, [p for p in self._polls.values() if p["session"] == session]
+        if route == ("POST", "/api/client/polls"):
+            return self._create_poll(data)
+        if route == ("POST", "/api/client/polls/start"):
+            return self._start_poll(data)
+        if route == ("GET", "/api/client/poll-results"):
+            return self._get_poll_results(query)
+        if route == ("POST", "/api/client/poll-results/display"):
+            return self._display_poll_results(data)
+        if route == ("GET", "/api/client/behavior-events"):
+            return 200, self._list_behavior_events(query)
+        if route == ("POST", "/api/client/sakura-comments"):
+            comment = self.add_comment(
+                str(data.get("session") or "default"),
+                str(data.get("text") or ""),
+                name=str(data.get("displayName") or "sakura"),
+                source="sakura",
+            )
+            return 201, comment
+        return 404, {"error": f"not found: {route[0]} {route[1]}"}
+
+    def _bootstrap(self, query: Mapping[str, list[str]]) -> tuple[int, object]:
+        session = _first(query, "session") or "default"
+        cursors: dict[str, int | None] = {}
+        for name in ("afterId", "beforeId", "limit"):
+            text = _first(query, name)
+            try:
+                cursors[name] = int(text) if text is not None else None
+            except ValueError:
+                return 400, {"error": f"{name} is invalid"}
+        with self._lock:
+            comments = list(self._comments.get(session, []))
+        if cursors["afterId"] is not None:
+            comments = [c for c in comments if c["id"] > cursors["afterId"]]
+        if cursors["beforeId"] is not None:
+            comments = [c for c in comments if c["id"] < cursors["beforeId"]]
+        has_more = False
+        limit = cursors["limit"]
+        if limit is not None and limit > 0 and len(comments) > limit:
+            # ページ指定のときは新しい側から limit 件を古い順で返す
+            comments = comments[-limit:]
+            has_more = True
+        return 200, {"session": session, "messages": comments, "hasMore": has_more}
+
+    def _reaction_mode(self, session: str) -> dict[str, object]:
+        with self._lock:
+            mode = self._reaction_modes.get(session)
+        if mode is not None:
+            return mode
+        return {
+            "session": session,
+            "mode": "bookmark",
+            "reactionTypes": list(DEFAULT_REACTION_TYPES),
+        }
+
+    def _create_poll(self, data: Mapping[str, object]) -> tuple[int, object]:
+        question = data.get("question")
+        options = data.get("options")
+        duration = data.get("durationSec")
+        if not isinstance(question, str) or not isinstance(options, list):
+            return 400, {"error": "question and options are required"}
+        with self._lock:
+            poll: dict[str, object] = {
+                "id": self._next_poll_id,
+                "session": str(data.get("session") or "default"),
+                "question": question,
+                "options": [str(option) for option in options],
+                "durationSec": duration if isinstance(duration, int) else 30,
+                "createdAt": _now_iso(),
+            }
+            self._next_poll_id += 1
+            self._polls[int(poll["id"])] = poll
+        return 201, poll
+
+    def _start_poll(self, data: Mapping[str, object]) -> tuple[int, object]:
+        poll_id = data.get("pollId")
+        with self._lock:
+            poll = self._polls.get(poll_id) if isinstance(poll_id, int) else None
+            if poll is None:
+                return 404, {"error": "poll not found"}
+            run_id = self._next_run_id
+            self._next_run_id += 1
+            started_at = _now_iso()
+            options = list(poll["options"])  # type: ignore[arg-type]
+            self._poll_results[int(poll["id"])] = {
+                "pollId": poll["id"],
+                "runId": run_id,
+                "question": poll["question"],
+                "options": options,
+                "durationSec": poll["durationSec"],
+                "startedAt": started_at,
+                "deliveredCount": self._client_count_locked(str(poll["session"])),
+                "answerCount": 0,
+                "answerRate": 0.0,
+                "averageResponseMs": None,
+                "optionCounts": [0] * len(options),
+                "answers": [],
+            }
+        return 200, {
+            "pollId": poll["id"],
+            "runId": run_id,
+            "session": poll["session"],
+            "question": poll["question"],
+            "options": options,
+            "durationSec": poll["durationSec"],
+            "startedAt": started_at,
+        }
+
+    def _client_count_locked(self, session: str) -> int:
+        return sum(1 for client in self._clients if client.session == session)
+
+    def _get_poll_results(self, query: Mapping[str, list[str]]) -> tuple[int, object]:
+        try:
+            poll_id = int(_first(query, "pollId") or "")
+        except ValueError:
+            return 400, {"error": "pollId is invalid"}
+        with self._lock:
+            results = self._poll_results.get(poll_id)
+        if results is None:
+            return 404, {"error": "poll results not found"}
+        return 200, results
+
+    def _display_poll_results(self, data: Mapping[str, object]) -> tuple[int, object]:
+        session = str(data.get("session") or "default")
+        target = str(data.get("target") or "none")
+        poll_id = data.get("pollId")
+        with self._lock:
+            results = (
+                self._poll_results.get(poll_id) if isinstance(poll_id, int) else None
+            )
+        if results is None:
+            return 404, {"error": "poll results not found"}
+        if target == "none":
+            self.emit(
+                session,
+                "poll.results.hidden",
+                {"session": session, "target": target},
+            )
+        else:
+            self.emit(
+                session,
+                "poll.results.displayed",
+                {"session": session, "target": target, "results": results},
+            )
+        return 200, {"ok": True, "session": session, "target": target}
+
+    def _list_behavior_events(
+        self, query: Mapping[str, list[str]]
+    ) -> list[dict[str, object]]:
+        session = _first(query, "session") or "default"
+        event_type = _first(query, "eventType")
+        actor = _first(query, "actorRealName")
+        cursors: dict[str, int | None] = {}
+        for name in ("limit", "afterId", "beforeId"):
+            text = _first(query, name)
+            try:
+                cursors[name] = int(text) if text is not None else None
+            except ValueError:
+                cursors[name] = None
+        limit = max(0, cursors["limit"] if cursors["limit"] is not None else 100)
+        after_id = cursors["afterId"]
+        before_id = cursors["beforeId"]
+        with self._lock:
+            events = [
+                event
+                for event in self._behavior_events
+                if event["session"] == session
+                and (event_type is None or event["eventType"] == event_type)
+                and (actor is None or event["actorRealName"] == actor)
+                and (after_id is None or int(event["id"]) > after_id)  # type: ignore[call-overload]
+                and (before_id is None or int(event["id"]) < before_id)  # type: ignore[call-overload]
+            ]
+        # afterId 指定のときは古い側から limit 件。どちらも新しい順に返す
+        if after_id is not None:
+            events = events[:limit]
+        else:
+            events = events[-limit:] if limit else []
+        return list(reversed(events))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--session", default="default")
+    parser.add_argument(
+        "--comments", type=int, default=0, help="起動時に用意する履歴コメント数"
+    )
+    args = parser.parse_args()
+
+    server = StandInServer(args.host, args.port).start()
+    for index in range(args.comments):
+        server.add_comment(args.session, f"履歴コメント {index + 1}", broadcast=False)
+    print(f"listening on {server.base_url}")
+    print(f"  BACKEND_BASE_URL={server.base_url} python main.py")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
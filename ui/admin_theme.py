@@ -72,6 +72,8 @@ def get_badge_palette(label: str) -> BadgePalette:
         "接続中…": BadgePalette(foreground="#9a3412", background="#ffedd5"),
         "接続済み": BadgePalette(foreground="#047857", background="#d1fae5"),
         "再接続中…": BadgePalette(foreground="#1d4ed8", background="#dbeafe"),
+        "再接続待ち…": BadgePalette(foreground="#1d4ed8", background="#dbeafe"),
+        "接続不安定": BadgePalette(foreground="#a16207", background="#fef9c3"),
         "接続失敗": BadgePalette(foreground="#b91c1c", background="#fee2e2"),
     }
     return palette.get(label, BadgePalette(foreground=TITLE_COLOR, background="#e2e8f0"))
@@ -0,0 +1,235 @@
+"""画面操作から始める通信処理を、共有のスレッドプールで動かす。
+
+結果は Tk のメインスレッドで呼び出し元に返す。ワーカーから after を呼ばず、
+いったんキューへ積んでルートウィンドウの after ループで取り出す。after ループは
+処理か結果が残っている間だけ回す。
+同じキーの処理が実行中なら新しく投げずに相乗りし、連打しても HTTP は 1 回で済む。
+ウィンドウが閉じられたら、まだ始まっていない処理は取り消し、結果も捨てる。
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import queue
+import sys
+import threading
+import tkinter as tk
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from config.constants import UI_TASK_DISPATCH_INTERVAL_MS, UI_TASK_MAX_WORKERS
+
+_logger = logging.getLogger(__name__)
+
+
+class _Subscriber:
+    __slots__ = ("on_error", "on_success", "owner")
+
+    def __init__(
+        self,
+        owner: tk.Misc,
+        on_success: Callable[[Any], None] | None,
+        on_error: Callable[[Exception], None] | None,
+    ) -> None:
+        self.owner = owner
+        self.on_success = on_success
+        self.on_error = on_error
+
+
+class _Flight:
+    __slots__ = ("future", "subscribers")
+
+    def __init__(self) -> None:
+        self.future: concurrent.futures.Future[Any] | None = None
+        self.subscribers: list[_Subscriber] = []
+
+
+class BackgroundTasks:
+    def __init__(self, max_workers: int = UI_TASK_MAX_WORKERS) -> None:
+        self._max_workers = max_workers
+        self._executor: concurrent.futures.ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, _Flight] = {}
+        self._bound_owners: set[int] = set()
+        self._results: queue.SimpleQueue[Callable[[], None]] = queue.SimpleQueue()
+        self._root: tk.Tk | None = None
+        # after ループが予約済みかどうか。メインスレッドからだけ触る
+        self._dispatch_scheduled = False
+        self._next_anonymous_key = 0
+
+    def attach(self, root: tk.Tk) -> None:
+        """結果の受け渡しをこのルートの after ループで行う。"""
+        self._root = root
+        self._ensure_dispatch()
+
+    def submit(
+        self,
+        owner: tk.Misc,
+        work: Callable[[], Any],
+        *,
+        key: Hashable | None = None,
+        on_success: Callable[[Any], None] | None = None,
+        on_error: Callable[[Exception], None] | None = None,
+    ) -> concurrent.futures.Future[Any]:
+        """work をワーカーで実行し、結果を owner が生きていればメインスレッドで渡す。
+
+        key が同じ処理が実行中なら work は捨て、その結果を一緒に受け取る。
+        """
+        self._watch_owner(owner)
+        subscriber = _Subscriber(owner, on_success, on_error)
+        with self._lock:
+            if key is None:
+                key = ("_anonymous", self._next_anonymous_key)
+                self._next_anonymous_key += 1
+            flight = self._flights.get(key)
+            if flight is not None and flight.future is not None:
+                flight.subscribers.append(subscriber)
+                return flight.future
+            flight = _Flight()
+            flight.subscribers.append(subscriber)
+            self._flights[key] = flight
+            future = self._ensure_executor().submit(work)
+            flight.future = future
+        future.add_done_callback(lambda done: self._finish(key, flight, done))
+        self._ensure_dispatch()
+        return future
+
+    def cancel_owner(self, owner: tk.Misc) -> None:
+        """owner 宛ての結果を捨て、他に待つ者がいない未開始の処理を取り消す。"""
+        to_cancel: list[concurrent.futures.Future[Any]] = []
+        with self._lock:
+            for flight in self._flights.values():
+                flight.subscribers = [
+                    subscriber
+                    for subscriber in flight.subscribers
+                    if subscriber.owner is not owner
+                ]
+                if not flight.subscribers and flight.future is not None:
+                    to_cancel.append(flight.future)
+        for future in to_cancel:
+            future.cancel()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def dispatch_pending(self) -> None:
+        """キューに溜まった結果をこのスレッドで呼び出し元へ渡す。
+
+        コールバックの例外は他の結果を止めないよう、Tk の例外報告へ回す。
+        """
+        while True:
+            try:
+                callback = self._results.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                callback()
+            except Exception:
+                root = self._root
+                if root is not None:
+                    root.report_callback_exception(*sys.exc_info())
+                else:
+                    _logger.exception("background task callback failed")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+            flights = list(self._flights.values())
+            self._flights.clear()
+        for flight in flights:
+            if flight.future is not None:
+                flight.future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._root = None
+        self._dispatch_scheduled = False
+
+    def _ensure_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix="beaver-ui-task",
+            )
+        return self._executor
+
+    def _watch_owner(self, owner: tk.Misc) -> None:
+        with self._lock:
+            if id(owner) in self._bound_owners:
+                return
+            self._bound_owners.add(id(owner))
+
+        def on_destroy(event: tk.Event) -> None:
+            # 子ウィジェットの Destroy も届くので、owner 自身のときだけ扱う
+            if event.widget is owner:
+                with self._lock:
+                    self._bound_owners.discard(id(owner))
+                self.cancel_owner(owner)
+
+        try:
+            owner.bind("<Destroy>", on_destroy, add="+")
+        except (AttributeError, tk.TclError):
+            pass
+
+    def _finish(
+        self,
+        key: Hashable,
+        flight: _Flight,
+        future: concurrent.futures.Future[Any],
+    ) -> None:
+        error = None if future.cancelled() else future.exception()
+        result = None if future.cancelled() or error is not None else future.result()
+        # after ループが「処理も結果もない」と見て止まらないよう、処理を外すのと
+        # 結果を積むのを同じロックの中で行う
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            if future.cancelled():
+                return
+            for subscriber in flight.subscribers:
+                self._results.put(
+                    lambda subscriber=subscriber: self._deliver(
+                        subscriber, result, error
+                    )
+                )
+
+    def _deliver(
+        self, subscriber: _Subscriber, result: Any, error: BaseException | None
+    ) -> None:
+        try:
+            if not subscriber.owner.winfo_exists():
+                return
+        except (AttributeError, tk.TclError):
+            return
+        if error is None:
+            if subscriber.on_success is not None:
+                subscriber.on_success(result)
+        elif isinstance(error, Exception) and subscriber.on_error is not None:
+            subscriber.on_error(error)
+
+    def _has_pending(self) -> bool:
+        with self._lock:
+            return bool(self._flights) or not self._results.empty()
+
+    def _ensure_dispatch(self) -> None:
+        """処理か結果が残っていて after ループが止まっていれば予約する。"""
+        root = self._root
+        if root is None or self._dispatch_scheduled or not self._has_pending():
+            return
+
+        def tick() -> None:
+            self._dispatch_scheduled = False
+            self.dispatch_pending()
+            self._ensure_dispatch()
+
+        try:
+            root.after(UI_TASK_DISPATCH_INTERVAL_MS, tick)
+        except tk.TclError:
+            self._root = None
+            return
+        self._dispatch_scheduled = True
+
+
+ui_tasks = BackgroundTasks()
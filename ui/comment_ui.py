@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import re
 import tkinter as tk
-from collections.abc import Mapping, Sequence
+from collections.abc import Callable, Mapping, Sequence
 from dataclasses import dataclass
 
 SOFT_WRAP_MARKER = "\u200b"
@@ -411,9 +411,16 @@ class CommentCardCanvas(tk.Canvas):
 
 
 class CommentListView(tk.Frame):
-    def __init__(self, master: tk.Misc) -> None:
+    def __init__(
+        self,
+        master: tk.Misc,
+        on_drawn: Callable[[list[int]], None] | None = None,
+    ) -> None:
         super().__init__(master, background=COMMENT_COLUMN_BG)
         self._comments: list[CommentEntry] = []
+        # add_comment で追加され、まだ描画していないコメントの id。
+        self._on_drawn = on_drawn
+        self._undrawn_ids: list[int] = []
         # "chronological"（新着順）か "bookmark"（しおり降順）。
         self._display_order = "chronological"
         self._redraw_scheduled = False
@@ -445,6 +452,7 @@ class CommentListView(tk.Frame):
 
     def clear(self) -> None:
         self._comments.clear()
+        self._undrawn_ids.clear()
         # 即時 delete は「削除＝即時／再描画＝遅延」の時間差で空フレームを生み、
         # 吹き出しのちらつきの原因になる。画面消去も _redraw に一任し、
         # delete→再生成を 1 フレームに集約する。
@@ -456,6 +464,8 @@ class CommentListView(tk.Frame):
 
     def add_comment(self, comment: CommentEntry) -> None:
         self._comments.insert(0, comment)
+        if self._on_drawn is not None:
+            self._undrawn_ids.append(comment.id)
         self._schedule_redraw()
         self.after_idle(lambda: self._canvas.yview_moveto(0.0))
 
@@ -511,6 +521,11 @@ class CommentListView(tk.Frame):
         else:
             self._canvas.tag_lower("comment_card")
 
+        if self._undrawn_ids and self._on_drawn is not None:
+            drawn_ids = self._undrawn_ids
+            self._undrawn_ids = []
+            self._on_drawn(drawn_ids)
+
     def _refresh_scrollregion(self) -> None:
         bbox = self._canvas.bbox("comment_card")
         width = max(1, self._canvas.winfo_width())
@@ -9,7 +9,6 @@ import uuid
 from datetime import datetime
 from typing import Tuple
 
-import requests
 import tkinter as tk
 from PIL import Image, ImageTk
 
@@ -28,6 +27,7 @@ from config.constants import (
     STAMP_ID_CACHE_SIZE,
     STAMP_RECENT_WINDOW_SEC,
 )
+from services import http_client
 from state import app_state as state
 from ui.display_layout import WindowRect
 
@@ -110,7 +110,7 @@ def enqueue_stamp_balloon(entry: dict) -> None:
 
 def _download_and_prepare_stamp(stamp_id: str, url: str) -> None:
     try:
-        resp = requests.get(url, timeout=STAMP_DOWNLOAD_TIMEOUT)
+        resp = http_client.get(url, timeout=STAMP_DOWNLOAD_TIMEOUT)
         resp.raise_for_status()
         data = resp.content
     except Exception:
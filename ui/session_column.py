@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import queue
+import tkinter as tk
+
+from services.session_watch import WatchedSession, unwatch_session
+from services.ws_transport import (
+    CONNECTION_BACKING_OFF,
+    CONNECTION_CLOSED,
+    CONNECTION_CONNECTING,
+    CONNECTION_DEGRADED,
+    CONNECTION_OPEN,
+)
+from ui import admin_theme
+from ui.comment_ui import COMMENT_COLUMN_BG, CommentListView, comment_entry_from_message
+
+SESSION_COLUMN_WIDTH = 360
+SESSION_COLUMN_HEIGHT = 720
+SESSION_COLUMN_POLL_INTERVAL_MS = 100
+
+_COLUMN_STATUS_TEXT = {
+    CONNECTION_CONNECTING: "接続中…",
+    CONNECTION_OPEN: "接続済み",
+    CONNECTION_DEGRADED: "接続不安定",
+    CONNECTION_BACKING_OFF: "再接続待ち…",
+    CONNECTION_CLOSED: "未接続",
+}
+
+
+def _column_status_text(watched: WatchedSession) -> str:
+    if watched.error:
+        return "接続失敗"
+    return _COLUMN_STATUS_TEXT.get(watched.stats().state, "")
+
+
+def open_session_column(
+    root_ref: tk.Misc, watched: WatchedSession, index: int
+) -> tk.Toplevel:
+    """監視セッション用のコメント列を別ウィンドウで開く。閉じると監視も止める。"""
+    win = tk.Toplevel(root_ref)
+    win.title(f"監視: {watched.session}")
+    win.configure(bg=COMMENT_COLUMN_BG)
+    x = 40 + index * (SESSION_COLUMN_WIDTH + 8)
+    win.geometry(f"{SESSION_COLUMN_WIDTH}x{SESSION_COLUMN_HEIGHT}+{x}+40")
+
+    header = tk.Frame(win, bg=admin_theme.WINDOW_BG)
+    header.pack(fill="x")
+    tk.Label(
+        header,
+        text=watched.session,
+        bg=admin_theme.WINDOW_BG,
+        fg=admin_theme.TITLE_COLOR,
+        font=admin_theme.SMALL_FONT,
+        anchor="w",
+        padx=8,
+    ).pack(side="left", fill="x", expand=True)
+    status_var = tk.StringVar(value=_column_status_text(watched))
+    status_badge = admin_theme.create_badge(header, textvariable=status_var)
+    status_badge.pack(side="right", padx=6, pady=4)
+
+    comment_list = CommentListView(win)
+    comment_list.pack(expand=True, fill="both")
+
+    store = watched.store
+    rendered_generation = [-1]
+
+    def update_column() -> None:
+        try:
+            if not win.winfo_exists():
+                return
+        except tk.TclError:
+            return
+
+        generation, comments = store.snapshot_messages()
+        if generation != rendered_generation[0]:
+            comment_list.clear()
+            if comments:
+                comment_list.set_comments(comments)
+            rendered_generation[0] = generation
+
+        try:
+            while True:
+                comment_entry = comment_entry_from_message(
+                    store.message_queue.get_nowait()
+                )
+                if comment_entry is None:
+                    continue
+                store.append_message(comment_entry)
+                comment_list.add_comment(comment_entry)
+        except queue.Empty:
+            pass
+
+        status_text = _column_status_text(watched)
+        if status_var.get() != status_text:
+            status_var.set(status_text)
+            admin_theme.update_badge(status_badge, status_text)
+        win.after(SESSION_COLUMN_POLL_INTERVAL_MS, update_column)
+
+    def on_close() -> None:
+        unwatch_session(watched.key)
+        win.destroy()
+
+    win.protocol("WM_DELETE_WINDOW", on_close)
+    admin_theme.update_badge(status_badge, status_var.get())
+    update_column()
+    return win
@@ -2,27 +2,45 @@ from __future__ import annotations
 
 import io
 import csv
-import threading
-from collections.abc import Callable, Sequence
-from typing import Protocol
+import uuid
+from collections.abc import Callable, Mapping, Sequence
+from typing import Any, Protocol
 
 import tkinter as tk
 from tkinter import filedialog, messagebox
 
 from services.backend_api import (
-    BackendApiError,
-    create_poll,
     fetch_behavior_events,
     fetch_poll_results,
     fetch_polls,
     generate_sakura_names,
-    post_sakura_comment,
-    set_reaction_mode,
-    set_poll_results_display,
-    start_poll,
+    snapshot_endpoint_stats,
 )
-from services.events import connect_session, disconnect_session
+from services.behavior_sync import load_older, sync_latest
+from services import json_codec
+from services.circuit_breaker import STATE_HALF_OPEN, STATE_OPEN, EndpointStats
+from services.events import (
+    connect_session,
+    disconnect_session,
+    message_latency,
+    rtt_histogram,
+    snapshot_connection_stats,
+)
+from services.metrics import LatencySnapshot
+from services.outbox import (
+    KIND_CREATE_POLL,
+    KIND_POLL_RESULTS_DISPLAY,
+    KIND_REACTION_MODE,
+    KIND_SAKURA_COMMENT,
+    KIND_START_POLL,
+    OutboxCounts,
+    OutboxPending,
+    outbox,
+)
+from services.session_watch import watch_session, watched_sessions
+from services.ws_transport import ConnectionStats
 from state import app_state as state
+from state.ingest_queue import IngestQueueStats
 from ui.admin_cards import (
     CommentHistoryRow,
     PollResultsView,
@@ -31,7 +49,9 @@ from ui.admin_cards import (
     build_poll_results_view,
     string_value as _string_value,
 )
+from ui.background_tasks import ui_tasks
 from ui.file_utils import build_export_filename
+from ui.session_column import open_session_column
 from ui import admin_theme
 
 try:
@@ -600,6 +620,66 @@ def _show_async_error(root_ref: tk.Misc, parent: tk.Misc, message: str) -> None:
         pass
 
 
+# 送信待ちになった操作を key ごとに (内容, リクエスト ID) で覚えておく。同じ内容で
+# 押し直したときは同じ ID で積み、つながった後に二重に適用されないようにする
+_queued_request_ids: dict[tuple[object, ...], tuple[str, str]] = {}
+
+
+def _operation_request_id(
+    key: tuple[object, ...], params: Mapping[str, object]
+) -> str:
+    content = json_codec.dumps(dict(params))
+    queued = _queued_request_ids.get(key)
+    if queued is not None and queued[0] == content and outbox.is_pending(queued[1]):
+        return queued[1]
+    request_id = uuid.uuid4().hex
+    _queued_request_ids[key] = (content, request_id)
+    return request_id
+
+
+def _submit_operation(
+    owner: tk.Misc,
+    root_ref: tk.Misc,
+    kind: str,
+    params: Mapping[str, object],
+    *,
+    key: tuple[object, ...],
+    on_success: Callable[[Any], None],
+    on_queued: Callable[[], None] | None = None,
+) -> None:
+    """運営操作を送信キュー経由で送る。回線待ちで残ったら on_queued を呼ぶ。"""
+    request_id = _operation_request_id(key, params)
+
+    def forget() -> None:
+        if _queued_request_ids.get(key, ("", ""))[1] == request_id:
+            del _queued_request_ids[key]
+
+    def succeeded(result: Any) -> None:
+        forget()
+        on_success(result)
+
+    def on_error(exc: Exception) -> None:
+        if not isinstance(exc, OutboxPending):
+            forget()
+            _show_async_error(root_ref, owner, str(exc))
+        elif on_queued is not None:
+            on_queued()
+        else:
+            messagebox.showinfo(
+                "送信待ち",
+                "通信できないため送信待ちに入れました。つながり次第、順番に送ります。",
+                parent=owner,
+            )
+
+    ui_tasks.submit(
+        owner,
+        lambda: outbox.submit(kind, params, request_id=request_id),
+        key=key,
+        on_success=succeeded,
+        on_error=on_error,
+    )
+
+
 def _center_window_on_monitor(win: tk.Toplevel, anchor: tk.Misc) -> None:
     """コメントオーバーレイ（anchor）と同じモニタの中央へ配置する。"""
     win.update_idletasks()
@@ -826,71 +906,55 @@ def _open_poll_window(root_ref: tk.Tk, menu_ref: tk.Misc) -> None:
 
     def start_poll_action(poll_id: int) -> None:
         session = _current_session_name()
-
-        def worker() -> None:
-            try:
-                start_poll(session, poll_id)
-            except BackendApiError as exc:
-                _show_async_error(root_ref, win, str(exc))
-                return
-            except Exception as exc:  # noqa: BLE001 - ネットワーク例外を UI に伝える
-                _show_async_error(root_ref, win, str(exc))
-                return
-            root_ref.after(
-                0, lambda: messagebox.showinfo("アンケート", "配信しました。", parent=win)
-            )
-
-        threading.Thread(target=worker, daemon=True).start()
+        _submit_operation(
+            win,
+            root_ref,
+            KIND_START_POLL,
+            {"session": session, "poll_id": poll_id},
+            key=("start_poll", session, poll_id),
+            on_success=lambda _result: messagebox.showinfo(
+                "アンケート", "配信しました。", parent=win
+            ),
+        )
 
     def open_results(poll_id: int) -> None:
         _open_poll_results_window(menu_ref, poll_id, _current_session_name())
 
     def display_results(poll_id: int, target: str) -> None:
         session = _current_session_name()
-
-        def worker() -> None:
-            try:
-                set_poll_results_display(session, poll_id, target)
-            except BackendApiError as exc:
-                _show_async_error(root_ref, win, str(exc))
-                return
-            except Exception as exc:  # noqa: BLE001
-                _show_async_error(root_ref, win, str(exc))
-                return
-            message = "非表示にしました。" if target == "none" else "結果表示を更新しました。"
-            root_ref.after(0, lambda: messagebox.showinfo("アンケート", message, parent=win))
-
-        threading.Thread(target=worker, daemon=True).start()
+        message = "非表示にしました。" if target == "none" else "結果表示を更新しました。"
+        _submit_operation(
+            win,
+            root_ref,
+            KIND_POLL_RESULTS_DISPLAY,
+            {"session": session, "poll_id": poll_id, "target": target},
+            key=("set_poll_results_display", session, poll_id, target),
+            on_success=lambda _result: messagebox.showinfo(
+                "アンケート", message, parent=win
+            ),
+        )
 
     def refresh_list() -> None:
         session = _current_session_name()
 
-        def worker() -> None:
-            try:
-                polls = fetch_polls(session)
-            except BackendApiError as exc:
-                _show_async_error(root_ref, win, str(exc))
-                return
-            except Exception as exc:  # noqa: BLE001
-                _show_async_error(root_ref, win, str(exc))
-                return
-
-            def apply() -> None:
-                if not win.winfo_exists():
-                    return
-                _render_poll_list(
-                    list_content,
-                    polls,
-                    root_ref=root_ref,
-                    session=session,
-                    on_start=start_poll_action,
-                    on_results=open_results,
-                    on_display=display_results,
-                )
-
-            root_ref.after(0, apply)
+        def apply(polls: list[dict[str, object]]) -> None:
+            _render_poll_list(
+                list_content,
+                polls,
+                root_ref=root_ref,
+                session=session,
+                on_start=start_poll_action,
+                on_results=open_results,
+                on_display=display_results,
+            )
 
-        threading.Thread(target=worker, daemon=True).start()
+        ui_tasks.submit(
+            win,
+            lambda: fetch_polls(session),
+            key=("fetch_polls", session),
+            on_success=apply,
+            on_error=lambda exc: _show_async_error(root_ref, win, str(exc)),
+        )
 
     def submit() -> None:
         question = question_var.get().strip()
@@ -908,27 +972,26 @@ def _open_poll_window(root_ref: tk.Tk, menu_ref: tk.Misc) -> None:
             return
         session = _current_session_name()
 
-        def worker() -> None:
-            try:
-                create_poll(session, question, options, duration)
-            except BackendApiError as exc:
-                _show_async_error(root_ref, win, str(exc))
-                return
-            except Exception as exc:  # noqa: BLE001
-                _show_async_error(root_ref, win, str(exc))
-                return
-
-            def apply() -> None:
-                if not win.winfo_exists():
-                    return
-                question_var.set("")
-                for option_var in option_vars:
-                    option_var.set("")
-                refresh_list()
+        def apply(_result: object) -> None:
+            question_var.set("")
+            for option_var in option_vars:
+                option_var.set("")
+            refresh_list()
 
-            root_ref.after(0, apply)
-
-        threading.Thread(target=worker, daemon=True).start()
+        # 同じ内容の登録を連打しても 1 件だけ作る
+        _submit_operation(
+            win,
+            root_ref,
+            KIND_CREATE_POLL,
+            {
+                "session": session,
+                "question": question,
+                "options": options,
+                "duration_sec": duration,
+            },
+            key=("create_poll", session, question, tuple(options), duration),
+            on_success=apply,
+        )
 
     admin_theme.create_button(
         form,
@@ -1134,28 +1197,19 @@ def _open_poll_results_window(menu_ref: tk.Misc, poll_id: int, session: str) ->
     def refresh() -> None:
         status_var.set("読み込み中…")
 
-        def worker() -> None:
-            try:
-                results = fetch_poll_results(poll_id, session=session)
-            except BackendApiError as exc:
-                message = str(exc)
-                menu_ref.after(0, lambda: status_var.set(message))
-                return
-            except Exception as exc:  # noqa: BLE001
-                message = str(exc)
-                menu_ref.after(0, lambda: status_var.set(message))
-                return
-            view = build_poll_results_view(results)
-
-            def apply() -> None:
-                if not win.winfo_exists():
-                    return
-                status_var.set("最終更新を反映しました（リアルタイム更新なし）。")
-                _render_poll_results(content, view)
-
-            menu_ref.after(0, apply)
-
-        threading.Thread(target=worker, daemon=True).start()
+        def apply(view: PollResultsView) -> None:
+            status_var.set("最終更新を反映しました（リアルタイム更新なし）。")
+            _render_poll_results(content, view)
+
+        ui_tasks.submit(
+            win,
+            lambda: build_poll_results_view(
+                fetch_poll_results(poll_id, session=session)
+            ),
+            key=("fetch_poll_results", poll_id, session),
+            on_success=apply,
+            on_error=lambda exc: status_var.set(str(exc)),
+        )
 
     buttons = tk.Frame(wrapper, bg=admin_theme.WINDOW_BG)
     buttons.pack(fill="x", pady=(10, 0))
@@ -1263,27 +1317,23 @@ def _open_reaction_mode_window(root_ref: tk.Tk, menu_ref: tk.Misc) -> None:
         session = _current_session_name()
         operator = operator_var.get().strip() or "admin"
 
-        def worker() -> None:
-            try:
-                result = set_reaction_mode(session, mode, operator)
-            except BackendApiError as exc:
-                _show_async_error(root_ref, win, str(exc))
-                return
-            except Exception as exc:  # noqa: BLE001
-                _show_async_error(root_ref, win, str(exc))
-                return
-
-            def apply() -> None:
-                reaction_types = result.get("reaction_types")
-                result_mode = result.get("mode")
-                if isinstance(result_mode, str) and isinstance(reaction_types, list):
-                    state.set_reaction_mode(result_mode, reaction_types)
-                sync_current_label()
-                status_var.set("更新しました。")
+        def apply(result: dict[str, object]) -> None:
+            reaction_types = result.get("reaction_types")
+            result_mode = result.get("mode")
+            if isinstance(result_mode, str) and isinstance(reaction_types, list):
+                state.set_reaction_mode(result_mode, reaction_types)
+            sync_current_label()
+            status_var.set("更新しました。")
 
-            menu_ref.after(0, apply)
-
-        threading.Thread(target=worker, daemon=True).start()
+        _submit_operation(
+            win,
+            root_ref,
+            KIND_REACTION_MODE,
+            {"session": session, "mode": mode, "operator_name": operator},
+            key=("set_reaction_mode", session, mode),
+            on_success=apply,
+            on_queued=lambda: status_var.set("送信待ちです。つながり次第切り替えます。"),
+        )
 
     admin_theme.create_button(
         wrapper,
@@ -1361,33 +1411,27 @@ def _open_sakura_window(root_ref: tk.Tk, menu_ref: tk.Misc) -> None:
         names = _participant_names_from_history()
         status_var.set("候補生成中…")
 
-        def worker() -> None:
-            try:
-                candidates = generate_sakura_names(session, names)
-            except BackendApiError as exc:
-                _show_async_error(root_ref, win, str(exc))
-                return
-            except Exception as exc:  # noqa: BLE001
-                _show_async_error(root_ref, win, str(exc))
-                return
-
-            def apply() -> None:
-                for child in candidate_buttons.winfo_children():
-                    child.destroy()
-                for candidate in candidates:
-                    admin_theme.create_button(
-                        candidate_buttons,
-                        text=candidate,
-                        command=lambda value=candidate: choose_candidate(value),
-                        variant="secondary",
-                    ).pack(side="left", expand=True, fill="x", padx=(0, 6))
-                if candidates:
-                    candidate_var.set(candidates[0])
-                status_var.set("候補を生成しました。")
-
-            menu_ref.after(0, apply)
-
-        threading.Thread(target=worker, daemon=True).start()
+        def apply(candidates: list[str]) -> None:
+            for child in candidate_buttons.winfo_children():
+                child.destroy()
+            for candidate in candidates:
+                admin_theme.create_button(
+                    candidate_buttons,
+                    text=candidate,
+                    command=lambda value=candidate: choose_candidate(value),
+                    variant="secondary",
+                ).pack(side="left", expand=True, fill="x", padx=(0, 6))
+            if candidates:
+                candidate_var.set(candidates[0])
+            status_var.set("候補を生成しました。")
+
+        ui_tasks.submit(
+            win,
+            lambda: generate_sakura_names(session, names),
+            key=("generate_sakura_names", session),
+            on_success=apply,
+            on_error=lambda exc: _show_async_error(root_ref, win, str(exc)),
+        )
 
     admin_theme.create_button(
         candidate_card,
@@ -1426,23 +1470,29 @@ def _open_sakura_window(root_ref: tk.Tk, menu_ref: tk.Misc) -> None:
         session = _current_session_name()
         status_var.set("送信中…")
 
-        def worker() -> None:
-            try:
-                post_sakura_comment(session, display_name, text, operator_name)
-            except BackendApiError as exc:
-                _show_async_error(root_ref, win, str(exc))
-                return
-            except Exception as exc:  # noqa: BLE001
-                _show_async_error(root_ref, win, str(exc))
-                return
-
-            def apply() -> None:
-                text_widget.delete("1.0", "end")
-                status_var.set("送信しました。")
+        def apply(_result: object) -> None:
+            text_widget.delete("1.0", "end")
+            status_var.set("送信しました。")
 
-            root_ref.after(0, apply)
+        # 送信中に同じ本文でもう一度押されても二重投稿しない
+        def queued() -> None:
+            text_widget.delete("1.0", "end")
+            status_var.set("送信待ちです。つながり次第送信します。")
 
-        threading.Thread(target=worker, daemon=True).start()
+        _submit_operation(
+            win,
+            root_ref,
+            KIND_SAKURA_COMMENT,
+            {
+                "session": session,
+                "display_name": display_name,
+                "text": text,
+                "operator_name": operator_name,
+            },
+            key=("post_sakura_comment", session, display_name, text),
+            on_success=apply,
+            on_queued=queued,
+        )
 
     admin_theme.create_button(
         wrapper,
@@ -1471,6 +1521,10 @@ def _payload_summary(payload: object) -> str:
     return ", ".join(parts)
 
 
+# トラッキングログの表に並べる行数。フィルターは手元の全件に対してかける
+_BEHAVIOR_EVENT_RENDER_LIMIT = 100
+
+
 def _open_behavior_events_window(root_ref: tk.Tk, menu_ref: tk.Misc) -> None:
     win = _create_menu_child_window(menu_ref)
     win.title("トラッキングログ")
@@ -1479,7 +1533,7 @@ def _open_behavior_events_window(root_ref: tk.Tk, menu_ref: tk.Misc) -> None:
     _create_window_header(
         wrapper,
         title="トラッキングログ",
-        description="最新の行動ログを確認します。WebSocketで届いたイベントは自動で反映されます。",
+        description="行動ログを確認します。WebSocketで届いたイベントは自動で反映され、更新では前回より新しい分だけを取得します。",
         wraplength=820,
     )
 
@@ -1529,7 +1583,7 @@ def _open_behavior_events_window(root_ref: tk.Tk, menu_ref: tk.Misc) -> None:
                 font=admin_theme.SMALL_BOLD_FONT,
                 anchor="w",
             ).grid(row=0, column=col, sticky="ew", padx=4, pady=(0, 4))
-        for row_index, event in enumerate(events[:100], start=1):
+        for row_index, event in enumerate(events, start=1):
             values = (
                 _string_value(event.get("occurred_at")),
                 _string_value(event.get("actor_name")),
@@ -1551,36 +1605,90 @@ def _open_behavior_events_window(root_ref: tk.Tk, menu_ref: tk.Misc) -> None:
                     wraplength=260 if col == 6 else 140,
                 ).grid(row=row_index, column=col, sticky="nw", padx=4, pady=2)
 
+    last_generation = [-1]
+
+    # フィルター付きで更新したときにサーバー側で絞り込んだ結果。手元のログは上限で
+    # 古い側を捨てるので、まれな種別は手元だけでは見つからないことがある
+    server_matches: dict[tuple[str, str], list[dict[str, object]]] = {}
+
+    def current_filter() -> tuple[str, str]:
+        return event_type_var.get().strip(), actor_var.get().strip()
+
+    def matches_filter(event: Mapping[str, object]) -> bool:
+        event_type, actor_real_name = current_filter()
+        if event_type and event.get("event_type") != event_type:
+            return False
+        return not actor_real_name or event.get("actor_real_name") == actor_real_name
+
+    def matching_events(
+        limit: int | None = None,
+    ) -> tuple[int, list[dict[str, object]]]:
+        generation, events = state.snapshot_behavior_events(
+            limit=limit, match=matches_filter
+        )
+        remote = server_matches.get(current_filter())
+        if remote:
+            by_id = {event["id"]: event for event in remote}
+            by_id.update((event["id"], event) for event in events)
+            events = sorted(
+                by_id.values(),
+                key=lambda event: int(event["id"]),  # type: ignore[call-overload]
+                reverse=True,
+            )[:limit]
+        return generation, events
+
+    def show_local_events() -> None:
+        generation, events = matching_events(_BEHAVIOR_EVENT_RENDER_LIMIT)
+        render(events)
+        bounds = state.behavior_event_bounds(_current_session_name())
+        older = "" if bounds.has_older else "（最古まで取得済み）"
+        status_var.set(f"{len(events)}件を表示中 / 取得済み {bounds.count}件{older}")
+        last_generation[0] = generation
+
     def refresh() -> None:
         session = _current_session_name()
+        filters = current_filter()
         status_var.set("読み込み中…")
 
-        def worker() -> None:
-            try:
-                events = fetch_behavior_events(
-                    session,
-                    limit=100,
-                    event_type=event_type_var.get(),
-                    actor_real_name=actor_var.get(),
-                )
-            except BackendApiError as exc:
-                _show_async_error(root_ref, win, str(exc))
-                return
-            except Exception as exc:  # noqa: BLE001
-                _show_async_error(root_ref, win, str(exc))
-                return
-
-            def apply() -> None:
-                state.set_behavior_events(events)
-                render(events)
-                status_var.set(f"{len(events)}件を表示中")
+        def load() -> list[dict[str, object]] | None:
+            sync_latest(session)
+            if not any(filters):
+                return None
+            event_type, actor_real_name = filters
+            return fetch_behavior_events(
+                session,
+                limit=_BEHAVIOR_EVENT_RENDER_LIMIT,
+                event_type=event_type,
+                actor_real_name=actor_real_name,
+            )
 
-            root_ref.after(0, apply)
+        def apply(matches: list[dict[str, object]] | None) -> None:
+            server_matches.clear()
+            if matches is not None:
+                server_matches[filters] = matches
+            show_local_events()
+
+        ui_tasks.submit(
+            win,
+            load,
+            key=("sync_behavior_events", session),
+            on_success=apply,
+            on_error=lambda exc: _show_async_error(root_ref, win, str(exc)),
+        )
 
-        threading.Thread(target=worker, daemon=True).start()
+    def load_older_events() -> None:
+        session = _current_session_name()
+        status_var.set("古いログを読み込み中…")
+        ui_tasks.submit(
+            win,
+            lambda: load_older(session),
+            key=("load_older_behavior_events", session),
+            on_success=lambda _added: show_local_events(),
+            on_error=lambda exc: _show_async_error(root_ref, win, str(exc)),
+        )
 
     def export_csv() -> None:
-        _generation, events = state.snapshot_behavior_events()
+        _generation, events = matching_events()
         if not events:
             messagebox.showinfo("トラッキングログ", "出力するログがありません。", parent=win)
             return
@@ -1612,6 +1720,9 @@ def _open_behavior_events_window(root_ref: tk.Tk, menu_ref: tk.Misc) -> None:
     actions = tk.Frame(wrapper, bg=admin_theme.WINDOW_BG)
     actions.pack(fill="x", pady=(10, 0))
     admin_theme.create_button(actions, text="更新", command=refresh, variant="primary").pack(side="left")
+    admin_theme.create_button(
+        actions, text="さらに古いログ", command=load_older_events, variant="secondary"
+    ).pack(side="left", padx=(8, 0))
     admin_theme.create_button(actions, text="CSV出力", command=export_csv, variant="secondary").pack(side="left", padx=(8, 0))
     tk.Label(
         actions,
@@ -1622,22 +1733,104 @@ def _open_behavior_events_window(root_ref: tk.Tk, menu_ref: tk.Misc) -> None:
         anchor="w",
     ).pack(side="left", padx=(12, 0))
 
-    last_generation = [-1]
-
     def poll_local_events() -> None:
         if not win.winfo_exists():
             return
-        generation, events = state.snapshot_behavior_events()
-        if auto_refresh_var.get() and generation != last_generation[0]:
-            render(events)
-            status_var.set(f"{len(events)}件を表示中")
-            last_generation[0] = generation
+        if (
+            auto_refresh_var.get()
+            and state.behavior_event_generation() != last_generation[0]
+        ):
+            show_local_events()
         win.after(500, poll_local_events)
 
+    for filter_var in (event_type_var, actor_var):
+        filter_var.trace_add("write", lambda *_args: show_local_events())
+
     refresh()
     poll_local_events()
 
 
+def _connection_stats_text(
+    stats: ConnectionStats,
+    rtt: LatencySnapshot | None = None,
+    ingest: IngestQueueStats | None = None,
+) -> str:
+    parts: list[str] = []
+    if rtt is not None and rtt.p50_ms is not None and rtt.p95_ms is not None:
+        parts.append(f"RTT {rtt.p50_ms:.0f} ms（p95 {rtt.p95_ms:.0f} ms）")
+    if stats.reconnect_attempts > 0 or stats.next_retry_delay_sec is not None:
+        parts.append(
+            f"再接続 {stats.reconnects} 回（試行 {stats.reconnect_attempts} 回）"
+        )
+        if stats.last_time_to_reconnect_sec is not None:
+            parts.append(f"直近の復旧 {stats.last_time_to_reconnect_sec:.1f} 秒")
+        if stats.next_retry_delay_sec is not None:
+            parts.append(f"次の再試行まで {stats.next_retry_delay_sec:.1f} 秒")
+    if ingest is not None:
+        # コメント本文の取りこぼしはスタンプと分け、先頭に出して見落とさないようにする
+        if ingest.dropped_texts:
+            parts.insert(0, f"⚠ コメント {ingest.dropped_texts} 件を表示できず破棄")
+        if ingest.dropped_stamps or ingest.merged_stamps:
+            parts.append(
+                f"スタンプ破棄 {ingest.dropped_stamps} 件（統合 {ingest.merged_stamps} 件）"
+            )
+    return " / ".join(parts)
+
+
+_LATENCY_SEGMENT_LABELS: tuple[tuple[str, str], ...] = (
+    ("decode", "解析"),
+    ("handle", "処理"),
+    ("queue", "待機"),
+    ("draw", "描画"),
+    ("total", "合計"),
+)
+
+
+def _message_latency_text(segments: Mapping[str, LatencySnapshot]) -> str:
+    total = segments.get("total")
+    if total is None or total.count <= 0:
+        return ""
+    parts: list[str] = []
+    for name, label in _LATENCY_SEGMENT_LABELS:
+        snapshot = segments.get(name)
+        if snapshot is None or snapshot.p95_ms is None:
+            continue
+        parts.append(f"{label} {snapshot.p95_ms:.0f}")
+    return "コメント遅延 p95（ms） " + " / ".join(parts)
+
+
+def _endpoint_stats_text(stats: Sequence[EndpointStats]) -> str:
+    parts: list[str] = []
+    p95_values = [
+        endpoint.latency.p95_ms
+        for endpoint in stats
+        if endpoint.latency.p95_ms is not None
+    ]
+    if p95_values:
+        parts.append(f"API p95 最大 {max(p95_values):.0f} ms")
+    failures = sum(endpoint.failures for endpoint in stats)
+    if failures:
+        parts.append(f"失敗 {failures} 件")
+    for endpoint in stats:
+        name = endpoint.name.removeprefix("/api/client/").removeprefix("/api/")
+        if endpoint.state == STATE_OPEN:
+            parts.append(
+                f"{name} 停止中（あと {endpoint.retry_after_sec or 0:.0f} 秒）"
+            )
+        elif endpoint.state == STATE_HALF_OPEN:
+            parts.append(f"{name} 復旧確認中")
+    return " / ".join(parts)
+
+
+def _outbox_text(counts: OutboxCounts) -> str:
+    parts: list[str] = []
+    if counts.pending:
+        parts.append(f"送信待ち {counts.pending} 件")
+    if counts.failed:
+        parts.append(f"送信失敗 {counts.failed} 件")
+    return " / ".join(parts)
+
+
 def create_menu_window(
     switch_display_callback: Callable[[], None],
     refresh_layout_callback: Callable[[], None],
@@ -1689,6 +1882,105 @@ def create_menu_window(
         variant="primary",
     ).pack(side="left", padx=(10, 0))
 
+    connection_stats_var = tk.StringVar(value="")
+    tk.Label(
+        wrapper,
+        textvariable=connection_stats_var,
+        bg=admin_theme.WINDOW_BG,
+        fg=admin_theme.SUBTLE_TEXT_COLOR,
+        font=admin_theme.SMALL_FONT,
+        anchor="w",
+    ).pack(fill="x", pady=(6, 0))
+    watch_row = tk.Frame(wrapper, bg=admin_theme.WINDOW_BG)
+    watch_row.pack(fill="x", pady=(8, 0))
+    watch_session_var = tk.StringVar(value="")
+    admin_theme.create_entry(watch_row, textvariable=watch_session_var).pack(
+        side="left",
+        expand=True,
+        fill="x",
+    )
+
+    def add_watched_session() -> None:
+        name = watch_session_var.get().strip()
+        if not name:
+            return
+        already_open = any(w.key == name for w in watched_sessions())
+        watched = watch_session(name)
+        if not already_open:
+            open_session_column(root_ref, watched, len(watched_sessions()) - 1)
+        watch_session_var.set("")
+
+    admin_theme.create_button(
+        watch_row,
+        text="別セッションを監視",
+        command=add_watched_session,
+    ).pack(side="left", padx=(10, 0))
+
+    message_latency_var = tk.StringVar(value="")
+    tk.Label(
+        wrapper,
+        textvariable=message_latency_var,
+        bg=admin_theme.WINDOW_BG,
+        fg=admin_theme.SUBTLE_TEXT_COLOR,
+        font=admin_theme.SMALL_FONT,
+        anchor="w",
+    ).pack(fill="x")
+
+    api_stats_var = tk.StringVar(value="")
+    tk.Label(
+        wrapper,
+        textvariable=api_stats_var,
+        bg=admin_theme.WINDOW_BG,
+        fg=admin_theme.SUBTLE_TEXT_COLOR,
+        font=admin_theme.SMALL_FONT,
+        anchor="w",
+    ).pack(fill="x")
+    outbox_row = tk.Frame(wrapper, bg=admin_theme.WINDOW_BG)
+    outbox_row.pack(fill="x")
+    outbox_var = tk.StringVar(value="")
+    tk.Label(
+        outbox_row,
+        textvariable=outbox_var,
+        bg=admin_theme.WINDOW_BG,
+        fg=admin_theme.SUBTLE_TEXT_COLOR,
+        font=admin_theme.SMALL_FONT,
+        anchor="w",
+    ).pack(side="left", expand=True, fill="x")
+    retry_outbox_button = admin_theme.create_button(
+        outbox_row,
+        text="失敗分を再送",
+        command=outbox.retry_failed,
+        variant="secondary",
+    )
+
+    def refresh_outbox_counts() -> None:
+        counts = outbox.counts()
+        outbox_var.set(_outbox_text(counts))
+        if counts.failed and not retry_outbox_button.winfo_manager():
+            retry_outbox_button.pack(side="left", padx=(10, 0))
+        elif not counts.failed and retry_outbox_button.winfo_manager():
+            retry_outbox_button.pack_forget()
+
+    def refresh_connection_stats() -> None:
+        try:
+            if not menu.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        refresh_outbox_counts()
+        connection_stats_var.set(
+            _connection_stats_text(
+                snapshot_connection_stats(),
+                rtt_histogram.snapshot(),
+                state.message_queue.stats(),
+            )
+        )
+        message_latency_var.set(_message_latency_text(message_latency.snapshot()))
+        api_stats_var.set(_endpoint_stats_text(snapshot_endpoint_stats()))
+        menu.after(1000, refresh_connection_stats)
+
+    refresh_connection_stats()
+
     buttons = tk.Frame(wrapper, bg=admin_theme.WINDOW_BG)
     buttons.pack(fill="both", expand=True, pady=(16, 0))
 